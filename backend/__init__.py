@@ -2,44 +2,74 @@
 
 from fastapi import FastAPI, Request, UploadFile, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any, List, Set
 from pathlib import Path
 import hashlib
+import importlib
 import os
 import logging
 from datetime import datetime
 
 from .config import settings, BASE_DIR
-from .logging_config import setup_logging, get_logger
-from .database import engine, SessionLocal, get_db
-from .models import (
-    Structure, Atom, Bond, Interaction,
-    InteractionType, HydrogenBond, VDWContact, SaltBridge
-)
-from .schemas import (
-    StructureUploadResponse, StructureParseResponse,
-    AnalysisRequest, AnalysisResponse,
-    ErrorResponse, ValidationError
-)
-from .parsers import PDBParser, SDFParser, Mol2Parser
-from .analyzers import (
-    SpatialHashGrid, BondDetector,
-    InteractionAnalyzer, AnalysisThresholds
-)
-from .validators import FileValidator, ContentTypeValidator
-from .utils import calculate_hash, generate_correlation_id
+from .logging_config import setup_logging, shutdown_logging, parse_sampling, logging_stats, get_logger
+from . import database
+from .database import get_db, init_db, storage_backend, dispose_engine
+from .schemas import ErrorResponse
+from .core.utils import generate_correlation_id
+from .jobs import WorkerPool, job_queue
+from .services import built_service, close_services
+from .core.cache import structure_cache
+from .core.rate_limit import rate_limiter
+from .core.memory import memory_tracker
+from .core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, family, metrics
 
 logger = get_logger(__name__)
 
+# Re-exports kept for compatibility, imported when first accessed: they pull
+# in the legacy parsers, analyzers and validators, which the API does not
+# need in order to start
+_LAZY_EXPORTS = {
+    "engine": "database", "SessionLocal": "database",
+    "Structure": "models", "Atom": "models", "Bond": "models", "Interaction": "models",
+    "InteractionType": "models", "HydrogenBond": "models", "VDWContact": "models", "SaltBridge": "models",
+    "StructureUploadResponse": "schemas", "StructureParseResponse": "schemas",
+    "AnalysisRequest": "schemas", "AnalysisResponse": "schemas", "ValidationError": "schemas",
+    "PDBParser": "parsers", "SDFParser": "parsers", "Mol2Parser": "parsers",
+    "SpatialHashGrid": "analyzers", "BondDetector": "analyzers",
+    "InteractionAnalyzer": "analyzers", "AnalysisThresholds": "analyzers",
+    "FileValidator": "validators", "ContentTypeValidator": "validators",
+    "calculate_hash": "utils",
+}
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
+# Background job workers running inside the API process (JOB_EMBEDDED_WORKERS)
+worker_pool = WorkerPool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown of the application"""
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+
 app = FastAPI(
     title="BioDockViz API",
     description="Molecular visualization and analysis platform",
     version=settings.BIO_DOCK_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -59,21 +89,44 @@ frontend_dist = Path("frontend_dist")
 if frontend_dist.exists():
     app.mount("/", StaticFiles(directory=str(frontend_dist), html=True), name="frontend")
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize application on startup"""
+    setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FILE,
+        json_format=settings.LOG_JSON,
+        sampling=parse_sampling(settings.LOG_SAMPLING),
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
     logger.info("Starting BioDockViz Backend...")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Database: {settings.DATABASE_URL}")
+    logger.info(f"Database: {storage_backend.name} ({storage_backend.url.render_as_string(hide_password=True)})")
     logger.info(f"Max file size: {settings.MAX_FILE_SIZE} bytes")
     logger.info(f"Allowed file types: {settings.ALLOWED_FILE_TYPES}")
     logger.info(f"CUDA enabled: {settings.CUDA_ENABLED}")
+    
+    # The engine (and database driver) is created here rather than at import;
+    # services are built by the first request that needs them
+    if storage_backend.create_schema:
+        await init_db()
+    else:
+        database.get_engine()
+    
+    if settings.JOB_EMBEDDED_WORKERS:
+        await worker_pool.start()
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown"""
     logger.info("Shutting down BioDockViz Backend...")
-    await engine.dispose()
+    if settings.JOB_EMBEDDED_WORKERS:
+        await worker_pool.stop()
+    await job_queue.close()
+    await structure_cache.close()
+    await rate_limiter.close()
+    await close_services()
+    memory_tracker.stop()
+    await dispose_engine()
+    shutdown_logging()
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -102,7 +155,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     
     error_response = ErrorResponse(
         type="http_error",
-        code=exc.status_code,
+        code=str(exc.status_code),
         message=exc.detail,
         correlation_id=correlation_id,
     )
@@ -114,16 +167,21 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content=error_response.dict(),
     )
 
-from .routers import upload, parse, analyze, visualize, export
+from .routers import upload, parse, analyze, visualize, export, jobs, profiles
 from .middleware.auth import add_auth_middleware
+from .middleware.rate_limit import add_rate_limit_middleware
 
 app.include_router(upload.router, prefix="/api/upload")
 app.include_router(parse.router, prefix="/api/parse")
 app.include_router(analyze.router, prefix="/api/analyze")
 app.include_router(visualize.router, prefix="/api/visualize")
 app.include_router(export.router, prefix="/api/export")
+app.include_router(jobs.router, prefix="/api/jobs")
+app.include_router(profiles.router, prefix="/api/profiles")
 
-app.add_middleware(add_auth_middleware)
+# Added first so it runs inside auth (API keys are checked before they name a bucket)
+add_rate_limit_middleware(app)
+add_auth_middleware(app)
 
 @app.get("/health")
 async def health_check():
@@ -131,8 +189,8 @@ async def health_check():
     try:
         async with get_db() as db:
             # Test database connection
-            await db.execute("SELECT 1")
-            
+            await db.execute(text("SELECT 1"))
+        
         return {
             "status": "healthy",
             "checks": {
@@ -157,6 +215,88 @@ async def health_check():
             "version": settings.BIO_DOCK_VERSION,
         }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Structure cache hit ratios and eviction counters"""
+    return {
+        "structure_cache": structure_cache.stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+@app.get("/rate-limit/stats")
+async def rate_limit_stats():
+    """Admitted and rejected requests and token cost per request kind"""
+    return {
+        "rate_limit": rate_limiter.stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+def _pool_metrics() -> List[str]:
+    """Database connection pool utilization (queue pools only; SQLite file pools included)"""
+    if database.async_engine is None:
+        return []
+    pool = database.async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+    checked_out = pool.checkedout()
+    return (
+        family("biodockviz_db_pool_size", "gauge", "Configured connection pool size", [({}, pool.size())])
+        + family("biodockviz_db_pool_checked_out", "gauge", "Connections in use", [({}, checked_out)])
+        + family("biodockviz_db_pool_overflow", "gauge", "Connections open beyond the pool size", [({}, max(0, pool.overflow()))])
+        + family("biodockviz_db_pool_utilization", "gauge", "Connections in use over pool size plus max overflow",
+                 [({}, round(checked_out / capacity, 4) if capacity else 0.0)])
+    )
+
+def _cache_metrics() -> List[str]:
+    """Hit, miss and eviction counters of the structure and thumbnail caches"""
+    stats = structure_cache.stats()
+    tiers = [("structure", stats["memory"])]
+    if stats["shared"] is not None:
+        tiers.append(("structure", stats["shared"]))
+    thumbnails = built_service("thumbnail")
+    if thumbnails is not None:
+        tiers.append(("thumbnail", thumbnails.cache.stats()))
+    
+    lines: List[str] = []
+    for counter in ("hits", "misses", "evictions"):
+        lines += family(
+            f"biodockviz_cache_{counter}_total", "counter", f"Cache {counter} per tier",
+            [({"cache": cache, "tier": tier["tier"]}, tier[counter]) for cache, tier in tiers],
+        )
+    lines += family("biodockviz_cache_memory_bytes", "gauge", "Bytes held by the in-process structure cache",
+                    [({}, stats["memory"]["bytes"])])
+    return lines
+
+def _logging_metrics() -> List[str]:
+    """Log records written, dropped on a full queue, and sampled out"""
+    stats = logging_stats()
+    return (
+        family("biodockviz_log_records_total", "counter", "Log records by outcome",
+               [({"outcome": outcome}, stats[outcome]) for outcome in ("queued", "dropped", "sampled_out")])
+        + family("biodockviz_log_queue_depth", "gauge", "Records waiting for the log writer thread", [({}, stats["queue_depth"])])
+    )
+
+def _memory_metrics() -> List[str]:
+    """Resident set size, and bytes traced by tracemalloc when MEMORY_TRACKING=tracemalloc"""
+    stats = memory_tracker.stats()
+    lines: List[str] = []
+    if stats["resident_bytes"] is not None:
+        lines += family("biodockviz_process_resident_bytes", "gauge", "Resident set size of this process", [({}, stats["resident_bytes"])])
+    if stats["traced_bytes"] is not None:
+        lines += family("biodockviz_memory_traced_bytes", "gauge", "Bytes allocated by Python as traced by tracemalloc", [({}, stats["traced_bytes"])])
+    return lines
+
+metrics.add_collector(_pool_metrics)
+metrics.add_collector(_cache_metrics)
+metrics.add_collector(_logging_metrics)
+metrics.add_collector(_memory_metrics)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage and request duration histograms, DB pool and cache statistics (Prometheus text format)"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -40,11 +40,24 @@ class Settings(BaseSettings):
     DATABASE_POOL_RECYCLE: int = Field(default=3600, env="DATABASE_POOL_RECYCLE")
     DATABASE_ECHO: bool = Field(default=False, env="DATABASE_ECHO")
     
+    # Embedded SQLite (DATABASE_URL=sqlite:///path; default for the desktop build)
+    DESKTOP_DATA_DIR: Optional[str] = Field(default=None, env="DESKTOP_DATA_DIR")
+    SQLITE_BUSY_TIMEOUT: float = Field(default=30.0, env="SQLITE_BUSY_TIMEOUT")  # seconds
+    SQLITE_MMAP_SIZE: int = Field(default=256 * 1024 * 1024, env="SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE_KB: int = Field(default=64 * 1024, env="SQLITE_CACHE_SIZE_KB")
+    
     # File Upload
     MAX_FILE_SIZE: int = Field(default=100 * 1024 * 1024, env="MAX_FILE_SIZE")
     UPLOAD_DIR: str = Field(default="uploads", env="UPLOAD_DIR")
     CHUNK_SIZE: int = Field(default=5 * 1024 * 1024, env="CHUNK_SIZE")
     
+    # Batch Upload
+    BATCH_MAX_ARCHIVE_SIZE: int = Field(default=2 * 1024 * 1024 * 1024, env="BATCH_MAX_ARCHIVE_SIZE")
+    BATCH_MAX_MEMBERS: int = Field(default=100000, env="BATCH_MAX_MEMBERS")
+    BATCH_WORKERS: int = Field(default=4, env="BATCH_WORKERS")
+    BATCH_WINDOW: int = Field(default=512, env="BATCH_WINDOW")  # Members parsed and inserted per transaction
+    BATCH_WINDOW_MAX_BYTES: int = Field(default=256 * 1024 * 1024, env="BATCH_WINDOW_MAX_BYTES")  # Member bytes buffered per window
+    
     # File Types
     ALLOWED_FILE_TYPES: List[str] = Field(
         default=["pdb", "pdbqt", "sdf", "mol2", "mol", "sd", "mcif", "mmcif"],
@@ -73,11 +86,41 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FORMAT: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s", env="LOG_FORMAT")
     LOG_FILE: Optional[str] = Field(default=None, env="LOG_FILE")
+    LOG_JSON: bool = Field(default=False, env="LOG_JSON")  # one JSON object per line (StructuredFormatter)
+    LOG_QUEUE_SIZE: int = Field(default=10000, env="LOG_QUEUE_SIZE")  # records buffered for the writer thread; extra are dropped
+    LOG_SAMPLING: str = Field(default="", env="LOG_SAMPLING")  # logger=rate,... fraction of INFO/DEBUG records kept
     
     # Analysis
     SPATIAL_GRID_CELL_SIZE: float = Field(default=5.0, env="SPATIAL_GRID_CELL_SIZE")
     MAX_ATOMS: int = Field(default=100000, env="MAX_ATOMS")
     BOND_TOLERANCE: float = Field(default=0.2, env="BOND_TOLERANCE")
+    INTERACTION_INSERT_BATCH_SIZE: int = Field(default=5000, env="INTERACTION_INSERT_BATCH_SIZE")
+    ATOM_INSERT_BATCH_SIZE: int = Field(default=5000, env="ATOM_INSERT_BATCH_SIZE")
+    
+    ANALYSIS_LOCK_TTL: float = Field(default=60.0, env="ANALYSIS_LOCK_TTL")  # seconds; renewed while the holder runs
+    ANALYSIS_LOCK_WAIT: float = Field(default=600.0, env="ANALYSIS_LOCK_WAIT")  # max wait for another worker's run
+    ANALYSIS_DEADLINE: float = Field(default=120.0, env="ANALYSIS_DEADLINE")  # seconds; 0 disables the default budget
+    ANALYSIS_DEADLINE_MAX: float = Field(default=600.0, env="ANALYSIS_DEADLINE_MAX")  # cap on ?deadline=
+    
+    # Paginated atom / interaction queries
+    QUERY_PAGE_SIZE: int = Field(default=500, env="QUERY_PAGE_SIZE")
+    QUERY_PAGE_MAX: int = Field(default=5000, env="QUERY_PAGE_MAX")
+    EXPORT_CHUNK_ROWS: int = Field(default=5000, env="EXPORT_CHUNK_ROWS")  # Records per streamed export chunk
+    
+    # Level of Detail (visualization)
+    LOD_OCTREE_LEAF_ATOMS: int = Field(default=256, env="LOD_OCTREE_LEAF_ATOMS")  # Target atoms per octree cell
+    LOD_OCTREE_MAX_DEPTH: int = Field(default=6, env="LOD_OCTREE_MAX_DEPTH")
+    LOD_CELL_SAMPLE: int = Field(default=16, env="LOD_CELL_SAMPLE")  # Atoms per cell in the octree tier
+    
+    # Thumbnails (server-side rendering)
+    THUMBNAIL_DIR: str = Field(default="data/cache/thumbnails", env="THUMBNAIL_DIR")
+    THUMBNAIL_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024, env="THUMBNAIL_CACHE_MAX_BYTES")
+    THUMBNAIL_WORKERS: int = Field(default=4, env="THUMBNAIL_WORKERS")  # Render processes
+    THUMBNAIL_MAX_SIZE: int = Field(default=1024, env="THUMBNAIL_MAX_SIZE")  # pixels per side
+    
+    # HTTP caching (ETag / conditional GET)
+    HTTP_CACHE_MAX_AGE: int = Field(default=300, env="HTTP_CACHE_MAX_AGE")  # seconds, settled responses only
+    ETAG_MEMO_ENTRIES: int = Field(default=100000, env="ETAG_MEMO_ENTRIES")  # structure versions kept in memory
     
     # CUDA / GPU
     CUDA_ENABLED: bool = Field(default=False, env="CUDA_ENABLED")
@@ -87,14 +130,51 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(default="dev-secret-key-change-in-production", env="SECRET_KEY")
     ALGORITHM: str = Field(default="HS256", env="ALGORITHM")
     
+    # Profiling (opt-in per request with X-Profile, from clients holding SECRET_KEY)
+    PROFILING_ENABLED: bool = Field(default=False, env="PROFILING_ENABLED")
+    PROFILE_DIR: str = Field(default="data/profiles", env="PROFILE_DIR")
+    PROFILE_MAX_STORED: int = Field(default=50, env="PROFILE_MAX_STORED")  # correlation ids kept
+    PROFILE_SAMPLE_INTERVAL: float = Field(default=0.005, env="PROFILE_SAMPLE_INTERVAL")  # seconds between stack samples
+    
+    # Memory accounting of stages: off, tracemalloc (Python allocations; slows allocation-heavy code) or rss
+    MEMORY_TRACKING: str = Field(default="off", env="MEMORY_TRACKING")
+    MEMORY_SAMPLE_INTERVAL: float = Field(default=0.01, env="MEMORY_SAMPLE_INTERVAL")  # seconds between RSS samples
+    # Predicted peak memory allowed per parse or analysis (0 disables); over it: reject, or partial (analyses only)
+    MEMORY_BUDGET_MB: float = Field(default=0, env="MEMORY_BUDGET_MB")
+    MEMORY_BUDGET_ACTION: str = Field(default="partial", env="MEMORY_BUDGET_ACTION")
+    MEMORY_BYTES_PER_ATOM: int = Field(default=12000, env="MEMORY_BYTES_PER_ATOM")  # prediction floor; tracked peaks raise it
+    
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
-    RATE_LIMIT_PER_USER: int = Field(default=10, env="RATE_LIMIT_PER_USER")
-    RATE_LIMIT_PER_IP: int = Field(default=100, env="RATE_LIMIT_PER_IP")
+    RATE_LIMIT_PER_USER: int = Field(default=10, env="RATE_LIMIT_PER_USER")  # tokens/second per API key
+    RATE_LIMIT_PER_IP: int = Field(default=100, env="RATE_LIMIT_PER_IP")  # tokens/second per client IP
+    RATE_LIMIT_BURST_SECONDS: float = Field(default=10.0, env="RATE_LIMIT_BURST_SECONDS")  # bucket capacity in seconds of refill
+    RATE_LIMIT_ATOMS_PER_TOKEN: int = Field(default=1000, env="RATE_LIMIT_ATOMS_PER_TOKEN")  # compute cost per structure size
+    RATE_LIMIT_BYTES_PER_TOKEN: int = Field(default=1024 * 1024, env="RATE_LIMIT_BYTES_PER_TOKEN")  # upload cost per body size
+    RATE_LIMIT_BACKEND: str = Field(default="auto", env="RATE_LIMIT_BACKEND")  # auto, redis, memory
+    RATE_LIMIT_TRUST_FORWARDED: bool = Field(default=False, env="RATE_LIMIT_TRUST_FORWARDED")  # client IP from X-Forwarded-For
+    RATE_LIMIT_TRUSTED_PROXIES: int = Field(default=1, env="RATE_LIMIT_TRUSTED_PROXIES")  # proxies appending to X-Forwarded-For
     
     # Cache
     CACHE_ENABLED: bool = Field(default=True, env="CACHE_ENABLED")
     CACHE_TTL: int = Field(default=3600, env="CACHE_TTL")
+    CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024, env="CACHE_MAX_BYTES")  # in-process tier
+    CACHE_SHARED_BACKEND: str = Field(default="auto", env="CACHE_SHARED_BACKEND")  # auto, redis, file, none
+    CACHE_SHARED_MAX_BYTES: int = Field(default=2 * 1024 * 1024 * 1024, env="CACHE_SHARED_MAX_BYTES")  # file tier
+    CACHE_DIR: str = Field(default="data/cache/structures", env="CACHE_DIR")
+    
+    # Redis (optional shared store)
+    REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
+    
+    # Background Jobs
+    JOB_BROKER: str = Field(default="auto", env="JOB_BROKER")  # auto, redis, sqlite, memory
+    JOB_QUEUE_PATH: str = Field(default="data/job_queue.sqlite3", env="JOB_QUEUE_PATH")
+    JOB_WORKERS: int = Field(default=2, env="JOB_WORKERS")
+    JOB_EMBEDDED_WORKERS: bool = Field(default=True, env="JOB_EMBEDDED_WORKERS")
+    JOB_MAX_ATTEMPTS: int = Field(default=3, env="JOB_MAX_ATTEMPTS")
+    JOB_RETRY_BACKOFF: float = Field(default=2.0, env="JOB_RETRY_BACKOFF")
+    JOB_VISIBILITY_TIMEOUT: int = Field(default=600, env="JOB_VISIBILITY_TIMEOUT")
+    JOB_ASYNC_THRESHOLD: int = Field(default=1024 * 1024, env="JOB_ASYNC_THRESHOLD")
     
     class Config:
         """Pydantic settings configuration"""
@@ -0,0 +1,213 @@
+"""Binary Frames - Packed Typed-Array Transport for Visualization Data"""
+
+import json
+import struct
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .representations import FRAME_VERSION
+from .structure_arrays import StructureArrays
+
+if TYPE_CHECKING:
+    from .lod import FrameView
+
+# Frame layout (all integers little-endian):
+#
+#   header   16 bytes  magic "BDVZ", version u16, flags u16, section count u32, reserved u32
+#   section  16 bytes  tag (4 ASCII chars), dtype code u8, width u8, reserved u16,
+#                      item count u32, payload length u32
+#            payload   count * width values of the dtype, zero-padded to 8 bytes
+#
+# Every payload starts on an 8-byte boundary, so clients can wrap it in a typed
+# array (Float32Array, Uint32Array, ...) without copying.
+
+FRAME_MAGIC = b"BDVZ"
+
+HEADER = struct.Struct("<4sHHII")
+SECTION_HEADER = struct.Struct("<4sBBHII")
+ALIGNMENT = 8
+
+DTYPE_CODES = {
+    np.dtype("<f4"): 1,
+    np.dtype("u1"): 2,
+    np.dtype("<u2"): 3,
+    np.dtype("<u4"): 4,
+    np.dtype("<i4"): 5,
+}
+DTYPES_BY_CODE = {code: dtype for dtype, code in DTYPE_CODES.items()}
+
+# Sections carrying UTF-8 JSON rather than numbers
+JSON_SECTIONS = {"META"}
+
+# Element codes are atomic numbers; 0 marks an unknown symbol
+ELEMENT_SYMBOLS = (
+    "", "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne",
+    "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar", "K", "Ca",
+    "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn",
+    "Ga", "Ge", "As", "Se", "Br", "Kr", "Rb", "Sr", "Y", "Zr",
+    "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn",
+    "Sb", "Te", "I", "Xe", "Cs", "Ba", "La", "Ce", "Pr", "Nd",
+    "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb",
+    "Lu", "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt", "Au", "Hg",
+    "Tl", "Pb", "Bi", "Po", "At", "Rn", "Fr", "Ra", "Ac", "Th",
+    "Pa", "U", "Np", "Pu", "Am", "Cm", "Bk", "Cf", "Es", "Fm",
+    "Md", "No", "Lr", "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds",
+    "Rg", "Cn", "Nh", "Fl", "Mc", "Lv", "Ts", "Og",
+)
+ELEMENT_NUMBERS = {symbol.upper(): number for number, symbol in enumerate(ELEMENT_SYMBOLS) if symbol}
+
+def element_codes(elements: np.ndarray) -> np.ndarray:
+    """Atomic numbers (uint8) for an array of element symbols"""
+    if len(elements) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    # Map each distinct symbol once instead of every atom
+    symbols, inverse = np.unique(elements, return_inverse=True)
+    lookup = np.array([ELEMENT_NUMBERS.get(str(symbol).strip().upper(), 0) for symbol in symbols], dtype=np.uint8)
+    return lookup[inverse.reshape(-1)]
+
+class FrameWriter:
+    """Accumulates typed-array sections and serializes them into one frame"""
+    
+    def __init__(self, flags: int = 0):
+        self.flags = flags
+        self._sections: List[Tuple[bytes, np.ndarray, int]] = []
+    
+    def add(self, tag: str, array: np.ndarray, dtype: str, width: int = 1) -> "FrameWriter":
+        """Add an array section; width is the number of values per item (3 for xyz, 2 for pairs)"""
+        data = np.ascontiguousarray(array, dtype=np.dtype(dtype))
+        self._sections.append((tag.encode("ascii").ljust(4)[:4], data, width))
+        return self
+    
+    def add_json(self, tag: str, value: Any) -> "FrameWriter":
+        """Add a UTF-8 JSON section (uint8)"""
+        encoded = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        return self.add(tag, np.frombuffer(encoded, dtype=np.uint8), "u1")
+    
+    def to_bytes(self) -> bytes:
+        parts = [HEADER.pack(FRAME_MAGIC, FRAME_VERSION, self.flags, len(self._sections), 0)]
+        for tag, data, width in self._sections:
+            payload = data.tobytes()
+            count = data.size // width if width else 0
+            parts.append(SECTION_HEADER.pack(tag, DTYPE_CODES[data.dtype], width, 0, count, len(payload)))
+            parts.append(payload)
+            padding = -len(payload) % ALIGNMENT
+            if padding:
+                parts.append(b"\0" * padding)
+        return b"".join(parts)
+
+def _read_frame(payload: bytes, start: int) -> Tuple[Dict[str, Any], int]:
+    magic, version, _flags, section_count, _ = HEADER.unpack_from(payload, start)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Not a BioDockViz frame")
+    
+    sections: Dict[str, Any] = {}
+    offset = start + HEADER.size
+    for _ in range(section_count):
+        tag, dtype_code, width, _, count, length = SECTION_HEADER.unpack_from(payload, offset)
+        offset += SECTION_HEADER.size
+        dtype = DTYPES_BY_CODE[dtype_code]
+        data = np.frombuffer(payload, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        name = tag.decode("ascii").strip()
+        if name in JSON_SECTIONS:
+            sections[name] = json.loads(data.tobytes().decode("utf-8"))
+        else:
+            sections[name] = data.reshape(count, width) if width > 1 else data
+        offset += length + (-length % ALIGNMENT)
+    return sections, offset
+
+def decode_frame(payload: bytes) -> Dict[str, np.ndarray]:
+    """Decode a frame into {tag: array}; JSON sections are returned decoded"""
+    return _read_frame(payload, 0)[0]
+
+def iter_frames(payload: bytes) -> Iterator[Dict[str, Any]]:
+    """Decode a stream of concatenated frames (e.g. a record-batch export)"""
+    offset = 0
+    while offset < len(payload):
+        sections, offset = _read_frame(payload, offset)
+        yield sections
+
+def _write_structure_frame(
+    meta: Dict[str, Any],
+    positions: np.ndarray,
+    elements: np.ndarray,
+    bonds: np.ndarray,
+    bond_orders: np.ndarray,
+    atom_indices: Optional[np.ndarray],
+    interaction_pairs: Optional[np.ndarray],
+    interaction_codes: Optional[np.ndarray],
+    interaction_types: Optional[List[str]],
+) -> bytes:
+    meta = dict(meta)
+    meta.update({
+        "atom_count": len(positions),
+        "bond_count": len(bonds),
+        "interaction_count": 0 if interaction_pairs is None else len(interaction_pairs),
+        "interaction_types": interaction_types or [],
+    })
+    writer = FrameWriter()
+    writer.add_json("META", meta)
+    writer.add("POS", positions, "<f4", width=3)
+    writer.add("ELEM", elements, "u1")
+    writer.add("BOND", bonds, "<u4", width=2)
+    writer.add("BORD", bond_orders, "u1")
+    if atom_indices is not None:
+        writer.add("IDX", atom_indices, "<u4")
+    if interaction_pairs is not None:
+        writer.add("INTR", interaction_pairs, "<u4", width=2)
+        writer.add("ITYP", interaction_codes, "u1")
+    return writer.to_bytes()
+
+def encode_structure_frame(
+    arrays: StructureArrays,
+    interaction_pairs: Optional[np.ndarray] = None,
+    interaction_codes: Optional[np.ndarray] = None,
+    interaction_types: Optional[List[str]] = None,
+) -> bytes:
+    """
+    Visualization frame of a whole structure
+    
+    Sections: META (JSON), POS (float32 xyz), ELEM (uint8 atomic numbers),
+    BOND (uint32 index pairs), BORD (uint8 bond orders, 4 = aromatic) and, when interactions
+    are given, INTR (uint32 index pairs) with ITYP (uint8 index into
+    META.interaction_types).
+    """
+    return _write_structure_frame(
+        {"structure_id": arrays.structure_id},
+        arrays.coords,
+        element_codes(arrays.elements),
+        arrays.bonds,
+        np.where(arrays.bond_types == "aromatic", 4, np.rint(arrays.bond_orders)),
+        None,
+        interaction_pairs,
+        interaction_codes,
+        interaction_types,
+    )
+
+def encode_view_frame(
+    structure_id: str,
+    view: "FrameView",
+    interaction_pairs: Optional[np.ndarray] = None,
+    interaction_codes: Optional[np.ndarray] = None,
+    interaction_types: Optional[List[str]] = None,
+) -> bytes:
+    """
+    Visualization frame of a LOD view (core.lod.FrameView)
+    
+    Same sections as a structure frame plus IDX (uint32 global atom index per
+    item). BOND and INTR indices refer to items of the view; interactions
+    must already be restricted to the view and remapped.
+    """
+    meta = {"structure_id": structure_id}
+    meta.update(view.meta)
+    return _write_structure_frame(
+        meta,
+        view.positions,
+        view.elements,
+        view.bonds,
+        view.bond_orders,
+        view.atom_indices,
+        interaction_pairs,
+        interaction_codes,
+        interaction_types,
+    )
@@ -0,0 +1,355 @@
+"""Structure Cache - Two-Tier Read-Through Cache of Decoded Structures"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Awaitable, Tuple
+
+from ..config import settings
+from ..logging_config import get_logger
+
+if TYPE_CHECKING:
+    from .structure_arrays import StructureArrays
+
+logger = get_logger(__name__)
+
+def _decode(payload: bytes) -> "StructureArrays":
+    # Imported on first use so importing the app does not load numpy
+    from .structure_arrays import StructureArrays
+    return StructureArrays.from_bytes(payload)
+
+class CacheTier:
+    """Base class for a cache tier with hit/miss/eviction counters"""
+    
+    name = "tier"
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "tier": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class MemoryTier(CacheTier):
+    """In-process LRU of decoded arrays, bounded by total array bytes"""
+    
+    name = "memory"
+    
+    def __init__(self, max_bytes: int, ttl: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[StructureArrays, float]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional["StructureArrays"]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        arrays, stored_at = entry
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return arrays
+    
+    def put(self, key: str, arrays: "StructureArrays") -> None:
+        self._remove(key)
+        size = arrays.nbytes
+        if size > self.max_bytes:
+            # Never let one huge structure flush the whole cache
+            return
+        
+        self._entries[key] = (arrays, time.monotonic())
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def invalidate(self, key: str) -> None:
+        self._remove(key)
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[0].nbytes
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        })
+        return stats
+
+class FileTier(CacheTier):
+    """
+    Shared tier of .npz files in a local directory (single host, multiple processes)
+    
+    The directory size is tracked as a running total, recounted from disk
+    every RESCAN_WRITES writes (other processes write here too) and whenever
+    it passes max_bytes, which is when the oldest files are pruned.
+    """
+    
+    name = "file"
+    suffix = ".npz"
+    RESCAN_WRITES = 256
+    
+    def __init__(self, directory: str, ttl: int, max_bytes: int):
+        super().__init__()
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._size_lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # unknown until the first write
+        self._writes = 0
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+    
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def _write(self, key: str, payload: bytes) -> int:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Write-then-rename so concurrent readers never see a partial file; the
+        # temporary name is unique so concurrent writes of one key do not collide
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        with self._size_lock:
+            self._writes += 1
+            if self._total_bytes is not None and self._writes % self.RESCAN_WRITES:
+                # Replacing a key over-counts until the next rescan, which errs towards pruning
+                self._total_bytes += len(payload)
+                if self._total_bytes <= self.max_bytes:
+                    return 0
+            return self._prune()
+    
+    def _prune(self) -> int:
+        """Recount the directory and remove the oldest files while over max_bytes (under _size_lock)"""
+        files = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                info = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            files.append((info.st_mtime, info.st_size, path))
+        files.sort(key=lambda entry: entry[0])
+        
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            path.unlink(missing_ok=True)
+            removed += 1
+        self._total_bytes = total
+        return removed
+    
+    async def get(self, key: str) -> Optional["StructureArrays"]:
+        payload = await asyncio.to_thread(self._read, key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(payload)
+    
+    async def put(self, key: str, arrays: "StructureArrays") -> None:
+        self.evictions += await asyncio.to_thread(self._write, key, arrays.to_bytes())
+    
+    async def invalidate(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, True)
+    
+    async def close(self) -> None:
+        pass
+
+class BlobFileTier(FileTier):
+    """File tier of opaque byte payloads (e.g. rendered thumbnails); ttl 0 keeps files until pruned"""
+    
+    name = "blob"
+    
+    def __init__(self, directory: str, ttl: int, max_bytes: int, suffix: str):
+        super().__init__(directory, ttl, max_bytes)
+        self.suffix = suffix
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        payload = await asyncio.to_thread(self._read, key)
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+    
+    async def put(self, key: str, payload: bytes) -> None:
+        self.evictions += await asyncio.to_thread(self._write, key, payload)
+
+class RedisTier(CacheTier):
+    """Shared tier in Redis (multiple hosts); expiry and eviction are left to Redis"""
+    
+    name = "redis"
+    KEY_PREFIX = "biodockviz:structure:"
+    
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis_asyncio
+        
+        super().__init__()
+        self.ttl = ttl
+        self.client = redis_asyncio.from_url(url)
+    
+    async def get(self, key: str) -> Optional["StructureArrays"]:
+        payload = await self.client.get(self.KEY_PREFIX + key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(payload)
+    
+    async def put(self, key: str, arrays: "StructureArrays") -> None:
+        await self.client.set(self.KEY_PREFIX + key, arrays.to_bytes(), ex=self.ttl or None)
+    
+    async def invalidate(self, key: str) -> None:
+        await self.client.delete(self.KEY_PREFIX + key)
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+class StructureCache:
+    """
+    Read-through cache of decoded structure arrays
+    
+    Lookups go to the in-process LRU first, then the shared tier (Redis or
+    local files), then the loader; values found in a lower tier are promoted.
+    Shared-tier failures are logged and treated as misses.
+    """
+    
+    def __init__(self, memory: MemoryTier, shared: Optional[CacheTier] = None, enabled: bool = True):
+        self.memory = memory
+        self.shared = shared
+        self.enabled = enabled
+        self.loads = 0
+    
+    @classmethod
+    def from_settings(cls) -> "StructureCache":
+        memory = MemoryTier(settings.CACHE_MAX_BYTES, settings.CACHE_TTL)
+        backend = settings.CACHE_SHARED_BACKEND.lower()
+        shared: Optional[CacheTier] = None
+        
+        if backend in ("auto", "redis") and settings.REDIS_URL:
+            try:
+                shared = RedisTier(settings.REDIS_URL, settings.CACHE_TTL)
+            except ImportError:
+                if backend == "redis":
+                    raise
+                logger.warning("REDIS_URL is set but the redis package is not installed; using file cache tier")
+        
+        if shared is None and backend in ("auto", "file"):
+            shared = FileTier(settings.CACHE_DIR, settings.CACHE_TTL, settings.CACHE_SHARED_MAX_BYTES)
+        
+        return cls(memory, shared, enabled=settings.CACHE_ENABLED)
+    
+    async def get_or_load(
+        self,
+        structure_id: Any,
+        loader: Callable[[], Awaitable[Optional["StructureArrays"]]],
+    ) -> Optional["StructureArrays"]:
+        """Return cached arrays for a structure, calling loader on a miss (None results are not cached)"""
+        if not self.enabled:
+            return await loader()
+        
+        key = str(structure_id)
+        arrays = self.memory.get(key)
+        if arrays is not None:
+            return arrays
+        
+        if self.shared is not None:
+            try:
+                arrays = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed for {key}: {e}")
+            if arrays is not None:
+                self.memory.put(key, arrays)
+                return arrays
+        
+        arrays = await loader()
+        self.loads += 1
+        if arrays is None:
+            return None
+        
+        await self.put(key, arrays)
+        return arrays
+    
+    async def put(self, structure_id: Any, arrays: "StructureArrays") -> None:
+        """Store (or replace) a structure in both tiers, e.g. right after parsing"""
+        if not self.enabled:
+            return
+        
+        key = str(structure_id)
+        self.memory.put(key, arrays)
+        if self.shared is not None:
+            try:
+                await self.shared.put(key, arrays)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed for {key}: {e}")
+    
+    async def invalidate(self, structure_id: Any) -> None:
+        """Drop a structure from both tiers (call after it is re-parsed)"""
+        if not self.enabled:
+            return
+        
+        key = str(structure_id)
+        self.memory.invalidate(key)
+        if self.shared is not None:
+            try:
+                await self.shared.invalidate(key)
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed for {key}: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and eviction counters per tier"""
+        return {
+            "enabled": self.enabled,
+            "loads": self.loads,
+            "memory": self.memory.stats(),
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+    
+    async def close(self) -> None:
+        if self.shared is not None:
+            await self.shared.close()
+
+structure_cache = StructureCache.from_settings()
@@ -0,0 +1,82 @@
+"""Deadlines - Time Budgets and Cooperative Cancellation of Long-Running Work"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Optional
+
+from fastapi import Request
+
+from ..logging_config import get_logger
+from .exceptions import CancelledException
+
+logger = get_logger(__name__)
+
+class Deadline:
+    """
+    Time budget and cancellation flag for work running in a worker thread
+    
+    Threads cannot be interrupted, so the work checks stop_reason() between
+    chunks and winds down on its own; cancel() may be called from any thread
+    (typically the event loop, when the request that wanted the result goes).
+    """
+    
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds if seconds else None
+        self._cancelled = threading.Event()
+    
+    def cancel(self) -> None:
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+    
+    def stop_reason(self) -> Optional[str]:
+        """'cancelled' or 'deadline' once the work should stop, otherwise None"""
+        if self.cancelled:
+            return "cancelled"
+        if self.expired:
+            return "deadline"
+        return None
+    
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[Any]) -> Any:
+    """
+    Await work, cancelling it if the client disconnects first
+    
+    For endpoints that do not read the request body (the watcher consumes
+    it). Raises CancelledException (code CLIENT_DISCONNECTED) on disconnect;
+    the cancellation reaches the work as asyncio.CancelledError.
+    """
+    task = asyncio.ensure_future(work)
+    # Blocks on receive() rather than polling is_disconnected(), which cannot
+    # see a disconnect through BaseHTTPMiddleware
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        if watcher.exception() is not None:
+            # Cannot tell whether the client is there; just finish the work
+            return await task
+        logger.info(f"Client disconnected, cancelling {request.method} {request.url.path}")
+        raise CancelledException(message="Client disconnected", code="CLIENT_DISCONNECTED")
+    finally:
+        for pending in (task, watcher):
+            if not pending.done():
+                pending.cancel()
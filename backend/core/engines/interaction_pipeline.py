@@ -1,109 +1,165 @@
 """Interaction Pipeline - Handles Scientific Analysis"""
 
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple
 import math
 
-from ..spatial_hash import SpatialHashGrid
-from ..logging_config import get_logger
+from .molecular_engine import MolecularContext
+from .thresholds import AnalysisThresholds
+from ..deadline import Deadline
+from ..exceptions import CancelledException
+from ..tracing import span
+from ...logging_config import get_logger
 
 logger = get_logger(__name__)
 
-class AnalysisThresholds:
-    """Analysis thresholds (literature-based)"""
+@dataclass(frozen=True)
+class Coverage:
+    """How much of a structure an analysis got through before it stopped"""
     
-    def __init__(self):
-        self.HYDROGEN_BOND = {
-            'min': 1.5, 'max': 2.5, 'angle_min': 120,
-            'donors': ['N', 'O', 'S', 'F', 'Cl', 'Br', 'I'],
-            'acceptors': ['N', 'O', 'S', 'F', 'Cl', 'Br', 'I'],
-        }
-        
-        self.SALT_BRIDGE = {
-            'distance_max': 4.0,
-            'positive_residues': ['LYS', 'ARG', 'HIS', 'LYS+', 'ARG+', 'HIS+'],
-            'negative_residues': ['ASP', 'GLU', 'ASP-', 'GLU-'],
-        }
-        
-        self.VDW = {'min': 0.7, 'max': 1.1}
-        
-        self.VDW_RADII = {
-            'H': 1.20, 'C': 1.70, 'N': 1.55, 'O': 1.52,
-            'F': 1.47, 'P': 1.80, 'S': 1.80, 'Cl': 1.75,
-            'Br': 1.85, 'I': 1.98, 'Fe': 2.00, 'Mg': 1.73,
-            'Ca': 2.31, 'Mn': 2.00, 'Zn': 1.39,
-        }
+    atoms_covered: int  # atoms whose neighbourhoods were searched
+    atom_count: int
+    cells_covered: int  # spatial grid cells (the chunks deadlines are checked between)
+    cell_count: int
+    stopped: Optional[str] = None  # 'deadline' or 'memory_budget' when cut short
+    
+    @property
+    def complete(self) -> bool:
+        return self.cells_covered == self.cell_count
     
     def dict(self) -> Dict:
         return {
-            'hydrogen_bond': self.HYDROGEN_BOND,
-            'salt_bridge': self.SALT_BRIDGE,
-            'vdw': self.VDW,
+            'complete': self.complete,
+            'fraction': round(self.atoms_covered / self.atom_count, 4) if self.atom_count else 1.0,
+            'atoms_covered': self.atoms_covered,
+            'atom_count': self.atom_count,
+            'cells_covered': self.cells_covered,
+            'cell_count': self.cell_count,
+            'stopped': self.stopped,
         }
 
 class InteractionPipeline:
-    """Interaction pipeline for scientific analysis"""
+    """
+    Interaction pipeline for scientific analysis
+    
+    Holds only read-only thresholds; everything about a structure comes in
+    through its MolecularContext, so one pipeline can serve concurrent
+    analyses from any number of threads.
+    """
     
-    def __init__(self):
-        self.thresholds = AnalysisThresholds()
+    def __init__(self, thresholds: Optional[AnalysisThresholds] = None):
+        self.thresholds = thresholds or AnalysisThresholds()
     
-    def analyze(self, atoms: List[dict], bonds: List[dict]) -> Dict[str, List[dict]]:
+    def analyze_atoms(self, atoms: List[dict], bonds: Optional[List[dict]] = None) -> Dict[str, List[dict]]:
+        """Analyze one structure in a context of its own, released when the call returns"""
+        return self.analyze(MolecularContext.build(atoms, bonds))
+    
+    def analyze(self, context: MolecularContext) -> Dict[str, List[dict]]:
         """Analyze molecular interactions"""
+        return self.analyze_partial(context)[0]
+    
+    def analyze_partial(
+        self,
+        context: MolecularContext,
+        deadline: Optional[Deadline] = None,
+        atom_limit: Optional[int] = None,
+    ) -> Tuple[Dict[str, List[dict]], Coverage]:
+        """
+        Analyze molecular interactions one spatial grid cell at a time
+        
+        The deadline is checked between cells: past it, the interactions
+        found so far are returned with their coverage; once cancelled,
+        CancelledException is raised. Likewise the analysis stops once
+        atom_limit atoms are covered (a memory budget allowance). Each pair
+        is found from the cell of its lower-indexed atom, so a partial
+        result holds every interaction of the covered atoms with
+        higher-indexed partners.
+        """
+        with span("classification"):
+            return self._classify(context, deadline, atom_limit)
+    
+    def _classify(
+        self,
+        context: MolecularContext,
+        deadline: Optional[Deadline],
+        atom_limit: Optional[int],
+    ) -> Tuple[Dict[str, List[dict]], Coverage]:
+        atoms: Sequence[dict] = context.atoms
         logger.info(f"Analyzing {len(atoms)} atoms")
         
         interactions = {'hydrogen_bonds': [], 'vdw_contacts': [], 'salt_bridges': []}
-        seen_atom_pairs = set()
-        grid = SpatialHashGrid(atoms)
+        grid = context.spatial_grid
+        cells = list(grid.grid.values())
+        atoms_covered = 0
+        cells_covered = 0
+        stopped = None
         
-        for i in range(len(atoms)):
-            atom1 = atoms[i]
-            neighbors = grid.get_neighbors(i, atoms)
+        for cell in cells:
+            if deadline is not None:
+                stopped = deadline.stop_reason()
+                if stopped == "cancelled":
+                    raise CancelledException(message="Analysis cancelled", code="ANALYSIS_CANCELLED")
+                if stopped is not None:
+                    logger.warning(f"Analysis deadline of {deadline.seconds}s reached after {cells_covered}/{len(cells)} cells")
+                    break
+            if atom_limit is not None and atoms_covered >= atom_limit:
+                stopped = "memory_budget"
+                logger.warning(f"Analysis memory allowance of {atom_limit} atoms reached after {cells_covered}/{len(cells)} cells")
+                break
             
-            for j in neighbors:
-                if j <= i:
-                    continue
-                
-                atom2 = atoms[j]
-                pair_key = tuple(sorted([i, j]))
-                
-                if pair_key in seen_atom_pairs:
-                    continue
-                
-                seen_atom_pairs.add(pair_key)
-                distance = self._calculate_distance(atom1, atom2)
-                
-                if self._is_hydrogen_bond(atom1, atom2, distance):
-                    interactions['hydrogen_bonds'].append({
-                        'atom1_index': i, 'atom2_index': j, 'distance': distance,
-                        'angle': self._calculate_angle(atom1, atom2, atoms, i, j),
-                        'atom1_residue': atom1.get('res_name', ''),
-                        'atom1_residue_seq': atom1.get('res_seq', 0),
-                        'atom2_residue': atom2.get('res_name', ''),
-                        'atom2_residue_seq': atom2.get('res_seq', 0),
-                        'confidence': 1.0,
-                    })
-                
-                if self._is_salt_bridge(atom1, atom2, distance):
-                    interactions['salt_bridges'].append({
-                        'atom1_index': i, 'atom2_index': j, 'distance': distance,
-                        'atom1_residue': atom1.get('res_name', ''),
-                        'atom1_residue_seq': atom1.get('res_seq', 0),
-                        'atom2_residue': atom2.get('res_name', ''),
-                        'atom2_residue_seq': atom2.get('res_seq', 0),
-                        'confidence': 1.0,
-                    })
-                
-                if self._is_vdw_contact(atom1, atom2, distance):
-                    interactions['vdw_contacts'].append({
-                        'atom1_index': i, 'atom2_index': j, 'distance': distance,
-                        'atom1_residue': atom1.get('res_name', ''),
-                        'atom1_residue_seq': atom1.get('res_seq', 0),
-                        'atom2_residue': atom2.get('res_name', ''),
-                        'atom2_residue_seq': atom2.get('res_seq', 0),
-                        'confidence': 1.0,
-                    })
+            for i in cell:
+                self._analyze_atom(i, atoms, grid, interactions)
+            atoms_covered += len(cell)
+            cells_covered += 1
+        
+        # Cells are visited in grid order; report pairs in atom order
+        for records in interactions.values():
+            records.sort(key=lambda record: (record['atom1_index'], record['atom2_index']))
         
         logger.info(f"Found {len(interactions['hydrogen_bonds'])} H-bonds")
-        return interactions
+        return interactions, Coverage(atoms_covered, len(atoms), cells_covered, len(cells), stopped)
+    
+    def _analyze_atom(self, i: int, atoms: Sequence[dict], grid, interactions: Dict[str, List[dict]]) -> None:
+        """Interactions of atom i with its higher-indexed neighbours"""
+        atom1 = atoms[i]
+        
+        for j in grid.get_neighbors(i, atoms):
+            if j <= i:
+                continue
+            
+            atom2 = atoms[j]
+            distance = self._calculate_distance(atom1, atom2)
+            
+            if self._is_hydrogen_bond(atom1, atom2, distance):
+                interactions['hydrogen_bonds'].append({
+                    'atom1_index': i, 'atom2_index': j, 'distance': distance,
+                    'angle': self._calculate_angle(atom1, atom2, atoms, i, j),
+                    'atom1_residue': atom1.get('res_name', ''),
+                    'atom1_residue_seq': atom1.get('res_seq', 0),
+                    'atom2_residue': atom2.get('res_name', ''),
+                    'atom2_residue_seq': atom2.get('res_seq', 0),
+                    'confidence': 1.0,
+                })
+            
+            if self._is_salt_bridge(atom1, atom2, distance):
+                interactions['salt_bridges'].append({
+                    'atom1_index': i, 'atom2_index': j, 'distance': distance,
+                    'atom1_residue': atom1.get('res_name', ''),
+                    'atom1_residue_seq': atom1.get('res_seq', 0),
+                    'atom2_residue': atom2.get('res_name', ''),
+                    'atom2_residue_seq': atom2.get('res_seq', 0),
+                    'confidence': 1.0,
+                })
+            
+            if self._is_vdw_contact(atom1, atom2, distance):
+                interactions['vdw_contacts'].append({
+                    'atom1_index': i, 'atom2_index': j, 'distance': distance,
+                    'atom1_residue': atom1.get('res_name', ''),
+                    'atom1_residue_seq': atom1.get('res_seq', 0),
+                    'atom2_residue': atom2.get('res_name', ''),
+                    'atom2_residue_seq': atom2.get('res_seq', 0),
+                    'confidence': 1.0,
+                })
     
     def _calculate_distance(self, atom1: dict, atom2: dict) -> float:
         dx = atom1['x'] - atom2['x']
@@ -144,5 +200,5 @@ class InteractionPipeline:
         
         return min_dist <= distance <= max_dist
     
-    def _calculate_angle(self, atom1: dict, atom2: dict, atoms: List[dict], i: int, j: int) -> Optional[float]:
+    def _calculate_angle(self, atom1: dict, atom2: dict, atoms: Sequence[dict], i: int, j: int) -> Optional[float]:
         return None  # Simplified for now
@@ -1,98 +1,54 @@
 """Molecular Engine - Handles Atoms and Bonds"""
 
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Dict, Optional, Tuple
 import math
 
 from ..spatial_hash import SpatialHashGrid
-from ..logging_config import get_logger
+from ..tracing import span
+from ...logging_config import get_logger
 
 logger = get_logger(__name__)
 
-class MolecularEngine:
-    """Molecular engine for handling atoms and bonds"""
+COVALENT_RADII = {
+    'H': 0.31, 'C': 0.76, 'N': 0.71, 'O': 0.66,
+    'F': 0.57, 'P': 1.07, 'S': 1.05, 'Cl': 1.02,
+    'Br': 1.20, 'I': 1.39, 'Fe': 1.32, 'Mg': 1.30,
+    'Ca': 1.67, 'Mn': 1.39, 'Zn': 1.31,
+}
+
+@dataclass(frozen=True)
+class MolecularContext:
+    """
+    Immutable per-structure analysis context: atoms, bonds and their spatial grid
     
-    def __init__(self):
-        self.atoms = []
-        self.bonds = []
-        self.spatial_grid: Optional[SpatialHashGrid] = None
-        
-        self.COVALENT_RADII = {
-            'H': 0.31, 'C': 0.76, 'N': 0.71, 'O': 0.66,
-            'F': 0.57, 'P': 1.07, 'S': 1.05, 'Cl': 1.02,
-            'Br': 1.20, 'I': 1.39, 'Fe': 1.32, 'Mg': 1.30,
-            'Ca': 1.67, 'Mn': 1.39, 'Zn': 1.31,
-        }
+    Built for one analysis and never modified afterwards, so a context can be
+    read from several threads or pickled to a worker process, and nothing of a
+    structure outlives the analysis that built it: dropping the context frees
+    its atoms and grid. Engines and pipelines hold no per-structure state.
+    """
     
-    def initialize(self, atoms: List[dict], bonds: List[dict] = None) -> None:
-        """Initialize molecular engine with atoms and bonds"""
-        logger.info(f"Initializing molecular engine with {len(atoms)} atoms")
-        
-        self.atoms = atoms
-        self.bonds = bonds if bonds else []
-        self.spatial_grid = SpatialHashGrid(atoms)
-        
-        if not self.bonds:
-            logger.info("Detecting bonds...")
-            self.bonds = self._detect_bonds_optimized()
+    atoms: Tuple[dict, ...]
+    given_bonds: Tuple[dict, ...]
+    spatial_grid: SpatialHashGrid
     
-    def _detect_bonds_optimized(self) -> List[dict]:
-        """Detect bonds using spatial hashing (O(n) complexity)"""
-        bonds = []
-        seen_atom_pairs = set()
-        
-        for i in range(len(self.atoms)):
-            atom1 = self.atoms[i]
-            neighbors = self.spatial_grid.get_neighbors(i, self.atoms)
-            
-            for j in neighbors:
-                if j <= i:
-                    continue
-                
-                atom2 = self.atoms[j]
-                pair_key = tuple(sorted([i, j]))
-                
-                if pair_key in seen_atom_pairs:
-                    continue
-                
-                seen_atom_pairs.add(pair_key)
-                distance = self._calculate_distance(atom1, atom2)
-                
-                r1 = self.COVALENT_RADII.get(atom1.get('element', 'C'), 0.76)
-                r2 = self.COVALENT_RADII.get(atom2.get('element', 'C'), 0.76)
-                covalent_distance = r1 + r2
-                
-                if distance > 0.5 and distance <= covalent_distance + 0.2:
-                    ratio = distance / covalent_distance
-                    bond_type = "single"
-                    bond_order = 1
-                    
-                    if ratio <= 0.9:
-                        bond_type = "triple"
-                        bond_order = 3
-                    elif ratio <= 0.95:
-                        bond_type = "double"
-                        bond_order = 2
-                    elif ratio >= 1.0 and ratio <= 1.1:
-                        bond_type = "aromatic"
-                        bond_order = 1.5
-                    
-                    bonds.append({
-                        'atom1_index': i,
-                        'atom2_index': j,
-                        'type': bond_type,
-                        'order': bond_order,
-                        'distance': distance,
-                    })
-        
-        logger.info(f"Detected {len(bonds)} bonds")
-        return bonds
+    @classmethod
+    def build(cls, atoms: List[dict], bonds: Optional[List[dict]] = None) -> "MolecularContext":
+        """Context of one structure (atom dicts are shared with the caller and must not be modified)"""
+        logger.info(f"Building molecular context with {len(atoms)} atoms")
+        with span("grid_build"):
+            spatial_grid = SpatialHashGrid(atoms)
+        return cls(atoms=tuple(atoms), given_bonds=tuple(bonds or ()), spatial_grid=spatial_grid)
     
-    def _calculate_distance(self, atom1: dict, atom2: dict) -> float:
-        """Calculate Euclidean distance between two atoms"""
-        dx = atom1['x'] - atom2['x']
-        dy = atom1['y'] - atom2['y']
-        dz = atom1['z'] - atom2['z']
-        return math.sqrt(dx**2 + dy**2 + dz**2)
+    @cached_property
+    def bonds(self) -> Tuple[dict, ...]:
+        """Bonds of the structure, detected from distances on first use when none were given"""
+        if self.given_bonds:
+            return self.given_bonds
+        logger.info("Detecting bonds...")
+        with span("bond_detection"):
+            return tuple(detect_bonds(self.atoms, self.spatial_grid))
     
     def get_bounding_box(self) -> Dict[str, float]:
         """Calculate bounding box of molecule"""
@@ -119,3 +75,62 @@ class MolecularEngine:
         zs = [atom['z'] for atom in self.atoms]
         
         return {'x': sum(xs) / len(xs), 'y': sum(ys) / len(ys), 'z': sum(zs) / len(zs)}
+
+def detect_bonds(atoms: Tuple[dict, ...], spatial_grid: SpatialHashGrid) -> List[dict]:
+    """Detect bonds using spatial hashing (O(n) complexity)"""
+    bonds = []
+    seen_atom_pairs = set()
+    
+    for i in range(len(atoms)):
+        atom1 = atoms[i]
+        neighbors = spatial_grid.get_neighbors(i, atoms)
+        
+        for j in neighbors:
+            if j <= i:
+                continue
+            
+            atom2 = atoms[j]
+            pair_key = tuple(sorted([i, j]))
+            
+            if pair_key in seen_atom_pairs:
+                continue
+            
+            seen_atom_pairs.add(pair_key)
+            distance = _calculate_distance(atom1, atom2)
+            
+            r1 = COVALENT_RADII.get(atom1.get('element', 'C'), 0.76)
+            r2 = COVALENT_RADII.get(atom2.get('element', 'C'), 0.76)
+            covalent_distance = r1 + r2
+            
+            if distance > 0.5 and distance <= covalent_distance + 0.2:
+                ratio = distance / covalent_distance
+                bond_type = "single"
+                bond_order = 1
+                
+                if ratio <= 0.9:
+                    bond_type = "triple"
+                    bond_order = 3
+                elif ratio <= 0.95:
+                    bond_type = "double"
+                    bond_order = 2
+                elif ratio >= 1.0 and ratio <= 1.1:
+                    bond_type = "aromatic"
+                    bond_order = 1.5
+                
+                bonds.append({
+                    'atom1_index': i,
+                    'atom2_index': j,
+                    'type': bond_type,
+                    'order': bond_order,
+                    'distance': distance,
+                })
+    
+    logger.info(f"Detected {len(bonds)} bonds")
+    return bonds
+
+def _calculate_distance(atom1: dict, atom2: dict) -> float:
+    """Calculate Euclidean distance between two atoms"""
+    dx = atom1['x'] - atom2['x']
+    dy = atom1['y'] - atom2['y']
+    dz = atom1['z'] - atom2['z']
+    return math.sqrt(dx**2 + dy**2 + dz**2)
@@ -0,0 +1,48 @@
+"""Analysis Thresholds - Numpy-Free Parameters and Version Keying Analysis Results"""
+
+import copy
+import hashlib
+import json
+from typing import Dict
+
+# Bump whenever the pipeline can produce different results for the same input;
+# cached responses (ETags) are keyed on it
+ALGORITHM_VERSION = "1"
+
+class AnalysisThresholds:
+    """Analysis thresholds (literature-based)"""
+    
+    def __init__(self):
+        self.HYDROGEN_BOND = {
+            'min': 1.5, 'max': 2.5, 'angle_min': 120,
+            'donors': ['N', 'O', 'S', 'F', 'Cl', 'Br', 'I'],
+            'acceptors': ['N', 'O', 'S', 'F', 'Cl', 'Br', 'I'],
+        }
+        
+        self.SALT_BRIDGE = {
+            'distance_max': 4.0,
+            'positive_residues': ['LYS', 'ARG', 'HIS', 'LYS+', 'ARG+', 'HIS+'],
+            'negative_residues': ['ASP', 'GLU', 'ASP-', 'GLU-'],
+        }
+        
+        self.VDW = {'min': 0.7, 'max': 1.1}
+        
+        self.VDW_RADII = {
+            'H': 1.20, 'C': 1.70, 'N': 1.55, 'O': 1.52,
+            'F': 1.47, 'P': 1.80, 'S': 1.80, 'Cl': 1.75,
+            'Br': 1.85, 'I': 1.98, 'Fe': 2.00, 'Mg': 1.73,
+            'Ca': 2.31, 'Mn': 2.00, 'Zn': 1.39,
+        }
+    
+    def dict(self) -> Dict:
+        """Copy of the thresholds (callers cannot alter the ones analyses run with)"""
+        return copy.deepcopy({
+            'hydrogen_bond': self.HYDROGEN_BOND,
+            'salt_bridge': self.SALT_BRIDGE,
+            'vdw': self.VDW,
+        })
+    
+    def fingerprint(self) -> str:
+        """Short stable hash of every threshold, including the VdW radii"""
+        values = dict(self.dict(), vdw_radii=self.VDW_RADII)
+        return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
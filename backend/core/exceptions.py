@@ -83,3 +83,11 @@ class ForbiddenException(BioDockVizException):
 class NotFoundException(BioDockVizException):
     """Not found exception"""
     pass
+
+class CancelledException(BioDockVizException):
+    """Operation cancelled (client disconnected or deadline exceeded)"""
+    pass
+
+class MemoryBudgetException(BioDockVizException):
+    """Work predicted to exceed the memory budget"""
+    pass
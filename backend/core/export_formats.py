@@ -0,0 +1,210 @@
+"""Export Formats - Chunked PDB, SDF, CSV and Frame Writers"""
+
+import csv
+import io
+import string
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .binary_frame import FrameWriter
+from .structure_arrays import StructureArrays
+
+# Every writer yields the file in pieces of at most `chunk_rows` records, so the
+# whole file is never held in memory.
+
+STANDARD_RESIDUES = frozenset((
+    "ALA", "ARG", "ASN", "ASP", "CYS", "GLN", "GLU", "GLY", "HIS", "ILE",
+    "LEU", "LYS", "MET", "PHE", "PRO", "SER", "THR", "TRP", "TYR", "VAL",
+    "SEC", "PYL", "A", "C", "G", "U", "I", "DA", "DC", "DG", "DT", "DI",
+))
+
+# SDF bond orders; aromatic bonds use the query order 4
+SDF_BOND_ORDERS = {"single": 1, "double": 2, "triple": 3, "aromatic": 4}
+
+_HY36_UPPER = string.digits + string.ascii_uppercase
+_HY36_LOWER = string.digits + string.ascii_lowercase
+
+def hy36(width: int, value: int) -> str:
+    """Hybrid-36 encoding for PDB serial (width 5) and residue (width 4) fields beyond their decimal range"""
+    if -10 ** (width - 1) < value < 10 ** width:
+        return str(value).rjust(width)
+    value -= 10 ** width
+    block = 26 * 36 ** (width - 1)
+    digits = _HY36_UPPER
+    if value >= block:
+        value -= block
+        digits = _HY36_LOWER
+    if value >= block:
+        raise ValueError("Value out of hybrid-36 range")
+    value += 10 * 36 ** (width - 1)
+    encoded = ""
+    while value:
+        value, digit = divmod(value, 36)
+        encoded = digits[digit] + encoded
+    return encoded
+
+def _pdb_atom_name(name: str, element: str) -> str:
+    # Names of one-letter elements start in column 14 unless they fill all four columns
+    if len(name) < 4 and len(element.strip()) == 1:
+        return f" {name:<3}"
+    return f"{name:<4}"[:4]
+
+def _pdb_charge(charge: float) -> str:
+    value = int(round(charge))
+    if value == 0:
+        return "  "
+    return f"{abs(value)}{'+' if value > 0 else '-'}"
+
+def _adjacency(arrays: StructureArrays):
+    """Neighbour lists of every atom as (order, starts) into the doubled bond list"""
+    pairs = np.concatenate((arrays.bonds, arrays.bonds[:, ::-1])) if arrays.bond_count else np.zeros((0, 2), dtype=np.int32)
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    neighbours = pairs[order, 1]
+    starts = np.searchsorted(pairs[order, 0], np.arange(arrays.atom_count + 1))
+    return neighbours, starts
+
+def iter_pdb(arrays: StructureArrays, remarks: Sequence[str] = (), chunk_rows: int = 5000) -> Iterator[str]:
+    """PDB coordinates followed by CONECT records for every bond"""
+    header = [f"REMARK 250 {remark}"[:80] for remark in remarks]
+    if header:
+        yield "\n".join(header) + "\n"
+    
+    n = arrays.atom_count
+    serials = arrays.serials.tolist()
+    for start in range(0, n, chunk_rows):
+        window = slice(start, start + chunk_rows)
+        columns = zip(
+            serials[window], arrays.names[window].tolist(), arrays.elements[window].tolist(),
+            arrays.alt_locs[window].tolist(), arrays.res_names[window].tolist(), arrays.chain_ids[window].tolist(),
+            arrays.res_seqs[window].tolist(), arrays.i_codes[window].tolist(), arrays.coords[window].tolist(),
+            arrays.occupancy[window].tolist(), arrays.temp_factor[window].tolist(), arrays.charge[window].tolist(),
+        )
+        lines = []
+        for serial, name, element, alt_loc, res_name, chain_id, res_seq, i_code, (x, y, z), occupancy, temp_factor, charge in columns:
+            element = str(element).strip()
+            lines.append(
+                f"{'ATOM' if res_name in STANDARD_RESIDUES else 'HETATM':<6}{hy36(5, serial)} "
+                f"{_pdb_atom_name(str(name), element)}{str(alt_loc)[:1]:1}{res_name:>3} "
+                f"{str(chain_id)[:1]:1}{hy36(4, res_seq)}{str(i_code)[:1]:1}   "
+                f"{x:8.3f}{y:8.3f}{z:8.3f}{occupancy:6.2f}{temp_factor:6.2f}"
+                f"          {element.upper():>2}{_pdb_charge(charge)}"
+            )
+        yield "\n".join(lines) + "\n"
+    
+    neighbours, starts = _adjacency(arrays)
+    for start in range(0, n, chunk_rows):
+        lines = []
+        for i in range(start, min(start + chunk_rows, n)):
+            bonded = neighbours[starts[i]:starts[i + 1]].tolist()
+            for k in range(0, len(bonded), 4):
+                lines.append("CONECT" + hy36(5, serials[i]) + "".join(hy36(5, serials[j]) for j in bonded[k:k + 4]))
+        if lines:
+            yield "\n".join(lines) + "\n"
+    
+    yield "END\n"
+
+def _sdf_properties(properties: Dict[str, Any]) -> str:
+    return "".join(f"> <{key}>\n{value}\n\n" for key, value in properties.items() if value is not None)
+
+def iter_sdf(
+    arrays: StructureArrays,
+    title: str = "",
+    properties: Optional[Dict[str, Any]] = None,
+    chunk_rows: int = 5000,
+) -> Iterator[str]:
+    """MDL molfile (V2000 up to 999 atoms and bonds, V3000 beyond) with an SD property block"""
+    n, m = arrays.atom_count, arrays.bond_count
+    bond_orders = [
+        SDF_BOND_ORDERS.get(str(bond_type), int(round(order)) or 1)
+        for bond_type, order in zip(arrays.bond_types.tolist(), arrays.bond_orders.tolist())
+    ]
+    elements = [str(element).strip() or "C" for element in arrays.elements.tolist()]
+    yield f"{title[:80]}\n  BioDockViz\n\n"
+    
+    if n <= 999 and m <= 999:
+        yield f"{n:>3}{m:>3}  0  0  0  0  0  0  0  0999 V2000\n"
+        for start in range(0, n, chunk_rows):
+            yield "".join(
+                f"{x:>10.4f}{y:>10.4f}{z:>10.4f} {elements[i]:<3} 0  0  0  0  0  0  0  0  0  0  0  0\n"
+                for i, (x, y, z) in enumerate(arrays.coords[start:start + chunk_rows].tolist(), start)
+            )
+        for start in range(0, m, chunk_rows):
+            yield "".join(
+                f"{a + 1:>3}{b + 1:>3}{bond_orders[k]:>3}  0  0  0  0\n"
+                for k, (a, b) in enumerate(arrays.bonds[start:start + chunk_rows].tolist(), start)
+            )
+        charged = [(i + 1, int(round(c))) for i, c in enumerate(arrays.charge.tolist()) if round(c)]
+        for start in range(0, len(charged), 8):
+            group = charged[start:start + 8]
+            yield f"M  CHG{len(group):>3}" + "".join(f" {i:>3} {c:>3}" for i, c in group) + "\n"
+    else:
+        yield "  0  0  0     0  0            999 V3000\nM  V30 BEGIN CTAB\n"
+        yield f"M  V30 COUNTS {n} {m} 0 0 0\nM  V30 BEGIN ATOM\n"
+        charges = arrays.charge.tolist()
+        for start in range(0, n, chunk_rows):
+            yield "".join(
+                f"M  V30 {i + 1} {elements[i]} {x:.4f} {y:.4f} {z:.4f} 0"
+                + (f" CHG={int(round(charges[i]))}" if round(charges[i]) else "") + "\n"
+                for i, (x, y, z) in enumerate(arrays.coords[start:start + chunk_rows].tolist(), start)
+            )
+        yield "M  V30 END ATOM\nM  V30 BEGIN BOND\n"
+        for start in range(0, m, chunk_rows):
+            yield "".join(
+                f"M  V30 {k + 1} {bond_orders[k]} {a + 1} {b + 1}\n"
+                for k, (a, b) in enumerate(arrays.bonds[start:start + chunk_rows].tolist(), start)
+            )
+        yield "M  V30 END BOND\nM  V30 END CTAB\n"
+    
+    yield "M  END\n" + _sdf_properties(properties or {}) + "$$$$\n"
+
+def csv_chunk(rows: Iterable[Sequence[Any]], header: Optional[Sequence[str]] = None) -> str:
+    """CSV text of a batch of rows (with the header line for the first batch)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def interaction_frame(rows: List[dict], types: List[str], chunk: int) -> bytes:
+    """
+    One record batch of interactions as a BDVZ frame
+    
+    Sections: META (chunk number, type names, residue names), A1/A2 (uint32 atom
+    indices), TYPE (uint8 into META.types), DIST/ANGL/CONF (float32, NaN when
+    missing), R1/R2 (uint16 into META.residues), R1SQ/R2SQ (int32 residue numbers).
+    """
+    residues = sorted({row["atom1_residue"] or "" for row in rows} | {row["atom2_residue"] or "" for row in rows})
+    residue_codes = {name: code for code, name in enumerate(residues)}
+    type_codes = {name: code for code, name in enumerate(types)}
+    
+    def column(key: str, dtype: str, missing: Any = 0) -> np.ndarray:
+        return np.array([missing if row[key] is None else row[key] for row in rows], dtype=dtype)
+    
+    writer = FrameWriter()
+    writer.add_json("META", {"chunk": chunk, "count": len(rows), "types": types, "residues": residues})
+    writer.add("A1", column("atom1_index", "<u4"), "<u4")
+    writer.add("A2", column("atom2_index", "<u4"), "<u4")
+    writer.add("TYPE", np.array([type_codes[row["interaction_type"]] for row in rows], dtype="u1"), "u1")
+    writer.add("DIST", column("distance", "<f4", np.nan), "<f4")
+    writer.add("ANGL", column("angle", "<f4", np.nan), "<f4")
+    writer.add("CONF", column("confidence", "<f4", np.nan), "<f4")
+    writer.add("R1", np.array([residue_codes[row["atom1_residue"] or ""] for row in rows], dtype="<u2"), "<u2")
+    writer.add("R2", np.array([residue_codes[row["atom2_residue"] or ""] for row in rows], dtype="<u2"), "<u2")
+    writer.add("R1SQ", column("atom1_residue_seq", "<i4"), "<i4")
+    writer.add("R2SQ", column("atom2_residue_seq", "<i4"), "<i4")
+    return writer.to_bytes()
+
+class GzipStream:
+    """Incremental gzip member for streamed responses"""
+    
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+    
+    def flush(self) -> bytes:
+        return self._compressor.flush()
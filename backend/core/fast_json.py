@@ -0,0 +1,40 @@
+"""Fast JSON - Encoder for Large Columnar Responses"""
+
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+from .tracing import span
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.biodockviz.columnar+json"
+
+def dumps(value: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON (orjson when installed, NumPy arrays supported)"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), default=_default).encode("utf-8")
+
+def _default(value: Any) -> Any:
+    # NumPy arrays and scalars for the stdlib fallback
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def wants_columnar(accept: str, format: str = "") -> bool:
+    """Whether a request opted into the columnar format (query parameter or Accept header)"""
+    return format == "columnar" or COLUMNAR_MEDIA_TYPE in (accept or "")
+
+class FastJSONResponse(Response):
+    """JSON response encoded with fast_json.dumps, bypassing response_model validation"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        with span("encode"):
+            return dumps(content)
@@ -0,0 +1,93 @@
+"""HTTP Caching - Strong ETags and Conditional GET for Structure Resources"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..config import settings
+from .engines.thresholds import ALGORITHM_VERSION, AnalysisThresholds
+
+# Responses for a structure only depend on its file content (file_hash), whether
+# it has been parsed and analyzed, and the analysis algorithm and thresholds.
+# Once a structure is parsed (and analyzed, for resources carrying interactions)
+# its responses never change, so its version can be answered from memory.
+
+THRESHOLDS_FINGERPRINT = AnalysisThresholds().fingerprint()
+
+@dataclass(frozen=True)
+class StructureVersion:
+    """Inputs that determine every cacheable response for a structure"""
+    
+    file_hash: str
+    parsed: bool
+    analyzed: bool
+    
+    def settled(self, needs_analysis: bool = False) -> bool:
+        """Whether responses can no longer change (under the current algorithm version)"""
+        return self.parsed and (self.analyzed or not needs_analysis)
+    
+    def etag(self, *representation: str, needs_analysis: bool = False) -> str:
+        """Strong ETag of one representation (format, query options) of a structure resource"""
+        parts = [self.file_hash, "parsed" if self.parsed else "uploaded"]
+        if needs_analysis:
+            parts += [
+                "analyzed" if self.analyzed else "pending",
+                ALGORITHM_VERSION,
+                THRESHOLDS_FINGERPRINT,
+            ]
+        parts += representation
+        return '"' + hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+class VersionMemo:
+    """Bounded LRU of settled structure versions, so If-None-Match skips the database"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._versions: "OrderedDict[str, StructureVersion]" = OrderedDict()
+    
+    def get(self, structure_id: str) -> Optional[StructureVersion]:
+        version = self._versions.get(structure_id)
+        if version is not None:
+            self._versions.move_to_end(structure_id)
+        return version
+    
+    def put(self, structure_id: str, version: StructureVersion) -> None:
+        # Only parsed structures are remembered; earlier states change soon
+        if not version.parsed:
+            return
+        self._versions[structure_id] = version
+        self._versions.move_to_end(structure_id)
+        while len(self._versions) > self.max_entries:
+            self._versions.popitem(last=False)
+    
+    def invalidate(self, structure_id: str) -> None:
+        self._versions.pop(structure_id, None)
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches etag (weak comparison, RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def validator_headers(etag: str, settled: bool, vary: Optional[str] = None) -> Dict[str, str]:
+    """ETag and Cache-Control; unsettled responses must be revalidated every time"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}" if settled else "no-cache",
+    }
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+structure_versions = VersionMemo(settings.ETAG_MEMO_ENTRIES)
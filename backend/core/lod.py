@@ -0,0 +1,256 @@
+"""Level of Detail - Precomputed Coarse Representations of Large Structures"""
+
+import base64
+import io
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .binary_frame import element_codes
+from .representations import LOD_TIERS
+from .structure_arrays import StructureArrays
+
+# Backbone atoms representing a residue in the trace tier (protein, nucleic acid)
+TRACE_ATOM_NAMES = ("CA", "P")
+
+BBox = Tuple[float, float, float, float, float, float]
+
+@dataclass
+class LODIndex:
+    """LOD tiers of one structure, as index arrays into its StructureArrays"""
+    
+    trace: np.ndarray  # (t,) int32 atom indices
+    trace_bonds: np.ndarray  # (b, 2) int32 positions within trace
+    residue_starts: np.ndarray  # (r,) int32 first atom of each residue
+    residue_counts: np.ndarray  # (r,) int32
+    residue_centroids: np.ndarray  # (r, 3) float32
+    octree_origin: np.ndarray  # (3,) float64
+    octree_cell_size: np.ndarray  # (3,) float64
+    cell_coords: np.ndarray  # (k, 3) int32 integer cell coordinates
+    cell_offsets: np.ndarray  # (k + 1,) int32 ranges into atom_order
+    atom_order: np.ndarray  # (n,) int32 atoms sorted by cell
+    sample_offsets: np.ndarray  # (k + 1,) int32 ranges into cell_samples
+    cell_samples: np.ndarray  # (s,) int32 representative atoms per cell
+    
+    FIELDS = (
+        'trace', 'trace_bonds', 'residue_starts', 'residue_counts', 'residue_centroids',
+        'octree_origin', 'octree_cell_size', 'cell_coords', 'cell_offsets', 'atom_order',
+        'sample_offsets', 'cell_samples',
+    )
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+    
+    def to_arrays(self, prefix: str = "lod_") -> Dict[str, np.ndarray]:
+        return {prefix + name: getattr(self, name) for name in self.FIELDS}
+    
+    @classmethod
+    def from_arrays(cls, data, prefix: str = "lod_") -> Optional["LODIndex"]:
+        if prefix + cls.FIELDS[0] not in data:
+            return None
+        return cls(**{name: data[prefix + name] for name in cls.FIELDS})
+    
+    def encode(self) -> Dict[str, str]:
+        """JSON object holding the tiers as base64 .npz, stored as parsed_data['lod']"""
+        buffer = io.BytesIO()
+        np.savez(buffer, **self.to_arrays())
+        return {"npz": base64.b64encode(buffer.getvalue()).decode("ascii")}
+    
+    @classmethod
+    def decode(cls, encoded: Dict[str, str]) -> Optional["LODIndex"]:
+        with np.load(io.BytesIO(base64.b64decode(encoded["npz"])), allow_pickle=False) as data:
+            return cls.from_arrays(data)
+
+@dataclass
+class FrameView:
+    """Atom subset ready for framing; bond and interaction indices are local to the subset"""
+    
+    positions: np.ndarray  # (m, 3)
+    elements: np.ndarray  # (m,) uint8 atomic numbers
+    bonds: np.ndarray  # (b, 2) local indices
+    bond_orders: np.ndarray  # (b,) uint8
+    atom_indices: Optional[np.ndarray]  # (m,) global atom index per item (None = identity)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+def _trace(arrays: StructureArrays) -> Tuple[np.ndarray, np.ndarray]:
+    names = np.char.strip(arrays.names.astype(str))
+    trace = np.flatnonzero(np.isin(names, TRACE_ATOM_NAMES)).astype(np.int32)
+    if len(trace) < 2:
+        return trace, np.zeros((0, 2), dtype=np.int32)
+    
+    # Connect consecutive trace atoms of the same chain with adjacent residue numbers
+    chains = arrays.chain_ids[trace]
+    seqs = arrays.res_seqs[trace]
+    linked = (chains[1:] == chains[:-1]) & (np.abs(seqs[1:] - seqs[:-1]) <= 1)
+    starts = np.flatnonzero(linked).astype(np.int32)
+    return trace, np.column_stack((starts, starts + 1))
+
+def _residues(arrays: StructureArrays) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = arrays.atom_count
+    if n == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros((0, 3), dtype=np.float32)
+    # Atoms of a residue are contiguous in PDB/mmCIF order; a residue starts where the key changes
+    changed = (
+        (arrays.chain_ids[1:] != arrays.chain_ids[:-1])
+        | (arrays.res_seqs[1:] != arrays.res_seqs[:-1])
+        | (arrays.i_codes[1:] != arrays.i_codes[:-1])
+    )
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1)).astype(np.int32)
+    counts = np.diff(np.append(starts, n)).astype(np.int32)
+    centroids = np.add.reduceat(arrays.coords, starts, axis=0) / counts[:, None]
+    return starts, counts, centroids.astype(np.float32)
+
+def _morton(cells: np.ndarray, depth: int) -> np.ndarray:
+    """Interleave the bits of integer cell coordinates (z-order)"""
+    codes = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(depth):
+        for axis in range(3):
+            codes |= ((cells[:, axis].astype(np.int64) >> bit) & 1) << (3 * bit + axis)
+    return codes
+
+def build_lod_index(
+    arrays: StructureArrays,
+    leaf_atoms: int = settings.LOD_OCTREE_LEAF_ATOMS,
+    max_depth: int = settings.LOD_OCTREE_MAX_DEPTH,
+    cell_sample: int = settings.LOD_CELL_SAMPLE,
+) -> LODIndex:
+    """Compute trace, residue centroids and the octree cell partition of a structure"""
+    n = arrays.atom_count
+    trace, trace_bonds = _trace(arrays)
+    residue_starts, residue_counts, residue_centroids = _residues(arrays)
+    
+    # Depth so that leaves hold about leaf_atoms atoms on average
+    depth = min(max_depth, max(0, math.ceil(math.log(max(n, 1) / leaf_atoms, 8)))) if n else 0
+    divisions = 1 << depth
+    lower = arrays.coords.min(axis=0) if n else np.zeros(3)
+    upper = arrays.coords.max(axis=0) if n else np.ones(3)
+    cell_size = np.maximum(upper - lower, 1e-6) / divisions
+    
+    cells = np.clip(((arrays.coords - lower) / cell_size).astype(np.int64), 0, divisions - 1)
+    codes = _morton(cells, depth)
+    atom_order = np.argsort(codes, kind="stable").astype(np.int32)
+    sorted_codes = codes[atom_order]
+    
+    first = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1]))) if n else np.zeros(0, dtype=np.int64)
+    cell_offsets = np.append(first, n).astype(np.int32)
+    cell_counts = np.diff(cell_offsets)
+    cell_coords = cells[atom_order[first]].astype(np.int32) if n else np.zeros((0, 3), dtype=np.int32)
+    
+    # Evenly strided sample of up to cell_sample atoms per cell
+    sample_counts = np.minimum(cell_counts, cell_sample)
+    sample_offsets = np.concatenate(([0], np.cumsum(sample_counts))).astype(np.int32)
+    cell_of_sample = np.repeat(np.arange(len(cell_counts)), sample_counts)
+    rank = np.arange(sample_offsets[-1]) - sample_offsets[:-1][cell_of_sample]
+    positions = cell_offsets[:-1][cell_of_sample] + rank * cell_counts[cell_of_sample] // sample_counts[cell_of_sample]
+    cell_samples = atom_order[positions].astype(np.int32)
+    
+    return LODIndex(
+        trace=trace,
+        trace_bonds=trace_bonds,
+        residue_starts=residue_starts,
+        residue_counts=residue_counts,
+        residue_centroids=residue_centroids,
+        octree_origin=lower.astype(np.float64),
+        octree_cell_size=cell_size.astype(np.float64),
+        cell_coords=cell_coords,
+        cell_offsets=cell_offsets,
+        atom_order=atom_order,
+        sample_offsets=sample_offsets,
+        cell_samples=cell_samples,
+    )
+
+def _in_bbox(points: np.ndarray, bbox: Optional[BBox]) -> np.ndarray:
+    if bbox is None:
+        return np.ones(len(points), dtype=bool)
+    lower, upper = np.array(bbox[:3]), np.array(bbox[3:])
+    return ((points >= lower) & (points <= upper)).all(axis=1)
+
+def _cells_in_bbox(lod: LODIndex, bbox: Optional[BBox]) -> np.ndarray:
+    if bbox is None:
+        return np.arange(len(lod.cell_coords))
+    cell_lower = lod.octree_origin + lod.cell_coords * lod.octree_cell_size
+    cell_upper = cell_lower + lod.octree_cell_size
+    lower, upper = np.array(bbox[:3]), np.array(bbox[3:])
+    return np.flatnonzero(((cell_upper >= lower) & (cell_lower <= upper)).all(axis=1))
+
+def _gather(offsets: np.ndarray, values: np.ndarray, selected: np.ndarray) -> np.ndarray:
+    """Concatenate values[offsets[i]:offsets[i + 1]] for the selected ranges"""
+    if len(selected) == 0:
+        return np.zeros(0, dtype=values.dtype)
+    return np.concatenate([values[offsets[i]:offsets[i + 1]] for i in selected])
+
+def atom_subset_view(arrays: StructureArrays, indices: np.ndarray, meta: Dict[str, Any]) -> FrameView:
+    """View of selected atoms with the bonds between them"""
+    indices = np.sort(indices).astype(np.int64)
+    local = np.full(arrays.atom_count, -1, dtype=np.int64)
+    local[indices] = np.arange(len(indices))
+    
+    bond_local = local[arrays.bonds] if arrays.bond_count else np.zeros((0, 2), dtype=np.int64)
+    kept = (bond_local >= 0).all(axis=1)
+    bond_orders = np.where(arrays.bond_types == "aromatic", 4, np.rint(arrays.bond_orders))[kept]
+    
+    return FrameView(
+        positions=arrays.coords[indices],
+        elements=element_codes(arrays.elements[indices]),
+        bonds=bond_local[kept],
+        bond_orders=bond_orders,
+        atom_indices=indices,
+        meta=meta,
+    )
+
+def select_lod(arrays: StructureArrays, lod: LODIndex, tier: str, bbox: Optional[BBox] = None) -> FrameView:
+    """Select a LOD tier, restricted to a bounding box (xmin, ymin, zmin, xmax, ymax, zmax)"""
+    if tier not in LOD_TIERS:
+        raise ValueError(f"Unknown LOD tier: {tier}")
+    
+    meta = {"lod": tier, "bbox": list(bbox) if bbox else None, "total_atom_count": arrays.atom_count}
+    
+    if tier == "trace":
+        keep = _in_bbox(arrays.coords[lod.trace], bbox)
+        local = np.cumsum(keep) - 1
+        bond_kept = keep[lod.trace_bonds].all(axis=1)
+        indices = lod.trace[keep]
+        return FrameView(
+            positions=arrays.coords[indices],
+            elements=element_codes(arrays.elements[indices]),
+            bonds=local[lod.trace_bonds[bond_kept]],
+            bond_orders=np.ones(int(bond_kept.sum()), dtype=np.uint8),
+            atom_indices=indices,
+            meta=meta,
+        )
+    
+    if tier == "residues":
+        keep = _in_bbox(lod.residue_centroids, bbox)
+        representatives = lod.residue_starts[keep]
+        meta["residue_atom_counts"] = lod.residue_counts[keep].tolist()
+        return FrameView(
+            positions=lod.residue_centroids[keep],
+            elements=element_codes(arrays.elements[representatives]),
+            bonds=np.zeros((0, 2), dtype=np.int64),
+            bond_orders=np.zeros(0, dtype=np.uint8),
+            atom_indices=representatives,
+            meta=meta,
+        )
+    
+    cells = _cells_in_bbox(lod, bbox)
+    meta["cells"] = int(len(cells))
+    if tier == "octree":
+        indices = _gather(lod.sample_offsets, lod.cell_samples, cells)
+    else:
+        indices = _gather(lod.cell_offsets, lod.atom_order, cells)
+        indices = indices[_in_bbox(arrays.coords[indices], bbox)]
+    return atom_subset_view(arrays, indices, meta)
+
+def remap_interactions(view: FrameView, atom_count: int, pairs: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep interactions whose atoms are both in the view, with indices local to the view"""
+    if view.atom_indices is None or len(pairs) == 0:
+        return pairs, codes
+    local = np.full(atom_count, -1, dtype=np.int64)
+    local[view.atom_indices] = np.arange(len(view.atom_indices))
+    mapped = local[pairs.astype(np.int64)]
+    kept = (mapped >= 0).all(axis=1)
+    return mapped[kept], codes[kept]
@@ -0,0 +1,224 @@
+"""Memory - Per-Stage Peak and Retained Memory, and the Memory Budget of Parses and Analyses"""
+
+import os
+import threading
+import tracemalloc
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Set
+
+from ..config import settings
+from ..logging_config import get_logger
+from .exceptions import MemoryBudgetException
+from .metrics import metrics
+
+logger = get_logger(__name__)
+
+# With MEMORY_TRACKING on, every tracing span records the process's memory
+# when it opens and closes and the highest value seen in between:
+#   tracemalloc  bytes allocated by Python (precise, including numpy buffers,
+#                but allocation-heavy code runs noticeably slower)
+#   rss          resident set size, read at span boundaries and sampled by a
+#                background thread every MEMORY_SAMPLE_INTERVAL seconds
+# The figures are process-wide: stages of concurrent requests see each
+# other's allocations, so per-stage numbers are exact only when one parse or
+# analysis runs at a time (as in a dedicated job worker).
+
+MODES = ("off", "tracemalloc", "rss")
+
+BUDGET_ACTIONS = ("reject", "partial")
+
+# Per-atom rates below this many atoms are dominated by fixed costs
+MIN_OBSERVED_ATOMS = 1000
+OBSERVED_RATES = 50
+
+BUDGET_DECISIONS = metrics.counter(
+    "biodockviz_memory_budget_total",
+    "Parses and analyses checked against MEMORY_BUDGET_MB by outcome (admitted, partial, rejected)",
+    ("kind", "outcome"),
+)
+
+def resident_bytes() -> Optional[int]:
+    """Resident set size of this process (None where /proc is not available)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StageMemory:
+    """Process memory at the start and end of one stage and its peak in between (bytes)"""
+    
+    __slots__ = ("start", "peak", "end")
+    
+    def __init__(self, start: int):
+        self.start = start
+        self.peak = start
+        self.end: Optional[int] = None
+    
+    def summary(self, current: Optional[int] = None) -> Dict[str, int]:
+        """Peak and retained bytes relative to the start (retained up to current while open)"""
+        end = self.end if self.end is not None else current
+        return {
+            "peak_bytes": max(0, self.peak - self.start),
+            "retained_bytes": (end if end is not None else self.peak) - self.start,
+        }
+
+class MemoryTracker:
+    """Peak memory of open stages, folded in whenever memory is read"""
+    
+    def __init__(self, mode: str, sample_interval: float):
+        if mode not in MODES:
+            logger.warning(f"Unknown MEMORY_TRACKING '{mode}'; memory tracking is off")
+            mode = "off"
+        if mode == "rss" and resident_bytes() is None:
+            logger.warning("MEMORY_TRACKING=rss needs /proc; memory tracking is off")
+            mode = "off"
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self._open: Set[StageMemory] = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+    
+    def _start(self) -> None:
+        # Under the lock, on first use (the API process and standalone workers alike)
+        self._started = True
+        if self.mode == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        else:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, name="memory-sampler", daemon=True)
+            self._sampler.start()
+        logger.info(f"Memory tracking on ({self.mode})")
+    
+    def _read(self) -> int:
+        """Current bytes; folds the peak since the last read into every open stage"""
+        if self.mode == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        else:
+            current = peak = resident_bytes() or 0
+        for record in self._open:
+            if peak > record.peak:
+                record.peak = peak
+        return current
+    
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                if self._open:
+                    self._read()
+    
+    def enter(self) -> Optional[StageMemory]:
+        """Start accounting a stage (None when tracking is off)"""
+        if self.mode == "off":
+            return None
+        with self._lock:
+            if not self._started:
+                self._start()
+            record = StageMemory(self._read())
+            self._open.add(record)
+        return record
+    
+    def exit(self, record: StageMemory) -> None:
+        with self._lock:
+            record.end = self._read()
+            self._open.discard(record)
+    
+    def current(self) -> Optional[int]:
+        """Bytes in use now (None when tracking is off), updating open stages' peaks"""
+        if self.mode == "off" or not self._started:
+            return None
+        with self._lock:
+            return self._read()
+    
+    def stats(self) -> Dict[str, Optional[int]]:
+        traced = tracemalloc.get_traced_memory()[0] if self.mode == "tracemalloc" and tracemalloc.is_tracing() else None
+        return {"resident_bytes": resident_bytes(), "traced_bytes": traced}
+    
+    def stop(self) -> None:
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+class MemoryBudget:
+    """
+    Predicted peak memory of a parse or analysis, checked before it starts
+    
+    The prediction is atoms times a per-atom rate: MEMORY_BYTES_PER_ATOM,
+    or the highest rate seen in the last OBSERVED_RATES tracked runs of
+    that kind if higher. Over MEMORY_BUDGET_MB a parse is rejected; an
+    analysis is rejected or, with MEMORY_BUDGET_ACTION=partial, limited to
+    the share of atoms that fits (interaction records, which grow with the
+    atoms covered, are most of an analysis's memory) and returned partial.
+    """
+    
+    def __init__(self, budget_mb: float, action: str, bytes_per_atom: int):
+        if action not in BUDGET_ACTIONS:
+            logger.warning(f"Unknown MEMORY_BUDGET_ACTION '{action}'; rejecting over-budget work")
+            action = "reject"
+        self.limit = int(budget_mb * 1024 * 1024)
+        self.action = action
+        self.bytes_per_atom = bytes_per_atom
+        self._rates: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=OBSERVED_RATES))
+    
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+    
+    def rate(self, kind: str) -> float:
+        return max([self.bytes_per_atom, *self._rates[kind]])
+    
+    def predict(self, kind: str, atoms: int) -> int:
+        return int(atoms * self.rate(kind))
+    
+    def observe(self, kind: str, atoms: int, peak_bytes: int) -> None:
+        """Learn from the measured peak of a completed run"""
+        if atoms >= MIN_OBSERVED_ATOMS and peak_bytes > 0:
+            self._rates[kind].append(peak_bytes / atoms)
+    
+    def admit(self, kind: str, atoms: int, label: str, partial: bool = False) -> Optional[int]:
+        """
+        Check a run of kind over atoms against the budget
+        
+        Returns None to run it whole, or (when partial is allowed and
+        MEMORY_BUDGET_ACTION is 'partial') how many atoms it may cover;
+        otherwise raises MemoryBudgetException.
+        """
+        if not self.enabled:
+            return None
+        predicted = self.predict(kind, atoms)
+        if predicted <= self.limit:
+            BUDGET_DECISIONS.inc(1, kind, "admitted")
+            return None
+        
+        mb = predicted / (1024 * 1024)
+        if partial and self.action == "partial":
+            allowance = atoms * self.limit // predicted
+            if allowance > 0:
+                logger.warning(f"Limiting {label} to {allowance}/{atoms} atoms: predicted {mb:.0f} MB over the memory budget")
+                BUDGET_DECISIONS.inc(1, kind, "partial")
+                return allowance
+        
+        logger.warning(f"Rejecting {label}: predicted {mb:.0f} MB over the memory budget")
+        BUDGET_DECISIONS.inc(1, kind, "rejected")
+        raise MemoryBudgetException(
+            message=f"{label[:1].upper()}{label[1:]} ({atoms} atoms) would need about {mb:.0f} MB, over the {self.limit // (1024 * 1024)} MB memory budget",
+            code="MEMORY_BUDGET_EXCEEDED",
+        )
+
+memory_tracker = MemoryTracker(settings.MEMORY_TRACKING, settings.MEMORY_SAMPLE_INTERVAL)
+memory_budget = MemoryBudget(settings.MEMORY_BUDGET_MB, settings.MEMORY_BUDGET_ACTION, settings.MEMORY_BYTES_PER_ATOM)
@@ -0,0 +1,240 @@
+"""Profiling - Opt-In cProfile and Sampled Stacks of Single Requests and Jobs"""
+
+import asyncio
+import cProfile
+import json
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..logging_config import get_logger
+from .metrics import metrics
+
+logger = get_logger(__name__)
+
+# A profiled request (or job) binds a ProfileSession; the parse and analysis
+# code marks its work with profiled(region), which is a shared no-op context
+# when no session is bound, so unprofiled requests pay one ContextVar lookup.
+# Inside a region the thread runs under its own cProfile.Profile (merged into
+# one pstats dump at the end) and a sampler thread records its stack every
+# PROFILE_SAMPLE_INTERVAL seconds as collapsed stacks for flame graphs.
+# Regions on the event loop thread also see whatever else the loop runs
+# meanwhile; regions in worker threads (the interaction pipeline) do not.
+
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+_NO_PROFILE = nullcontext()
+
+# Directory and file names come from correlation ids and job types
+SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+ARTIFACTS = {"pstats": "application/octet-stream", "collapsed": "text/plain; charset=utf-8"}
+
+PROFILES = metrics.counter("biodockviz_profiles_total", "Profile requests by outcome", ("outcome",))
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+def collapse(frame, root: str, max_depth: int = 256) -> str:
+    """One sampled stack as 'root;outer;...;inner' (Brendan Gregg's collapsed format)"""
+    names = []
+    while frame is not None and len(names) < max_depth:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+class ProfileSession:
+    """Profilers and stack samples of one request or job"""
+    
+    def __init__(self, correlation_id: str, kind: str, label: str, sample_interval: float):
+        self.correlation_id = correlation_id
+        self.kind = kind
+        self.label = label
+        self.sample_interval = sample_interval
+        self.started_at = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.regions: List[str] = []
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        # thread id -> [nesting depth, profiler, thread name]
+        self._threads: Dict[int, list] = {}
+        self._profilers: List[cProfile.Profile] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+    
+    @contextmanager
+    def region(self, name: str) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        with self._lock:
+            if self.closed:
+                entry = None
+            else:
+                entry = self._threads.get(thread_id)
+                if entry is None:
+                    entry = self._threads[thread_id] = [0, cProfile.Profile(), threading.current_thread().name]
+                    entry[1].enable()
+                entry[0] += 1
+                self.regions.append(name)
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+                    self._sampler.start()
+        try:
+            yield
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry[0] -= 1
+                    if entry[0] == 0:
+                        entry[1].disable()
+                        del self._threads[thread_id]
+                        if not self.closed:
+                            self._profilers.append(entry[1])
+    
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = [(thread_id, entry[2]) for thread_id, entry in self._threads.items()]
+            for thread_id, thread_name in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[collapse(frame, thread_name)] += 1
+                    self.samples += 1
+    
+    def close(self) -> List[cProfile.Profile]:
+        """Stop sampling; returns the profilers of regions that have finished"""
+        with self._lock:
+            self.closed = True
+            profilers = list(self._profilers)
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return profilers
+
+class Profiler:
+    """
+    On-demand profiles stored under PROFILE_DIR/<correlation id>/<kind>.*
+    
+    kind is 'request' for an HTTP request and the job type for a background
+    job (which shares its submitting request's correlation id). One session
+    runs at a time per process, so concurrent profiles do not fight over the
+    event loop thread; a request arriving while one runs is served
+    unprofiled. A later profile of the same correlation id and kind
+    replaces the earlier one; the oldest correlation ids beyond
+    PROFILE_MAX_STORED are deleted.
+    """
+    
+    def __init__(self, directory: str, max_stored: int, sample_interval: float):
+        self.directory = Path(directory)
+        self.max_stored = max_stored
+        self.sample_interval = sample_interval
+        self._busy = threading.Lock()
+    
+    def begin(self, correlation_id: Optional[str], kind: str, label: str) -> Optional[Tuple[ProfileSession, Token]]:
+        """Bind a new session to the current context; returns a token for finish(), or None if not started"""
+        if not correlation_id or not SAFE_NAME.match(correlation_id) or not SAFE_NAME.match(kind):
+            logger.warning(f"Not profiling {label}: correlation id unusable as a profile key")
+            PROFILES.inc(1, "rejected")
+            return None
+        if not self._busy.acquire(blocking=False):
+            logger.info(f"Not profiling {label}: another profile is running")
+            PROFILES.inc(1, "busy")
+            return None
+        session = ProfileSession(correlation_id, kind, label, self.sample_interval)
+        return session, _session.set(session)
+    
+    async def finish(self, handle: Tuple[ProfileSession, Token]) -> Optional[Dict[str, Any]]:
+        """Unbind the session and store its artifacts; returns their summary (None if nothing was profiled)"""
+        session, token = handle
+        _session.reset(token)
+        try:
+            profilers = session.close()
+            if not profilers:
+                PROFILES.inc(1, "empty")
+                return None
+            summary = await asyncio.to_thread(self._store, session, profilers)
+            PROFILES.inc(1, "stored")
+            logger.info(f"Stored profile {session.correlation_id}/{session.kind}: {session.label}")
+            return summary
+        except Exception as e:
+            logger.error(f"Failed to store profile {session.correlation_id}/{session.kind}: {e}", exc_info=True)
+            return None
+        finally:
+            self._busy.release()
+    
+    def _store(self, session: ProfileSession, profilers: List[cProfile.Profile]) -> Dict[str, Any]:
+        directory = self.directory / session.correlation_id
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(str(directory / f"{session.kind}.pstats"))
+        
+        with open(directory / f"{session.kind}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        summary = {
+            "correlation_id": session.correlation_id,
+            "kind": session.kind,
+            "label": session.label,
+            "started_at": session.started_at,
+            "duration_ms": round((time.perf_counter_ns() - session.start_ns) / 1e6, 3),
+            "regions": sorted(set(session.regions)),
+            "samples": session.samples,
+            "sample_interval": session.sample_interval,
+            "artifacts": [f"{session.kind}.{extension}" for extension in ARTIFACTS],
+        }
+        (directory / f"{session.kind}.json").write_text(json.dumps(summary), encoding="utf-8")
+        self._prune()
+        return summary
+    
+    def _prune(self) -> None:
+        directories = sorted((path for path in self.directory.iterdir() if path.is_dir()), key=lambda path: path.stat().st_mtime)
+        for path in directories[:max(0, len(directories) - self.max_stored)]:
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first"""
+        if not self.directory.exists():
+            return []
+        summaries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                summaries.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return sorted(summaries, key=lambda summary: summary.get("started_at", 0), reverse=True)
+    
+    def artifact_path(self, correlation_id: str, artifact: str) -> Optional[Path]:
+        """Path of a stored artifact ('<kind>.pstats' or '<kind>.collapsed'), None if unknown"""
+        kind, _, extension = artifact.rpartition(".")
+        if extension not in ARTIFACTS or not SAFE_NAME.match(correlation_id) or not SAFE_NAME.match(kind):
+            return None
+        path = self.directory / correlation_id / artifact
+        return path if path.is_file() else None
+
+def profiled(region: str):
+    """Profile the enclosed work if the current request or job is being profiled"""
+    session = _session.get()
+    if session is None:
+        return _NO_PROFILE
+    return session.region(region)
+
+def profile_active() -> bool:
+    return _session.get() is not None
+
+profiler = Profiler(settings.PROFILE_DIR, settings.PROFILE_MAX_STORED, settings.PROFILE_SAMPLE_INTERVAL)
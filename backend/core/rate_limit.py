@@ -0,0 +1,284 @@
+"""Rate Limiting - Cost-Weighted Token Buckets with Memory and Redis Stores"""
+
+import math
+import time
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence
+
+from ..config import settings
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Every client identity (API key, IP) owns a bucket holding up to `capacity`
+# tokens, refilled at `rate` tokens per second. A request costs tokens in
+# proportion to the work it is predicted to cause and is admitted only when
+# every bucket it draws from holds enough; otherwise it is rejected with the
+# time until it would be admitted. Tokens charged for work that did not
+# happen (a 304 answered from the validator) are given back.
+
+@dataclass(frozen=True)
+class Bucket:
+    """One token bucket a request draws from"""
+    
+    key: str
+    rate: float  # tokens per second
+    capacity: float
+
+@dataclass(frozen=True)
+class RateDecision:
+    """Outcome of an admission attempt"""
+    
+    admitted: bool
+    retry_after: float  # seconds until the cost fits (0 when admitted)
+    remaining: float  # tokens left in the emptiest bucket
+    cost: float = 0.0  # tokens taken (or that did not fit)
+
+class BucketStore:
+    """Base class of token bucket stores"""
+    
+    name = "store"
+    
+    async def take(self, buckets: Sequence[Bucket], cost: float) -> RateDecision:
+        """Atomically take cost tokens from every bucket, or from none"""
+        raise NotImplementedError
+    
+    async def give(self, buckets: Sequence[Bucket], tokens: float) -> None:
+        """Return tokens to every bucket (up to its capacity)"""
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+
+class MemoryBucketStore(BucketStore):
+    """Buckets in process memory (one API process, or per-process limits)"""
+    
+    name = "memory"
+    
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._state: Dict[str, List[float]] = {}  # key -> [tokens, updated_at]
+    
+    def _refill(self, bucket: Bucket, now: float) -> float:
+        tokens, updated = self._state.get(bucket.key, (bucket.capacity, now))
+        return min(bucket.capacity, tokens + max(0.0, now - updated) * bucket.rate)
+    
+    async def take(self, buckets: Sequence[Bucket], cost: float) -> RateDecision:
+        # No await between read and write, so this is atomic on the event loop
+        now = time.monotonic()
+        levels = [self._refill(bucket, now) for bucket in buckets]
+        shortfall = max(((cost - level) / bucket.rate for bucket, level in zip(buckets, levels)), default=0.0)
+        if shortfall > 0:
+            return RateDecision(False, shortfall, min(levels))
+        
+        for bucket, level in zip(buckets, levels):
+            self._state[bucket.key] = [level - cost, now]
+        if len(self._state) > self.max_keys:
+            self._prune(now, buckets)
+        return RateDecision(True, 0.0, min(levels, default=0.0) - cost)
+    
+    async def give(self, buckets: Sequence[Bucket], tokens: float) -> None:
+        now = time.monotonic()
+        for bucket in buckets:
+            if bucket.key in self._state:
+                self._state[bucket.key] = [min(bucket.capacity, self._refill(bucket, now) + tokens), now]
+    
+    def _prune(self, now: float, buckets: Sequence[Bucket]) -> None:
+        # A bucket refilled to capacity is the same as no entry; drop those, then the stalest
+        rate = min(bucket.rate for bucket in buckets)
+        capacity = max(bucket.capacity for bucket in buckets)
+        idle = [key for key, (tokens, updated) in self._state.items() if tokens + (now - updated) * rate >= capacity]
+        for key in idle:
+            del self._state[key]
+        if len(self._state) > self.max_keys:
+            stalest = sorted(self._state, key=lambda key: self._state[key][1])
+            for key in stalest[:len(self._state) - self.max_keys]:
+                del self._state[key]
+
+class RedisBucketStore(BucketStore):
+    """Buckets in Redis, shared by every worker and host; updated by one Lua script per request"""
+    
+    name = "redis"
+    KEY_PREFIX = "biodockviz:ratelimit:"
+    
+    # KEYS: bucket keys. ARGV: cost, then rate and capacity of each bucket.
+    # Uses the Redis clock so hosts with skewed clocks agree. Returns
+    # {admitted, retry_after, remaining} as strings (Lua numbers become integers).
+    SCRIPT = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local cost = tonumber(ARGV[1])
+    local levels = {}
+    local shortfall = 0
+    local remaining = math.huge
+    for i = 1, #KEYS do
+        local rate = tonumber(ARGV[2 * i])
+        local capacity = tonumber(ARGV[2 * i + 1])
+        local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated')
+        local tokens = tonumber(state[1]) or capacity
+        local updated = tonumber(state[2]) or now
+        local level = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+        levels[i] = level
+        remaining = math.min(remaining, level)
+        if level < cost then
+            shortfall = math.max(shortfall, (cost - level) / rate)
+        end
+    end
+    if shortfall > 0 then
+        return {'0', tostring(shortfall), tostring(remaining)}
+    end
+    for i = 1, #KEYS do
+        local rate = tonumber(ARGV[2 * i])
+        local capacity = tonumber(ARGV[2 * i + 1])
+        redis.call('HSET', KEYS[i], 'tokens', tostring(levels[i] - cost), 'updated', tostring(now))
+        redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate * 1000) + 1000)
+    end
+    return {'1', '0', tostring(remaining - cost)}
+    """
+    
+    # KEYS: bucket keys. ARGV: tokens, then rate and capacity of each bucket.
+    # Buckets that have expired are full already and are left alone.
+    GIVE_SCRIPT = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local tokens = tonumber(ARGV[1])
+    for i = 1, #KEYS do
+        local rate = tonumber(ARGV[2 * i])
+        local capacity = tonumber(ARGV[2 * i + 1])
+        local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated')
+        if state[1] then
+            local level = math.min(capacity, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+            redis.call('HSET', KEYS[i], 'tokens', tostring(math.min(capacity, level + tokens)), 'updated', tostring(now))
+        end
+    end
+    return 1
+    """
+    
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        
+        self.client = redis_asyncio.from_url(url)
+        self._script = self.client.register_script(self.SCRIPT)
+        self._give_script = self.client.register_script(self.GIVE_SCRIPT)
+    
+    def _args(self, buckets: Sequence[Bucket], tokens: float) -> List[float]:
+        args: List[float] = [tokens]
+        for bucket in buckets:
+            args += [bucket.rate, bucket.capacity]
+        return args
+    
+    async def take(self, buckets: Sequence[Bucket], cost: float) -> RateDecision:
+        admitted, retry_after, remaining = await self._script(
+            keys=[self.KEY_PREFIX + bucket.key for bucket in buckets], args=self._args(buckets, cost)
+        )
+        return RateDecision(admitted in (b"1", "1"), float(retry_after), float(remaining))
+    
+    async def give(self, buckets: Sequence[Bucket], tokens: float) -> None:
+        await self._give_script(keys=[self.KEY_PREFIX + bucket.key for bucket in buckets], args=self._args(buckets, tokens))
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+class RateLimiter:
+    """
+    Admission control over a bucket store, with counters per request kind
+    
+    Costs above a bucket's capacity are clamped to it, so the most expensive
+    request is still admitted once a client's buckets are full. Store
+    failures admit the request (the limiter must not take the API down) and
+    are counted.
+    """
+    
+    def __init__(self, store: BucketStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.store_errors = 0
+        self._counters: Dict[str, Dict[str, float]] = {}
+    
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        backend = settings.RATE_LIMIT_BACKEND.lower()
+        store: Optional[BucketStore] = None
+        
+        if backend in ("auto", "redis") and settings.REDIS_URL:
+            try:
+                store = RedisBucketStore(settings.REDIS_URL)
+            except ImportError:
+                if backend == "redis":
+                    raise
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory rate limits")
+        
+        return cls(store or MemoryBucketStore(), enabled=settings.RATE_LIMIT_ENABLED)
+    
+    def _counters_of(self, kind: str) -> Dict[str, float]:
+        return self._counters.setdefault(kind, {"admitted": 0, "rejected": 0, "admitted_cost": 0.0, "rejected_cost": 0.0, "refunded_cost": 0.0})
+    
+    def _count(self, kind: str, outcome: str, cost: float) -> None:
+        counters = self._counters_of(kind)
+        counters[outcome] += 1
+        counters[f"{outcome}_cost"] += cost
+    
+    async def _take(self, buckets: Sequence[Bucket], cost: float) -> RateDecision:
+        try:
+            decision = await self.store.take(buckets, cost)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Rate limit store failed, admitting request: {e}")
+            decision = RateDecision(True, 0.0, math.inf)
+        return replace(decision, cost=cost)
+    
+    async def _give(self, buckets: Sequence[Bucket], tokens: float) -> None:
+        try:
+            await self.store.give(buckets, tokens)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Rate limit store failed to return {tokens:.1f} tokens: {e}")
+    
+    async def admit(
+        self,
+        buckets: Sequence[Bucket],
+        cost: float,
+        kind: str,
+        surcharge: Optional[Callable[[], Awaitable[float]]] = None,
+    ) -> RateDecision:
+        """
+        Try to admit a request of the given cost against all of its buckets
+        
+        surcharge, when given, is awaited only once the base cost has been
+        taken (so a rejected client never causes the lookup it prices) and
+        its tokens are taken as well; if they do not fit, the base cost is
+        given back and the request is rejected.
+        """
+        capacity = min(bucket.capacity for bucket in buckets)
+        decision = await self._take(buckets, min(cost, capacity))
+        if decision.admitted and surcharge is not None:
+            extra = min(await surcharge(), capacity - decision.cost)
+            if extra > 0:
+                more = await self._take(buckets, extra)
+                if not more.admitted:
+                    await self._give(buckets, decision.cost)
+                decision = replace(more, cost=decision.cost + extra)
+        
+        self._count(kind, "admitted" if decision.admitted else "rejected", decision.cost)
+        return decision
+    
+    async def refund(self, buckets: Sequence[Bucket], tokens: float, kind: str) -> None:
+        """Give back tokens of an admitted request whose predicted work did not happen"""
+        if tokens <= 0:
+            return
+        await self._give(buckets, tokens)
+        self._counters_of(kind)["refunded_cost"] += tokens
+    
+    def stats(self) -> Dict[str, Any]:
+        """Admitted/rejected requests, token cost and refunded tokens per request kind"""
+        return {
+            "enabled": self.enabled,
+            "store": self.store.name,
+            "store_errors": self.store_errors,
+            "kinds": {kind: {key: round(value, 3) for key, value in counters.items()} for kind, counters in self._counters.items()},
+        }
+    
+    async def close(self) -> None:
+        await self.store.close()
+
+rate_limiter = RateLimiter.from_settings()
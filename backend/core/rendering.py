@@ -0,0 +1,182 @@
+"""Rendering - CPU Sphere/Stick Rasterizer and PNG Encoder for Thumbnails"""
+
+import math
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from .representations import RENDER_STYLES
+
+# Bump whenever the same input renders differently; cached thumbnails are keyed on it
+RENDERER_VERSION = 1
+
+# Jmol/CPK colours by atomic number (RGB 0-1); unknown elements are pink
+ELEMENT_COLORS = {
+    1: (1.00, 1.00, 1.00), 6: (0.56, 0.56, 0.56), 7: (0.19, 0.31, 0.97), 8: (1.00, 0.05, 0.05),
+    9: (0.56, 0.88, 0.31), 11: (0.67, 0.36, 0.95), 12: (0.54, 1.00, 0.00), 15: (1.00, 0.50, 0.00),
+    16: (1.00, 1.00, 0.19), 17: (0.12, 0.94, 0.12), 19: (0.56, 0.25, 0.83), 20: (0.24, 1.00, 0.00),
+    26: (0.88, 0.40, 0.20), 29: (0.78, 0.50, 0.20), 30: (0.49, 0.50, 0.69), 35: (0.65, 0.16, 0.16),
+    53: (0.58, 0.00, 0.58),
+}
+DEFAULT_COLOR = (1.00, 0.08, 0.58)
+
+# Van der Waals radii (Angstrom) for the space-filling style
+VDW_RADII = {1: 1.20, 6: 1.70, 7: 1.55, 8: 1.52, 9: 1.47, 15: 1.80, 16: 1.80, 17: 1.75, 35: 1.85, 53: 1.98}
+DEFAULT_RADIUS = 1.70
+
+BALL_RADIUS = 0.40
+HYDROGEN_BALL_RADIUS = 0.25
+STICK_RADIUS = 0.15
+
+LIGHT = np.array([-0.4, 0.5, 1.0]) / np.linalg.norm([-0.4, 0.5, 1.0])
+AMBIENT = 0.25
+
+# Upper bound on pixel candidates held at once while stamping primitives
+STAMP_BUDGET = 4_000_000
+
+@dataclass(frozen=True)
+class ViewParams:
+    """Camera and style of a thumbnail"""
+    
+    size: int = 256
+    style: str = "spheres"
+    azimuth: float = 0.0  # degrees about the vertical axis
+    elevation: float = 0.0  # degrees about the horizontal axis
+    background: str = "ffffff"  # hex RGB
+    supersample: int = 2
+    
+    def key(self) -> str:
+        """Stable identifier of the rendered image for cache keys"""
+        return f"v{RENDERER_VERSION}-{self.size}-{self.style}-{self.azimuth:g}-{self.elevation:g}-{self.background}-{self.supersample}"
+    
+    def background_rgb(self) -> np.ndarray:
+        value = int(self.background, 16)
+        return np.array([(value >> 16) & 255, (value >> 8) & 255, value & 255], dtype=np.float32) / 255.0
+
+def _rotation(azimuth: float, elevation: float) -> np.ndarray:
+    a, e = math.radians(azimuth), math.radians(elevation)
+    yaw = np.array([[math.cos(a), 0, math.sin(a)], [0, 1, 0], [-math.sin(a), 0, math.cos(a)]])
+    pitch = np.array([[1, 0, 0], [0, math.cos(e), -math.sin(e)], [0, math.sin(e), math.cos(e)]])
+    return pitch @ yaw
+
+def _lookup(table: dict, default, elements: np.ndarray) -> np.ndarray:
+    codes, inverse = np.unique(elements, return_inverse=True)
+    values = np.array([table.get(int(code), default) for code in codes], dtype=np.float32)
+    return values[inverse.reshape(-1)]
+
+def _primitives(coords: np.ndarray, elements: np.ndarray, bonds: np.ndarray, style: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Spheres to draw (centres, radii in Angstrom, colours); sticks become rows of small spheres"""
+    colors = _lookup(ELEMENT_COLORS, DEFAULT_COLOR, elements)
+    if style == "spheres" or len(bonds) == 0:
+        radii = _lookup(VDW_RADII, DEFAULT_RADIUS, elements) if style == "spheres" else np.full(len(coords), BALL_RADIUS, dtype=np.float32)
+        return coords, radii, colors
+    
+    radii = np.where(elements == 1, HYDROGEN_BALL_RADIUS, BALL_RADIUS).astype(np.float32)
+    start, end = coords[bonds[:, 0]], coords[bonds[:, 1]]
+    length = np.linalg.norm(end - start, axis=1)
+    # Samples half a stick radius apart along the longest bond (bounded for stray long bonds)
+    steps = int(min(64, max(2, math.ceil(float(length.max(initial=0.0)) / (STICK_RADIUS * 0.5)))))
+    t = np.linspace(0.0, 1.0, steps, dtype=np.float32)
+    samples = start[:, None, :] + (end - start)[:, None, :] * t[None, :, None]
+    half = (t < 0.5)[None, :, None]
+    sample_colors = np.where(half, colors[bonds[:, 0]][:, None, :], colors[bonds[:, 1]][:, None, :])
+    return (
+        np.concatenate((coords, samples.reshape(-1, 3))),
+        np.concatenate((radii, np.full(samples.shape[0] * steps, STICK_RADIUS, dtype=np.float32))),
+        np.concatenate((colors, sample_colors.reshape(-1, 3))),
+    )
+
+def render_rgb(coords: np.ndarray, elements: np.ndarray, bonds: np.ndarray, view: ViewParams) -> np.ndarray:
+    """
+    Rasterize a structure into an (size, size, 3) uint8 image
+    
+    Orthographic projection fitted to the structure. Spheres are stamped as
+    disks of depth and normal samples into a z-buffer, a whole batch of spheres
+    per NumPy pass; shading is Lambert plus ambient with depth cueing.
+    Rendered at `supersample` times the size and box-filtered down.
+    """
+    size = view.size * view.supersample
+    background = view.background_rgb()
+    image = np.empty((size * size, 3), dtype=np.float32)
+    image[:] = background
+    if len(coords) == 0:
+        return (image.reshape(view.size, view.supersample, view.size, view.supersample, 3).mean(axis=(1, 3)) * 255).astype(np.uint8)
+    
+    centers, radii, colors = _primitives(np.asarray(coords, dtype=np.float32), elements, bonds, view.style)
+    projected = (centers - centers.mean(axis=0)) @ _rotation(view.azimuth, view.elevation).T.astype(np.float32)
+    extent = float(np.max(np.abs(projected[:, :2]) + radii[:, None]))
+    scale = (size / 2) * 0.92 / max(extent, 1e-3)
+    
+    px = projected[:, 0] * scale + size / 2
+    py = size / 2 - projected[:, 1] * scale
+    pz = projected[:, 2] * scale
+    r = np.maximum(radii * scale, 0.75)
+    
+    depth = np.full(size * size, -np.inf, dtype=np.float32)
+    shade = np.zeros(size * size, dtype=np.float32)
+    owner = np.full(size * size, -1, dtype=np.int64)
+    z_low, z_high = float((pz - r).min()), float((pz + r).max())
+    
+    # Spheres are grouped by pixel reach so small ones (hydrogens, stick samples)
+    # do not pay for the stamp of the largest; batches only bound memory
+    reach = np.ceil(r).astype(np.int64)
+    for group_reach in np.unique(reach):
+        members = np.flatnonzero(reach == group_reach)
+        offsets = np.arange(-group_reach, group_reach + 1, dtype=np.float32)
+        dx, dy = (grid.reshape(-1) for grid in np.meshgrid(offsets, offsets))
+        batch = max(1, STAMP_BUDGET // len(dx))
+        
+        for begin in range(0, len(members), batch):
+            atoms = members[begin:begin + batch]
+            cx, cy, cr = px[atoms], py[atoms], r[atoms]
+            x = np.floor(cx)[:, None] + dx[None, :]
+            y = np.floor(cy)[:, None] + dy[None, :]
+            ox, oy = (x + 0.5 - cx[:, None]) / cr[:, None], (y + 0.5 - cy[:, None]) / cr[:, None]
+            d2 = ox * ox + oy * oy
+            inside = (d2 <= 1.0) & (x >= 0) & (x < size) & (y >= 0) & (y < size)
+            
+            atom, offset = np.nonzero(inside)
+            nz = np.sqrt(1.0 - d2[atom, offset])
+            z = pz[atoms][atom] + nz * cr[atom]
+            pixel = (y[atom, offset] * size + x[atom, offset]).astype(np.int64)
+            
+            # z-buffer: keep the nearest surface per pixel, then shade only the winners
+            np.maximum.at(depth, pixel, z)
+            front = z >= depth[pixel]
+            pixel, atom, offset, nz = pixel[front], atom[front], offset[front], nz[front]
+            shade[pixel] = ox[atom, offset] * LIGHT[0] - oy[atom, offset] * LIGHT[1] + nz * LIGHT[2]
+            owner[pixel] = atoms[atom]
+    
+    covered = owner >= 0
+    intensity = AMBIENT + (1.0 - AMBIENT) * np.clip(shade[covered], 0.0, 1.0)
+    fog = 0.35 * (z_high - depth[covered]) / max(z_high - z_low, 1e-6)
+    lit = colors[owner[covered]] * intensity[:, None]
+    image[covered] = lit * (1.0 - fog[:, None]) + background * fog[:, None]
+    
+    image = image.reshape(view.size, view.supersample, view.size, view.supersample, 3).mean(axis=(1, 3))
+    return np.clip(image * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+def encode_png(rgb: np.ndarray, level: int = 6) -> bytes:
+    """8-bit RGB PNG; rows use the Sub filter, which compresses flat backgrounds well"""
+    height, width, _ = rgb.shape
+    rows = rgb.reshape(height, width * 3)
+    filtered = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:4] = rows[:, :3]
+    filtered[:, 4:] = rows[:, 3:] - rows[:, :-3]  # uint8 arithmetic wraps modulo 256
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), level)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+def render_png(coords: np.ndarray, elements: np.ndarray, bonds: np.ndarray, view: ViewParams) -> bytes:
+    """Render and encode a thumbnail (pure function; safe to run in worker processes)"""
+    return encode_png(render_rgb(coords, elements, bonds, view))
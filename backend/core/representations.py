@@ -0,0 +1,14 @@
+"""Representations - Numpy-Free Names and Versions of the Served Structure Views"""
+
+# Imported by the routers to validate queries and key caches; the modules that
+# build these views (binary_frame, lod, rendering) load numpy on first use.
+
+# Binary visualization frame (see binary_frame)
+FRAME_VERSION = 1
+FRAME_MEDIA_TYPE = "application/vnd.biodockviz.frame"
+
+# Levels of detail, coarsest first (see lod)
+LOD_TIERS = ("trace", "residues", "octree", "full")
+
+# Thumbnail styles (see rendering)
+RENDER_STYLES = ("spheres", "sticks")
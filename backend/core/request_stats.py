@@ -0,0 +1,42 @@
+"""Per-Request I/O Statistics"""
+
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+class RequestStats:
+    """Bytes read from storage while serving one request"""
+    
+    def __init__(self):
+        self.bytes_read = 0
+        self.reads = 0
+        self.by_source: Dict[str, int] = {}
+    
+    def record_read(self, source: str, nbytes: int) -> None:
+        self.bytes_read += nbytes
+        self.reads += 1
+        self.by_source[source] = self.by_source.get(source, 0) + nbytes
+    
+    def to_dict(self) -> dict:
+        return {
+            'bytes_read': self.bytes_read,
+            'reads': self.reads,
+            'by_source': dict(self.by_source),
+        }
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def begin_request_stats() -> RequestStats:
+    """Start collecting statistics for the current request context"""
+    stats = RequestStats()
+    _current_stats.set(stats)
+    return stats
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Statistics of the current request (None outside a request)"""
+    return _current_stats.get()
+
+def record_bytes_read(source: str, nbytes: int) -> None:
+    """Account bytes loaded from storage to the current request"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record_read(source, nbytes)
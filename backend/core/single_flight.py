@@ -0,0 +1,173 @@
+"""Single Flight - Coalescing of Concurrent Identical Computations"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+class SingleFlight:
+    """
+    In-process deduplication of concurrent calls with the same key
+    
+    The first caller starts the computation as a task; callers arriving while
+    it runs attach to it and receive the same result (or exception). A
+    waiter that is cancelled detaches without cancelling the computation,
+    unless it was the last one, in which case nobody wants the result and the
+    computation is cancelled too; callers arriving after that start a new one.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+    
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of compute() for key, and whether it was shared with an earlier caller"""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.create_task(compute()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.joined += 1
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Forgotten now, not when the task ends, so later callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+    
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
+
+class SharedFlightLock:
+    """
+    Cross-worker single flight through Redis
+    
+    The worker that takes the lock for a key computes and, on success, leaves
+    a short-lived completion marker; the others wait for the lock to go and
+    then read the stored result if the marker is there, or compete for the
+    lock again if the holder failed. The holder keeps the lock alive while it
+    runs, so a long computation is never duplicated, and a crashed holder's
+    lock expires after `ttl` seconds.
+    """
+    
+    KEY_PREFIX = "biodockviz:flight:"
+    
+    # Release or extend only a lock we still own
+    RELEASE = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+    EXTEND = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('PEXPIRE', KEYS[1], ARGV[2]) end return 0"
+    
+    def __init__(self, url: str, ttl: float, wait: float, poll_interval: float = 0.1):
+        import redis.asyncio as redis_asyncio
+        
+        self.client = redis_asyncio.from_url(url)
+        self.ttl = ttl
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self._release = self.client.register_script(self.RELEASE)
+        self._extend = self.client.register_script(self.EXTEND)
+    
+    @classmethod
+    def from_settings(cls) -> Optional["SharedFlightLock"]:
+        if not settings.REDIS_URL:
+            return None
+        try:
+            return cls(settings.REDIS_URL, settings.ANALYSIS_LOCK_TTL, settings.ANALYSIS_LOCK_WAIT)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed; analyses are coalesced per worker only")
+            return None
+    
+    async def _keep_alive(self, key: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                await self._extend(keys=[key], args=[token, int(self.ttl * 1000)])
+            except Exception as e:
+                logger.warning(f"Failed to extend shared lock {key}: {e}")
+    
+    async def _take_turn(self, lock_key: str, done_key: str, token: str) -> str:
+        """'lead' once the lock is ours, 'done' when another worker finished, 'timeout' after waiting too long"""
+        deadline = time.monotonic() + self.wait
+        while True:
+            if await self.client.set(lock_key, token, nx=True, px=int(self.ttl * 1000)):
+                # A marker left by an earlier run must not vouch for this one
+                await self.client.delete(done_key)
+                return "lead"
+            # Someone else is computing: wait for their lock to go
+            while await self.client.exists(lock_key):
+                if time.monotonic() > deadline:
+                    return "timeout"
+                await asyncio.sleep(self.poll_interval)
+            if await self.client.exists(done_key):
+                return "done"
+    
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load_result: Callable[[], Awaitable[Any]],
+        shareable: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        compute() under the lock, or load_result() after another worker computed
+        
+        Returns (result, shared). Results failing shareable() leave no
+        completion marker, so waiters compute for themselves. Redis failures
+        fall back to computing without coordination.
+        """
+        lock_key = self.KEY_PREFIX + key
+        done_key = lock_key + ":done"
+        token = uuid.uuid4().hex
+        
+        try:
+            turn = await self._take_turn(lock_key, done_key, token)
+        except Exception as e:
+            logger.warning(f"Shared lock unavailable for {key}, computing without it: {e}")
+            return await compute(), False
+        if turn == "done":
+            return await load_result(), True
+        if turn == "timeout":
+            logger.warning(f"Timed out waiting for shared computation {key}; computing locally")
+            return await compute(), False
+        
+        keep_alive = asyncio.create_task(self._keep_alive(lock_key, token))
+        try:
+            result = await compute()
+            if shareable is None or shareable(result):
+                try:
+                    await self.client.set(done_key, "1", px=int(self.ttl * 1000))
+                except Exception as e:
+                    # Waiters find no marker and compute for themselves
+                    logger.warning(f"Failed to mark shared computation {key} done: {e}")
+            return result, False
+        finally:
+            keep_alive.cancel()
+            try:
+                await self._release(keys=[lock_key], args=[token])
+            except Exception as e:
+                logger.warning(f"Failed to release shared lock {key} (expires in {self.ttl}s): {e}")
+    
+    async def close(self) -> None:
+        await self.client.aclose()
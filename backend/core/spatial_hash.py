@@ -14,7 +14,6 @@ class SpatialHashGrid:
         """Initialize spatial hash grid"""
         self.cell_size = settings.SPATIAL_GRID_CELL_SIZE
         self.grid = {}
-        self.seen_atom_pairs = set()
         
         # Calculate optimal cell size
         if atoms:
@@ -0,0 +1,143 @@
+"""Structure Arrays - Columnar In-Memory Representation of Parsed Structures"""
+
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+@dataclass
+class StructureArrays:
+    """Decoded, columnar atom and bond data of one structure"""
+    
+    structure_id: str
+    file_hash: Optional[str]
+    coords: np.ndarray  # (n, 3) float64
+    elements: np.ndarray  # (n,) str
+    names: np.ndarray  # (n,) str
+    alt_locs: np.ndarray  # (n,) str
+    res_names: np.ndarray  # (n,) str
+    chain_ids: np.ndarray  # (n,) str
+    res_seqs: np.ndarray  # (n,) int32
+    i_codes: np.ndarray  # (n,) str
+    serials: np.ndarray  # (n,) int32
+    occupancy: np.ndarray  # (n,) float32
+    temp_factor: np.ndarray  # (n,) float32
+    charge: np.ndarray  # (n,) float32
+    bonds: np.ndarray  # (m, 2) int32
+    bond_orders: np.ndarray  # (m,) float32
+    bond_types: np.ndarray  # (m,) str
+    bond_distances: np.ndarray  # (m,) float64
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    lod: Optional[Any] = None  # core.lod.LODIndex, precomputed at parse time
+    
+    ARRAY_FIELDS = (
+        'coords', 'elements', 'names', 'alt_locs', 'res_names', 'chain_ids', 'res_seqs', 'i_codes', 'serials',
+        'occupancy', 'temp_factor', 'charge', 'bonds', 'bond_orders', 'bond_types', 'bond_distances',
+    )
+    
+    @property
+    def atom_count(self) -> int:
+        return len(self.coords)
+    
+    @property
+    def bond_count(self) -> int:
+        return len(self.bonds)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the arrays"""
+        total = sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)
+        return total + (self.lod.nbytes if self.lod is not None else 0)
+    
+    @classmethod
+    def from_parsed(cls, structure_id: str, file_hash: Optional[str], parsed: Dict[str, Any]) -> "StructureArrays":
+        """Build arrays from the stored parsed_data document (atoms/bonds/metadata)"""
+        atoms: List[dict] = parsed.get('atoms') or []
+        bonds: List[dict] = parsed.get('bonds') or []
+        
+        def column(key: str, default: Any, dtype) -> np.ndarray:
+            return np.array([atom.get(key, default) for atom in atoms], dtype=dtype)
+        
+        coords = np.array([(atom['x'], atom['y'], atom['z']) for atom in atoms], dtype=np.float64).reshape(-1, 3)
+        
+        return cls(
+            structure_id=str(structure_id),
+            file_hash=file_hash,
+            coords=coords,
+            elements=column('element', 'C', str),
+            names=column('name', '', str),
+            alt_locs=column('alt_loc', '', str),
+            res_names=column('res_name', '', str),
+            chain_ids=column('chain_id', '', str),
+            res_seqs=column('res_seq', 0, np.int32),
+            i_codes=column('i_code', '', str),
+            serials=np.array([atom.get('serial', i) for i, atom in enumerate(atoms)], dtype=np.int32),
+            occupancy=column('occupancy', 1.0, np.float32),
+            temp_factor=column('temp_factor', 0.0, np.float32),
+            charge=column('charge', 0.0, np.float32),
+            bonds=np.array([(b['atom1_index'], b['atom2_index']) for b in bonds], dtype=np.int32).reshape(-1, 2),
+            bond_orders=np.array([b.get('order', 1) for b in bonds], dtype=np.float32),
+            bond_types=np.array([b.get('type', 'single') for b in bonds], dtype=str),
+            bond_distances=np.array([b.get('distance', 0.0) for b in bonds], dtype=np.float64),
+            metadata=dict(parsed.get('metadata') or {}),
+        )
+    
+    def atom_records(self) -> List[dict]:
+        """Atom dictionaries in the parsed_data layout"""
+        x, y, z = (self.coords[:, k].tolist() for k in range(3))
+        columns = zip(
+            self.serials.tolist(), self.names.tolist(), self.alt_locs.tolist(), self.res_names.tolist(),
+            self.chain_ids.tolist(), self.res_seqs.tolist(), self.i_codes.tolist(), x, y, z,
+            self.occupancy.tolist(), self.temp_factor.tolist(), self.elements.tolist(), self.charge.tolist(),
+        )
+        return [
+            {
+                'index': i, 'serial': serial, 'name': name, 'alt_loc': alt_loc, 'res_name': res_name,
+                'chain_id': chain_id, 'res_seq': res_seq, 'i_code': i_code, 'x': ax, 'y': ay, 'z': az,
+                'occupancy': occupancy, 'temp_factor': temp_factor, 'element': element, 'charge': charge,
+            }
+            for i, (serial, name, alt_loc, res_name, chain_id, res_seq, i_code, ax, ay, az,
+                    occupancy, temp_factor, element, charge) in enumerate(columns)
+        ]
+    
+    def bond_records(self) -> List[dict]:
+        """Bond dictionaries in the parsed_data layout"""
+        return [
+            {'atom1_index': a1, 'atom2_index': a2, 'type': bond_type, 'order': order, 'distance': distance}
+            for (a1, a2), bond_type, order, distance in zip(
+                self.bonds.tolist(), self.bond_types.tolist(), self.bond_orders.tolist(), self.bond_distances.tolist()
+            )
+        ]
+    
+    def to_bytes(self) -> bytes:
+        """Serialize to an uncompressed .npz payload (no pickle)"""
+        buffer = io.BytesIO()
+        header = json.dumps({
+            'structure_id': self.structure_id,
+            'file_hash': self.file_hash,
+            'metadata': self.metadata,
+        })
+        arrays = {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        if self.lod is not None:
+            arrays.update(self.lod.to_arrays())
+        np.savez(buffer, header=np.array(header), **arrays)
+        return buffer.getvalue()
+    
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "StructureArrays":
+        """Deserialize a payload produced by to_bytes"""
+        from .lod import LODIndex
+        
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            arrays = {name: data[name] for name in cls.ARRAY_FIELDS}
+            lod = LODIndex.from_arrays(data)
+        return cls(
+            structure_id=header['structure_id'],
+            file_hash=header['file_hash'],
+            metadata=header['metadata'],
+            lod=lod,
+            **arrays,
+        )
@@ -0,0 +1,131 @@
+"""Tracing - Nested Stage Spans Timed with perf_counter_ns"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional
+
+from .memory import StageMemory, memory_tracker
+from .metrics import metrics
+
+# A request (or job) binds its correlation id; spans opened while serving it
+# nest under each other through a context variable, which asyncio tasks and
+# asyncio.to_thread carry along, so stages running in worker threads still
+# attach to the span that started them.
+
+_correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+STAGE_SECONDS = metrics.histogram(
+    "biodockviz_stage_duration_seconds",
+    "Duration of processing stages (stage: span name, path: enclosing spans)",
+    ("stage", "path"),
+)
+
+# Bytes, 64 KiB to 16 GiB
+MEMORY_BUCKETS = tuple(float(2 ** exponent) for exponent in range(16, 36, 2))
+
+STAGE_PEAK_BYTES = metrics.histogram(
+    "biodockviz_stage_memory_peak_bytes",
+    "Peak memory above the start of processing stages (MEMORY_TRACKING on)",
+    ("stage", "path"),
+    buckets=MEMORY_BUCKETS,
+)
+
+STAGE_RETAINED_BYTES = metrics.histogram(
+    "biodockviz_stage_memory_retained_bytes",
+    "Memory still held at the end of processing stages (net frees count as 0)",
+    ("stage", "path"),
+    buckets=MEMORY_BUCKETS,
+)
+
+def bind_correlation_id(correlation_id: Optional[str]) -> Token:
+    """Set the correlation id of the current request or job (reset with the returned token)"""
+    return _correlation_id.set(correlation_id)
+
+def current_correlation_id() -> Optional[str]:
+    return _correlation_id.get()
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+class Span:
+    """One timed stage and the stages nested in it"""
+    
+    __slots__ = ("name", "path", "correlation_id", "start_ns", "end_ns", "children", "memory")
+    
+    def __init__(self, name: str, parent: Optional["Span"], correlation_id: Optional[str]):
+        self.name = name
+        self.path = f"{parent.path}/{name}" if parent is not None else name
+        self.correlation_id = correlation_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.children: List["Span"] = []
+        self.memory: Optional[StageMemory] = None
+    
+    @property
+    def duration_ns(self) -> int:
+        """Elapsed time, up to now while the span is open"""
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+    
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+    
+    def breakdown_ms(self) -> Dict[str, float]:
+        """Milliseconds spent in each direct child stage (summed by name)"""
+        totals: Dict[str, float] = {}
+        for child in self.children:
+            totals[child.name] = totals.get(child.name, 0.0) + child.duration_ms
+        return {name: round(ms, 3) for name, ms in totals.items()}
+    
+    def memory_breakdown(self) -> Optional[Dict]:
+        """
+        Peak and retained bytes of the span (up to now while open) and of
+        each direct child stage (largest peak, summed retained by name);
+        None when memory tracking is off
+        """
+        if self.memory is None:
+            return None
+        stages: Dict[str, Dict[str, int]] = {}
+        for child in self.children:
+            if child.memory is None:
+                continue
+            usage = child.memory.summary()
+            totals = stages.setdefault(child.name, {"peak_bytes": 0, "retained_bytes": 0})
+            totals["peak_bytes"] = max(totals["peak_bytes"], usage["peak_bytes"])
+            totals["retained_bytes"] += usage["retained_bytes"]
+        return dict(self.memory.summary(memory_tracker.current()), stages=stages)
+    
+    def to_dict(self) -> Dict:
+        result = {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 3),
+            "children": [child.to_dict() for child in self.children],
+        }
+        if self.memory is not None:
+            result.update(self.memory.summary())
+        return result
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """Time a stage, nested under the current span, and record it in the stage histogram"""
+    parent = _current_span.get()
+    correlation_id = parent.correlation_id if parent is not None else _correlation_id.get()
+    current = Span(name, parent, correlation_id)
+    if parent is not None:
+        parent.children.append(current)
+    current.memory = memory_tracker.enter()
+    
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _current_span.reset(token)
+        STAGE_SECONDS.observe(current.duration_ns / 1e9, name, current.path)
+        if current.memory is not None:
+            memory_tracker.exit(current.memory)
+            usage = current.memory.summary()
+            STAGE_PEAK_BYTES.observe(usage["peak_bytes"], name, current.path)
+            STAGE_RETAINED_BYTES.observe(max(0, usage["retained_bytes"]), name, current.path)
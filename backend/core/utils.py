@@ -2,9 +2,10 @@
 
 import hashlib
 import uuid
-from typing import Any
+from typing import Any, Optional
 from datetime import datetime
 from ..logging_config import get_logger
+from .tracing import Span, span
 
 logger = get_logger(__name__)
 
@@ -29,27 +30,41 @@ def get_current_time_ms() -> int:
     return int(datetime.now().timestamp() * 1000)
 
 class PerformanceTimer:
-    """Context manager for timing operations"""
+    """
+    Context manager timing an operation as a tracing span
     
-    def __init__(self, operation_name: str):
+    The span (named stage, by default the operation name in snake case)
+    nests under the current one and feeds the stage duration histogram; the
+    duration is also logged with the correlation id.
+    """
+    
+    def __init__(self, operation_name: str, stage: Optional[str] = None):
         self.operation_name = operation_name
-        self.start_time = None
-        self.end_time = None
+        self.stage = stage or operation_name.lower().replace(" ", "_")
+        self.span: Optional[Span] = None
+        self._context = None
     
     def __enter__(self):
-        self.start_time = get_current_time_ms()
+        self._context = span(self.stage)
+        self.span = self._context.__enter__()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = get_current_time_ms()
-        duration = self.end_time - self.start_time
+        self._context.__exit__(exc_type, exc_val, exc_tb)
+        duration = self.span.duration_ms
         
         logger.info(
-            f"Operation: {self.operation_name} completed in {duration}ms",
+            f"Operation: {self.operation_name} completed in {duration:.3f}ms",
             extra={
                 "operation": self.operation_name,
                 "duration_ms": duration,
+                "correlation_id": self.span.correlation_id,
             }
         )
         
         return False
+    
+    @property
+    def duration_ms(self) -> float:
+        """Elapsed milliseconds (so far, while running)"""
+        return self.span.duration_ms if self.span is not None else 0.0
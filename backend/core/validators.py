@@ -2,12 +2,15 @@
 
 import re
 import hashlib
-from typing import Optional, List, Tuple, Set
+from typing import TYPE_CHECKING, Optional, List, Tuple, Set
 from fastapi import UploadFile, HTTPException
 from math import isfinite
 from ..config import settings
 from ..logging_config import get_logger
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = get_logger(__name__)
 
 class FileValidator:
@@ -27,37 +30,26 @@ class FileValidator:
         "MASTER", "END", "ENDMDL"
     }
     
-    # Malicious patterns to detect
+    # Malicious patterns to detect (byte patterns, combined into one automaton below)
     MALICIOUS_PATTERNS = [
-        re.compile(r"<script", re.IGNORECASE),
-        re.compile(r"javascript:", re.IGNORECASE),
-        re.compile(r"<\?php", re.IGNORECASE),
-        re.compile(r"<%", re.IGNORECASE),
-        re.compile(r"document\.cookie", re.IGNORECASE),
-        re.compile(r"window\.location", re.IGNORECASE),
-        re.compile(r"eval\s*\(", re.IGNORECASE),
-        re.compile(r"alert\s*\(", re.IGNORECASE),
-        re.compile(r"console\.log", re.IGNORECASE),
+        rb"<script",
+        rb"javascript:",
+        rb"<\?php",
+        rb"<%",
+        rb"document\.cookie",
+        rb"window\.location",
+        rb"eval\s*\(",
+        rb"alert\s*\(",
+        rb"console\.log",
     ]
     
     @staticmethod
     async def validate_file(file: UploadFile, filename: str) -> Tuple[bool, Optional[str]]:
         """
-        Validate uploaded file
+        Validate uploaded file in a single streaming pass
         Returns: (is_valid, error_message)
         """
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-        
-        # Reset file pointer for potential re-reading
-        await file.seek(0)
-        
-        # Check file size
-        if file_size > FileValidator.MAX_FILE_SIZE:
-            return False, f"File too large: {file_size / 1024 / 1024:.2f} MB (max: {FileValidator.MAX_FILE_SIZE / 1024 / 1024:.2f} MB)"
-        
-        # Check file extension
+        # Check file extension before touching the content
         extension = filename.split('.')[-1].lower() if '.' in filename else None
         if extension not in FileValidator.ALLOWED_EXTENSIONS:
             return False, f"Unsupported file type: .{extension or 'unknown'}. Supported: {', '.join(FileValidator.ALLOWED_EXTENSIONS)}"
@@ -67,28 +59,23 @@ class FileValidator:
         if content_type and not content_type.startswith("chemical/"):
             logger.warning(f"Suspicious MIME type: {content_type} for file: {filename}")
         
-        # Check magic numbers (for PDB files)
-        if extension in ["pdb", "pdbqt"]:
-            # Check for valid PDB magic numbers
-            lines = file_content.split(b'\n')[:10]
-            valid_magic = False
-            for line in lines:
-                record_name = line[:6].strip().decode('utf-8', errors='ignore').upper() if len(line) >= 6 else None
-                if record_name in FileValidator.PDB_MAGIC_NUMBERS:
-                    valid_magic = True
-                    break
-            
-            if not valid_magic:
-                logger.error(f"Invalid PDB file magic numbers for file: {filename}")
-                return False, "Invalid PDB file format: File does not start with valid PDB records (HEADER, TITLE, ATOM, etc.)"
+        scanner = ContentScanner(extension, max_size=FileValidator.MAX_FILE_SIZE)
+        error = None
         
-        # Check for malicious patterns
-        text_content = file_content.decode('utf-8', errors='ignore')
+        try:
+            while error is None:
+                chunk = await file.read(settings.CHUNK_SIZE)
+                if not chunk:
+                    error = scanner.finish()
+                    break
+                error = scanner.feed(chunk)
+        finally:
+            # Reset file pointer for potential re-reading
+            await file.seek(0)
         
-        for pattern in FileValidator.MALICIOUS_PATTERNS:
-            if pattern.search(text_content):
-                logger.error(f"Malicious pattern detected: {pattern.pattern} in file: {filename}")
-                return False, "File contains potentially malicious code. Upload rejected."
+        if error:
+            logger.error(f"File validation failed for file: {filename} - {error}")
+            return False, error
         
         return True, None
     
@@ -103,6 +90,128 @@ class FileValidator:
         # Limit length
         return sanitized[:100]
 
+class ContentScanner:
+    """
+    Streaming content scanner for structure files
+    
+    Content is fed chunk by chunk and checked in one linear pass with constant
+    memory: size limit, per-format structural magic on the leading lines, and all
+    malicious patterns through a single combined regex. The tail of each chunk is
+    carried over (its trailing whitespace collapsed) so matches spanning chunk
+    boundaries are still found. Scanning stops at the first violation.
+    """
+    
+    MALICIOUS_REGEX = re.compile(
+        b"|".join(b"(?:" + pattern + b")" for pattern in FileValidator.MALICIOUS_PATTERNS),
+        re.IGNORECASE,
+    )
+    
+    # Longest malicious match, with its whitespace run collapsed, minus one byte
+    SCAN_OVERLAP = 32
+    
+    # Structural magic is checked on the first lines of the file
+    MAGIC_LINES = 10
+    MAGIC_MAX_BYTES = 64 * 1024
+    
+    def __init__(self, extension: Optional[str], max_size: int = settings.MAX_FILE_SIZE):
+        self.extension = extension
+        self.max_size = max_size
+        self.bytes_scanned = 0
+        self._tail = b""
+        self._header = b""
+        self._magic_checked = extension not in self.MAGIC_CHECKS
+    
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Scan the next chunk; returns an error message on the first violation"""
+        self.bytes_scanned += len(chunk)
+        if self.bytes_scanned > self.max_size:
+            return f"File too large: more than {self.max_size / 1024 / 1024:.2f} MB (max: {self.max_size / 1024 / 1024:.2f} MB)"
+        
+        if not self._magic_checked:
+            self._header += chunk[:self.MAGIC_MAX_BYTES]
+            if self._header.count(b"\n") >= self.MAGIC_LINES or len(self._header) >= self.MAGIC_MAX_BYTES:
+                error = self._check_magic()
+                if error:
+                    return error
+        
+        buffer = self._tail + chunk
+        match = self.MALICIOUS_REGEX.search(buffer)
+        if match:
+            logger.debug(f"Malicious pattern detected: {match.group(0)[:32]!r}")
+            return "File contains potentially malicious code. Upload rejected."
+        
+        # Trailing whitespace is collapsed to one space, so "eval" followed by any
+        # run of whitespace still matches when the "(" comes in a later chunk
+        stripped = buffer.rstrip()
+        self._tail = stripped[-self.SCAN_OVERLAP:] + (b" " if len(stripped) < len(buffer) else b"")
+        return None
+    
+    def finish(self) -> Optional[str]:
+        """Complete the scan; checks magic for files shorter than the header window"""
+        if self.bytes_scanned == 0:
+            return "Empty file"
+        if not self._magic_checked:
+            return self._check_magic()
+        return None
+    
+    def _check_magic(self) -> Optional[str]:
+        self._magic_checked = True
+        lines = self._header.split(b"\n")[:self.MAGIC_LINES]
+        check = self.MAGIC_CHECKS[self.extension]
+        error = check(lines)
+        self._header = b""
+        return error
+    
+    @staticmethod
+    def _check_pdb_magic(lines: List[bytes]) -> Optional[str]:
+        for line in lines:
+            record_name = line[:6].strip().decode('utf-8', errors='ignore').upper() if len(line) >= 6 else None
+            if record_name in FileValidator.PDB_MAGIC_NUMBERS:
+                return None
+        return "Invalid PDB file format: File does not start with valid PDB records (HEADER, TITLE, ATOM, etc.)"
+    
+    @staticmethod
+    def _check_sdf_magic(lines: List[bytes]) -> Optional[str]:
+        # MDL molfile: three header lines, then the counts line
+        if len(lines) >= 4:
+            counts_line = lines[3].rstrip()
+            if counts_line.endswith((b"V2000", b"V3000")) or counts_line[:3].strip().isdigit():
+                return None
+        return "Invalid SDF/MOL file format: Missing V2000/V3000 counts line"
+    
+    @staticmethod
+    def _check_mol2_magic(lines: List[bytes]) -> Optional[str]:
+        for line in lines:
+            stripped = line.strip()
+            if not stripped or stripped.startswith(b"#"):
+                continue
+            if stripped.upper().startswith(b"@<TRIPOS>"):
+                return None
+            break
+        return "Invalid MOL2 file format: File does not start with a @<TRIPOS> record"
+    
+    @staticmethod
+    def _check_mmcif_magic(lines: List[bytes]) -> Optional[str]:
+        for line in lines:
+            stripped = line.strip()
+            if not stripped or stripped.startswith(b"#"):
+                continue
+            if stripped.lower().startswith(b"data_"):
+                return None
+            break
+        return "Invalid mmCIF file format: File does not start with a data_ block"
+    
+    MAGIC_CHECKS = {
+        "pdb": _check_pdb_magic.__func__,
+        "pdbqt": _check_pdb_magic.__func__,
+        "sdf": _check_sdf_magic.__func__,
+        "sd": _check_sdf_magic.__func__,
+        "mol": _check_sdf_magic.__func__,
+        "mol2": _check_mol2_magic.__func__,
+        "mcif": _check_mmcif_magic.__func__,
+        "mmcif": _check_mmcif_magic.__func__,
+    }
+
 class ContentTypeValidator:
     """Content type validator"""
     
@@ -168,6 +277,16 @@ class AtomValidator:
             return False
         
         return True
+    
+    @staticmethod
+    def invalid_coordinate_indices(coords: "np.ndarray") -> List[int]:
+        """
+        Indices of rows in an (n, 3) coordinate array failing validate_coordinates
+        """
+        import numpy as np
+        
+        valid = np.isfinite(coords).all(axis=1) & (np.abs(coords) <= 1000).all(axis=1)
+        return np.flatnonzero(~valid).tolist()
 
 class StructureValidator:
     """Structure data validator"""
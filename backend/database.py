@@ -1,33 +1,47 @@
 """Database Models and Session Management"""
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import create_engine, Column, Index, Integer, String, Float, Boolean, DateTime, JSON, ForeignKey, Text, Uuid
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, relationship, deferred
+from sqlalchemy.types import TypeDecorator
+from contextlib import asynccontextmanager
 from datetime import datetime
 import uuid
 from typing import Optional, List
-from .config import settings
+from .storage import create_backend
 
 Base = declarative_base()
 
+class GUID(TypeDecorator):
+    """Portable UUID column (native uuid on PostgreSQL, CHAR(32) on SQLite) accepting str ids"""
+    
+    impl = Uuid
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
 class Structure(Base):
     """Structure model"""
     
     __tablename__ = "structures"
     
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     file_name = Column(String(255), nullable=False)
     file_type = Column(String(10), nullable=False)
     file_size = Column(Integer, nullable=False)
     file_hash = Column(String(64), unique=True, nullable=False, index=True)
-    content = Column(Text, nullable=True)  # File content for cache
-    parsed_data = Column(JSON, nullable=True)  # Parsed structure data
-    metadata = Column(JSON, nullable=True)  # File metadata
+    # Heavy columns are deferred; load them through services.structure_store
+    content = deferred(Column(Text, nullable=True))  # File content for cache
+    parsed_data = deferred(Column(JSON, nullable=True))  # Parsed structure data
+    metadata_ = Column("metadata", JSON, nullable=True)  # File metadata
     atom_count = Column(Integer, nullable=False, default=0)
     bond_count = Column(Integer, nullable=False, default=0)
-    analysis_data = Column(JSON, nullable=True)  # Interaction analysis results
+    analysis_data = deferred(Column(JSON, nullable=True))  # Interaction analysis results
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -42,7 +56,7 @@ class Atom(Base):
     __tablename__ = "atoms"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    structure_id = Column(PostgresUUID(as_uuid=True), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
+    structure_id = Column(GUID(), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
     serial = Column(Integer, nullable=False, index=True)
     index = Column(Integer, nullable=False)  # 0-indexed
     name = Column(String(10), nullable=False)
@@ -60,6 +74,14 @@ class Atom(Base):
     charge = Column(Float, default=0.0, nullable=False)
     
     structure = relationship("Structure", back_populates="atoms")
+    
+    # Keyset pagination (services.atom_store): pages are ordered by atom index
+    __table_args__ = (
+        Index("ix_atoms_structure_index", "structure_id", "index"),
+        Index("ix_atoms_structure_residue", "structure_id", "chain_id", "res_seq", "index"),
+        Index("ix_atoms_structure_chain", "structure_id", "chain_id", "index"),
+        Index("ix_atoms_structure_element", "structure_id", "element", "index"),
+    )
 
 class Bond(Base):
     """Bond model"""
@@ -67,7 +89,7 @@ class Bond(Base):
     __tablename__ = "bonds"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    structure_id = Column(PostgresUUID(as_uuid=True), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
+    structure_id = Column(GUID(), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
     atom1_index = Column(Integer, nullable=False, index=True)
     atom2_index = Column(Integer, nullable=False, index=True)
     type = Column(String(10), nullable=False)  # single, double, triple, aromatic
@@ -83,7 +105,7 @@ class Interaction(Base):
     __tablename__ = "interactions"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    structure_id = Column(PostgresUUID(as_uuid=True), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
+    structure_id = Column(GUID(), ForeignKey("structures.id", ondelete="CASCADE"), nullable=False, index=True)
     interaction_type = Column(String(20), nullable=False, index=True)
     atom1_index = Column(Integer, nullable=False, index=True)
     atom2_index = Column(Integer, nullable=False, index=True)
@@ -95,49 +117,114 @@ class Interaction(Base):
     atom2_residue_seq = Column(Integer, nullable=True)
     is_predicted = Column(Boolean, default=False, nullable=False)
     confidence = Column(Float, nullable=True)
-    metadata = Column(JSON, nullable=True)
+    metadata_ = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     
     structure = relationship("Structure", back_populates="interactions")
+    
+    # Keyset pagination (services.interaction_store): pages are ordered by id
+    __table_args__ = (
+        Index("ix_interactions_structure_order", "structure_id", "id"),
+        Index("ix_interactions_structure_type_id", "structure_id", "interaction_type", "id"),
+        Index("ix_interactions_structure_residue1", "structure_id", "atom1_residue_seq"),
+        Index("ix_interactions_structure_residue2", "structure_id", "atom2_residue_seq"),
+    )
 
-# Async engine
-async_engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DATABASE_ECHO,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    pool_recycle=settings.DATABASE_POOL_RECYCLE,
-    pool_pre_ping=True,
-    future=True,
-)
+class Job(Base):
+    """Background job model"""
+    
+    __tablename__ = "jobs"
+    
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, retrying, succeeded, failed
+    structure_id = Column(GUID(), ForeignKey("structures.id", ondelete="CASCADE"), nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    stage = Column(String(50), nullable=True)  # Current stage name
+    stages = Column(JSON, nullable=True)  # Per-stage progress (0-1)
+    progress = Column(Float, nullable=False, default=0.0)  # Overall progress (0-1)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    correlation_id = Column(String(64), nullable=True)
+    worker_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+# Storage backend selected from DATABASE_URL (PostgreSQL server or embedded SQLite)
+storage_backend = create_backend()
+
+# Async engine; created on first use (or at application startup), so importing
+# the package neither imports the database driver nor opens a pool
+async_engine: Optional[AsyncEngine] = None
 
 AsyncSessionLocal = async_sessionmaker(
-    async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autoflush=False,
 )
 
-# Sync engine (for migrations)
-sync_engine = create_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://"),
-    echo=settings.DATABASE_ECHO,
-)
+# Sync engine (for migrations); created on first use so startup does not import a second driver
+sync_engine: Optional[Engine] = None
 
 SessionLocal = sessionmaker(
-    sync_engine,
     autocommit=False,
     autoflush=False,
 )
 
+def get_engine() -> AsyncEngine:
+    """Create (once) the async engine and bind AsyncSessionLocal to it"""
+    global async_engine
+    if async_engine is None:
+        async_engine = create_async_engine(storage_backend.async_url(), **storage_backend.engine_options())
+        storage_backend.configure(async_engine.sync_engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+async def dispose_engine() -> None:
+    """Close the async engine's pool (a later get_engine() starts a new one)"""
+    global async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+
+def get_sync_engine() -> Engine:
+    """Create (once) the sync engine and bind SessionLocal to it"""
+    global sync_engine
+    if sync_engine is None:
+        sync_engine = create_engine(storage_backend.sync_url(), **storage_backend.engine_options())
+        storage_backend.configure(sync_engine)
+        SessionLocal.configure(bind=sync_engine)
+    return sync_engine
+
+def write_lock():
+    """Serialize a write transaction where the backend allows only one writer (SQLite)"""
+    return storage_backend.write_lock()
+
+@asynccontextmanager
 async def get_db():
     """Get async database session"""
+    get_engine()
     async with AsyncSessionLocal() as session:
         yield session
 
+def _create_indexes(connection) -> None:
+    # create_all adds indexes only with a new table; this adds ones defined later
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 async def init_db():
-    """Initialize database tables"""
-    async with async_engine.begin() as conn:
+    """Initialize database tables (and indexes missing from existing ones)"""
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_indexes)
 
-# Alias for compatibility
-engine = async_engine
+def __getattr__(name: str):
+    # 'engine' (alias for compatibility) creates the engine when first asked for
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,11 @@
+"""Background job subsystem"""
+
+from .brokers import JobBroker, InProcessBroker, SQLiteBroker, RedisBroker, create_broker
+from .queue import JobQueue, JobStatus, job_queue
+from .worker import WorkerPool, JobContext, job_handler
+
+__all__ = [
+    "JobBroker", "InProcessBroker", "SQLiteBroker", "RedisBroker", "create_broker",
+    "JobQueue", "JobStatus", "job_queue",
+    "WorkerPool", "JobContext", "job_handler",
+]
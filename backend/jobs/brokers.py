@@ -0,0 +1,214 @@
+"""Job Brokers - Pluggable Queue Transports for Background Jobs"""
+
+import asyncio
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Dict
+
+from ..config import settings
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class JobBroker(ABC):
+    """Queue transport carrying job ids from producers to workers"""
+    
+    # Whether queued ids survive a process restart
+    durable: bool = False
+    
+    @abstractmethod
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        """Make a job available to workers after an optional delay (seconds)"""
+    
+    @abstractmethod
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        """Claim the next available job id, or None after timeout"""
+    
+    @abstractmethod
+    async def ack(self, job_id: str) -> None:
+        """Remove a claimed job id from the queue"""
+    
+    async def size(self) -> int:
+        """Number of queued (unclaimed) job ids"""
+        return 0
+    
+    async def close(self) -> None:
+        """Release broker resources"""
+
+class InProcessBroker(JobBroker):
+    """asyncio queue broker for workers running in the same process"""
+    
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._delayed: Dict[str, asyncio.TimerHandle] = {}
+    
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            loop = asyncio.get_running_loop()
+            self._delayed[job_id] = loop.call_later(delay, self._release, job_id)
+        else:
+            self._queue.put_nowait(job_id)
+    
+    def _release(self, job_id: str) -> None:
+        self._delayed.pop(job_id, None)
+        self._queue.put_nowait(job_id)
+    
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def ack(self, job_id: str) -> None:
+        pass
+    
+    async def size(self) -> int:
+        return self._queue.qsize()
+    
+    async def close(self) -> None:
+        for handle in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+
+class SQLiteBroker(JobBroker):
+    """File-backed broker for local and desktop deployments (no server required)"""
+    
+    durable = True
+    POLL_INTERVAL = 0.2
+    
+    def __init__(self, path: str = settings.JOB_QUEUE_PATH, visibility_timeout: int = settings.JOB_VISIBILITY_TIMEOUT):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_queue ("
+                " job_id TEXT PRIMARY KEY,"
+                " available_at REAL NOT NULL,"
+                " claimed_at REAL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_job_queue_available ON job_queue (claimed_at, available_at)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+    
+    def _enqueue(self, job_id: str, delay: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_queue (job_id, available_at, claimed_at) VALUES (?, ?, NULL) "
+                "ON CONFLICT(job_id) DO UPDATE SET available_at = excluded.available_at, claimed_at = NULL",
+                (job_id, time.time() + delay),
+            )
+    
+    def _claim(self) -> Optional[str]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Unclaimed and due, or claimed by a worker that stopped responding
+            row = conn.execute(
+                "SELECT job_id FROM job_queue "
+                "WHERE (claimed_at IS NULL AND available_at <= ?) OR claimed_at < ? "
+                "ORDER BY available_at LIMIT 1",
+                (now, now - self.visibility_timeout),
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE job_queue SET claimed_at = ? WHERE job_id = ?", (now, row[0]))
+            conn.execute("COMMIT")
+            return row[0] if row else None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def _ack(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_queue WHERE job_id = ?", (job_id,))
+    
+    def _size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM job_queue WHERE claimed_at IS NULL").fetchone()[0]
+    
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        await asyncio.to_thread(self._enqueue, job_id, delay)
+    
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job_id = await asyncio.to_thread(self._claim)
+            if job_id or time.monotonic() >= deadline:
+                return job_id
+            await asyncio.sleep(self.POLL_INTERVAL)
+    
+    async def ack(self, job_id: str) -> None:
+        await asyncio.to_thread(self._ack, job_id)
+    
+    async def size(self) -> int:
+        return await asyncio.to_thread(self._size)
+
+class RedisBroker(JobBroker):
+    """Redis list broker shared by all API and worker processes"""
+    
+    durable = True
+    
+    QUEUE_KEY = "biodockviz:jobs:queue"
+    PROCESSING_KEY = "biodockviz:jobs:processing"
+    DELAYED_KEY = "biodockviz:jobs:delayed"
+    
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        
+        self.url = url
+        self.client = redis_asyncio.from_url(url, decode_responses=True)
+    
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            await self.client.zadd(self.DELAYED_KEY, {job_id: time.time() + delay})
+        else:
+            await self.client.lpush(self.QUEUE_KEY, job_id)
+    
+    async def _promote_delayed(self) -> None:
+        due = await self.client.zrangebyscore(self.DELAYED_KEY, 0, time.time())
+        for job_id in due:
+            # Only the process that removes the entry re-queues it
+            if await self.client.zrem(self.DELAYED_KEY, job_id):
+                await self.client.lpush(self.QUEUE_KEY, job_id)
+    
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        await self._promote_delayed()
+        return await self.client.blmove(self.QUEUE_KEY, self.PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+    
+    async def ack(self, job_id: str) -> None:
+        await self.client.lrem(self.PROCESSING_KEY, 1, job_id)
+    
+    async def size(self) -> int:
+        return await self.client.llen(self.QUEUE_KEY)
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+def create_broker(kind: Optional[str] = None) -> JobBroker:
+    """Create the configured broker; 'auto' prefers Redis when configured and installed"""
+    kind = (kind or settings.JOB_BROKER).lower()
+    
+    if kind in ("auto", "redis") and settings.REDIS_URL:
+        try:
+            broker = RedisBroker(settings.REDIS_URL)
+            logger.info(f"Job broker: redis ({settings.REDIS_URL})")
+            return broker
+        except ImportError:
+            if kind == "redis":
+                raise
+            logger.warning("REDIS_URL is set but the redis package is not installed; falling back to SQLite broker")
+    
+    if kind == "memory":
+        logger.info("Job broker: in-process")
+        return InProcessBroker()
+    
+    logger.info(f"Job broker: sqlite ({settings.JOB_QUEUE_PATH})")
+    return SQLiteBroker()
@@ -0,0 +1,43 @@
+"""Job Handlers - Built-in Background Job Types"""
+
+from typing import Dict, Any
+
+from ..database import get_db
+from ..logging_config import get_logger
+from ..services import get_parsing_service, get_thumbnail_service
+from ..services.structure_store import load_content
+from ..services.thumbnail_service import make_view
+from ..core.exceptions import ParseException
+from .worker import job_handler, JobContext
+
+logger = get_logger(__name__)
+
+@job_handler("parse_structure", stages=["load", "parse", "persist"])
+async def parse_structure(ctx: JobContext) -> Dict[str, Any]:
+    """Parse an uploaded structure stored in the database"""
+    filename = ctx.payload.get("filename", "")
+    await ctx.progress("load")
+    
+    async with get_db() as db:
+        content = await load_content(db, ctx.structure_id)
+        if content is None:
+            raise ParseException(message=f"Structure not found: {ctx.structure_id}", code="STRUCTURE_NOT_FOUND")
+    
+    result = await get_parsing_service().parse_structure(ctx.structure_id, content, filename, progress=ctx.progress)
+    await ctx.progress("persist", 1.0)
+    
+    return {
+        "structure_id": ctx.structure_id,
+        "atom_count": result.metadata.atom_count,
+        "bond_count": result.metadata.bond_count,
+    }
+
+@job_handler("render_thumbnails", stages=["render"])
+async def render_thumbnails(ctx: JobContext) -> Dict[str, Any]:
+    """Render thumbnails of a list of structures into the thumbnail cache"""
+    view = make_view(**ctx.payload["view"])
+    
+    async def progress(done: int, total: int) -> None:
+        await ctx.progress("render", done / total)
+    
+    return await get_thumbnail_service().render_batch(ctx.payload["structure_ids"], view, progress=progress)
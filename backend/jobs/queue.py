@@ -0,0 +1,175 @@
+"""Job Queue - Persisted Job Table Plus Broker Dispatch"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+
+from sqlalchemy import select, update
+
+from ..config import settings
+from ..database import Job, get_db
+from ..logging_config import get_logger
+from ..core.tracing import current_correlation_id
+from ..core.profiling import profile_active
+from .brokers import JobBroker, create_broker
+
+logger = get_logger(__name__)
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    
+    PENDING = (QUEUED, RETRYING)
+    FINISHED = (SUCCEEDED, FAILED)
+
+class JobQueue:
+    """Submits jobs to the persisted job table and dispatches them through a broker"""
+    
+    def __init__(self, broker: Optional[JobBroker] = None):
+        self._broker = broker
+    
+    @property
+    def broker(self) -> JobBroker:
+        if self._broker is None:
+            self._broker = create_broker()
+        return self._broker
+    
+    async def submit(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        structure_id: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+    ) -> str:
+        """Persist a job and make it available to workers; returns the job id"""
+        job_id = uuid.uuid4()
+        # Jobs inherit the submitting request's correlation id, which the worker binds for their logs and spans
+        correlation_id = correlation_id or current_correlation_id()
+        # ...and are profiled too when the submitting request is
+        if profile_active():
+            payload = dict(payload or {}, profile=True)
+        
+        async with get_db() as db:
+            db.add(Job(
+                id=job_id,
+                job_type=job_type,
+                status=JobStatus.QUEUED,
+                structure_id=uuid.UUID(structure_id) if structure_id else None,
+                payload=payload or {},
+                stages={},
+                progress=0.0,
+                attempts=0,
+                max_attempts=max_attempts,
+                correlation_id=correlation_id,
+            ))
+            await db.commit()
+        
+        await self.broker.enqueue(str(job_id))
+        logger.info(f"Job queued: {job_type} {job_id}", extra={"correlation_id": correlation_id})
+        return str(job_id)
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Load a job by id"""
+        async with get_db() as db:
+            return await db.get(Job, uuid.UUID(job_id))
+    
+    async def claim(self, job_id: str, worker_id: str) -> Optional[Job]:
+        """Atomically move a pending (or stale running) job to running; None if another worker owns it"""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+        
+        async with get_db() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == uuid.UUID(job_id))
+                .where(
+                    Job.status.in_(JobStatus.PENDING)
+                    | ((Job.status == JobStatus.RUNNING) & (Job.updated_at < stale_before))
+                )
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    worker_id=worker_id,
+                    started_at=now,
+                    updated_at=now,
+                    error=None,
+                )
+            )
+            await db.commit()
+            if result.rowcount == 0:
+                return None
+            return await db.get(Job, uuid.UUID(job_id), populate_existing=True)
+    
+    async def report_progress(self, job_id: str, stage: str, fraction: float, stages: Dict[str, float]) -> None:
+        """Persist per-stage progress; doubles as the worker heartbeat"""
+        overall = sum(stages.values()) / len(stages) if stages else fraction
+        async with get_db() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == uuid.UUID(job_id))
+                .values(stage=stage, stages=dict(stages), progress=overall, updated_at=datetime.utcnow())
+            )
+            await db.commit()
+    
+    async def complete(self, job_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a job as succeeded"""
+        now = datetime.utcnow()
+        async with get_db() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == uuid.UUID(job_id))
+                .values(status=JobStatus.SUCCEEDED, result=result, progress=1.0, finished_at=now, updated_at=now)
+            )
+            await db.commit()
+        await self.broker.ack(job_id)
+    
+    async def fail(self, job_id: str, error: str, retry: bool, attempts: int) -> None:
+        """Record a failure; schedules a retry with exponential backoff when allowed"""
+        now = datetime.utcnow()
+        status = JobStatus.RETRYING if retry else JobStatus.FAILED
+        async with get_db() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == uuid.UUID(job_id))
+                .values(status=status, error=error, updated_at=now, finished_at=None if retry else now)
+            )
+            await db.commit()
+        
+        await self.broker.ack(job_id)
+        if retry:
+            delay = settings.JOB_RETRY_BACKOFF ** attempts
+            await self.broker.enqueue(job_id, delay=delay)
+            logger.warning(f"Job {job_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {error}")
+        else:
+            logger.error(f"Job {job_id} failed permanently after {attempts} attempts: {error}")
+    
+    async def recover(self) -> int:
+        """Re-dispatch pending and stale jobs (after a restart or with a non-durable broker)"""
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+        
+        async with get_db() as db:
+            query = select(Job.id).where(
+                Job.status.in_(JobStatus.PENDING)
+                | ((Job.status == JobStatus.RUNNING) & (Job.updated_at < stale_before))
+            )
+            if self.broker.durable:
+                # Durable brokers still hold pending ids; only stale running jobs are lost
+                query = select(Job.id).where((Job.status == JobStatus.RUNNING) & (Job.updated_at < stale_before))
+            job_ids: List[str] = [str(row[0]) for row in (await db.execute(query)).all()]
+        
+        for job_id in job_ids:
+            await self.broker.enqueue(job_id)
+        
+        if job_ids:
+            logger.info(f"Recovered {len(job_ids)} job(s)")
+        return len(job_ids)
+    
+    async def close(self) -> None:
+        if self._broker is not None:
+            await self._broker.close()
+
+job_queue = JobQueue()
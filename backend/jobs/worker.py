@@ -0,0 +1,181 @@
+"""Job Worker Pool - Executes Queued Jobs With Bounded Concurrency"""
+
+import asyncio
+import os
+import socket
+from typing import Awaitable, Callable, Dict, List, Optional, Any
+
+from ..config import settings
+from ..logging_config import get_logger, parse_sampling, setup_logging
+from ..core.exceptions import MemoryBudgetException
+from ..core.memory import memory_tracker
+from ..core.tracing import bind_correlation_id, span
+from ..core.profiling import profiler
+from .queue import JobQueue, job_queue
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[["JobContext"], Awaitable[Optional[Dict[str, Any]]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# Declared stage names per job type, used to compute overall progress
+JOB_STAGES: Dict[str, List[str]] = {}
+
+def job_handler(job_type: str, stages: Optional[List[str]] = None):
+    """Register a coroutine as the handler for a job type"""
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = func
+        JOB_STAGES[job_type] = list(stages or [])
+        return func
+    return decorator
+
+class JobContext:
+    """Handle passed to job handlers for payload access and progress reporting"""
+    
+    def __init__(self, queue: JobQueue, job_id: str, job_type: str, payload: Dict[str, Any],
+                 structure_id: Optional[str], correlation_id: Optional[str], stage_names: List[str]):
+        self.queue = queue
+        self.job_id = job_id
+        self.job_type = job_type
+        self.payload = payload
+        self.structure_id = structure_id
+        self.correlation_id = correlation_id
+        self.stages: Dict[str, float] = {name: 0.0 for name in stage_names}
+    
+    async def progress(self, stage: str, fraction: float = 0.0) -> None:
+        """Report progress (0-1) of a stage; earlier stages are marked complete"""
+        for name in self.stages:
+            if name == stage:
+                break
+            self.stages[name] = 1.0
+        self.stages[stage] = max(0.0, min(1.0, fraction))
+        await self.queue.report_progress(self.job_id, stage, self.stages[stage], self.stages)
+
+class WorkerPool:
+    """Pool of worker tasks pulling job ids from the broker"""
+    
+    def __init__(self, queue: JobQueue = job_queue, concurrency: int = settings.JOB_WORKERS):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+    
+    async def start(self) -> None:
+        """Recover pending jobs and start worker tasks"""
+        # Register built-in handlers
+        from . import handlers  # noqa: F401
+        
+        self._running = True
+        await self.queue.recover()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(n), name=f"job-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        logger.info(f"Job worker pool started: {self.concurrency} worker(s) [{self.worker_id}]")
+    
+    async def stop(self) -> None:
+        """Stop worker tasks; in-flight jobs are recovered on the next start"""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job worker pool stopped")
+    
+    async def _worker_loop(self, n: int) -> None:
+        while self._running:
+            try:
+                job_id = await self.queue.broker.dequeue(timeout=1.0)
+                if job_id:
+                    await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error(f"Job worker {n} loop error", exc_info=True)
+                await asyncio.sleep(1.0)
+    
+    async def _run_job(self, job_id: str) -> None:
+        job = await self.queue.claim(job_id, self.worker_id)
+        if job is None:
+            # Finished, or owned by another live worker
+            await self.queue.broker.ack(job_id)
+            return
+        
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            await self.queue.fail(job_id, f"No handler for job type: {job.job_type}", retry=False, attempts=job.attempts)
+            return
+        
+        context = JobContext(
+            queue=self.queue,
+            job_id=job_id,
+            job_type=job.job_type,
+            payload=job.payload or {},
+            structure_id=str(job.structure_id) if job.structure_id else None,
+            correlation_id=job.correlation_id,
+            stage_names=JOB_STAGES.get(job.job_type, []),
+        )
+        
+        logger.info(f"Running job {job.job_type} {job_id} (attempt {job.attempts}/{job.max_attempts})",
+                    extra={"correlation_id": job.correlation_id})
+        # Spans of the job carry the correlation id of the request that submitted it
+        bind_correlation_id(job.correlation_id)
+        # Submitted by a profiled request: stored next to its profile, under the job type
+        profile = None
+        if settings.PROFILING_ENABLED and context.payload.get("profile"):
+            profile = profiler.begin(job.correlation_id, job.job_type, f"job {job.job_type} {job_id}")
+        try:
+            with span(job.job_type):
+                result = await handler(context)
+        except asyncio.CancelledError:
+            raise
+        except MemoryBudgetException as e:
+            # Retrying would be predicted over budget again
+            await self.queue.fail(job_id, e.message, retry=False, attempts=job.attempts)
+            return
+        except Exception as e:
+            logger.error(f"Job {job_id} raised", exc_info=True)
+            await self.queue.fail(job_id, str(e), retry=job.attempts < job.max_attempts, attempts=job.attempts)
+            return
+        finally:
+            if profile is not None:
+                await profiler.finish(profile)
+        
+        await self.queue.complete(job_id, result)
+        logger.info(f"Job complete: {job.job_type} {job_id}", extra={"correlation_id": job.correlation_id})
+
+async def run_workers(concurrency: int = settings.JOB_WORKERS) -> None:
+    """Run a standalone worker pool until cancelled"""
+    from ..database import dispose_engine, init_db
+    from ..services import close_services
+    
+    await init_db()
+    pool = WorkerPool(concurrency=concurrency)
+    await pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await job_queue.close()
+        await close_services()
+        memory_tracker.stop()
+        await dispose_engine()
+
+def main() -> None:
+    """Entry point: python -m backend.jobs.worker"""
+    setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FILE,
+        json_format=settings.LOG_JSON,
+        sampling=parse_sampling(settings.LOG_SAMPLING),
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    try:
+        asyncio.run(run_workers())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,43 @@
 """Logging Configuration"""
 
+import atexit
+import copy
+import itertools
 import logging
 import logging.config
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional
 import json
 from datetime import datetime
 
-def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
-    """Configure application logging"""
+# Records are handed to a QueueHandler on the thread that logs them and written
+# by a QueueListener thread, so console and file I/O never run on the event
+# loop. The queue is bounded: when the writer falls behind, records are
+# dropped (and counted) instead of blocking the caller.
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_file: Optional[str] = None,
+    json_format: bool = False,
+    sampling: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000,
+):
+    """
+    Configure application logging
+    
+    sampling maps logger name prefixes to the fraction of their INFO/DEBUG
+    records to keep (warnings and errors are never sampled out).
+    """
+    global _listener, _queue_handler
+    from .core.tracing import current_correlation_id
+    
+    shutdown_logging()
     
     log_level_obj = getattr(logging, log_level.upper())
     
@@ -35,8 +63,8 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
         datefmt="%Y-%m-%d %H:%M:%S",
     )
     
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    console_handler.setFormatter(StructuredFormatter() if json_format else console_formatter)
+    handlers = [console_handler]
     
     # File handler (if specified)
     if log_file:
@@ -46,19 +74,128 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
             fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
-        file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
+        file_handler.setFormatter(StructuredFormatter() if json_format else file_formatter)
+        handlers.append(file_handler)
+    
+    _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size))
+    if sampling:
+        _queue_handler.addFilter(SamplingFilter(sampling))
+    _queue_handler.addFilter(CorrelationIdFilter(current_correlation_id))
+    root_logger.addHandler(_queue_handler)
+    
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
     
     # Prevent propagation to root logger
     root_logger.propagate = False
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Parse 'logger=rate,logger=rate' (e.g. LOG_SAMPLING) into a sampling map"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+def logging_stats() -> Dict[str, int]:
+    """Records queued, dropped because the queue was full, and sampled out"""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0, "sampled_out": 0, "queue_depth": 0}
+    sampled_out = sum(f.sampled_out for f in _queue_handler.filters if isinstance(f, SamplingFilter))
+    return {
+        "queued": _queue_handler.queued,
+        "dropped": _queue_handler.dropped,
+        "sampled_out": sampled_out,
+        "queue_depth": _queue_handler.queue.qsize(),
+    }
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance"""
     return logging.getLogger(name)
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records when the queue is full rather than blocking or raising"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.queued = 0
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (arguments may change later),
+        # but leave formatting to the listener's handlers
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+
+class CorrelationIdFilter(logging.Filter):
+    """Tag records with the correlation id of the request or job that logged them"""
+    
+    def __init__(self, current_correlation_id: Callable[[], Optional[str]]):
+        super().__init__()
+        self.current_correlation_id = current_correlation_id
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "correlation_id", None) is None:
+            record.correlation_id = self.current_correlation_id()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep every n-th INFO/DEBUG record of hot-path loggers (longest matching name prefix wins)"""
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(sorted(rates.items(), key=lambda item: -len(item[0])))
+        self.sampled_out = 0
+        self._counters: Dict[str, itertools.count] = {}
+        self._periods: Dict[str, Optional[int]] = {}
+    
+    def _period(self, name: str) -> Optional[int]:
+        if name not in self._periods:
+            rate = next((rate for prefix, rate in self.rates.items() if name == prefix or name.startswith(prefix + ".")), None)
+            self._periods[name] = None if rate is None or rate >= 1.0 else (0 if rate <= 0.0 else round(1 / rate))
+        return self._periods[name]
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        period = self._period(record.name)
+        if period is None:
+            return True
+        if period and next(self._counters.setdefault(record.name, itertools.count())) % period == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
 class StructuredFormatter(logging.Formatter):
     """Formatter for structured JSON logging"""
     
+    # LogRecord attributes; anything else on a record came from `extra`
+    RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "correlation_id"}
+    
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
             "timestamp": self.formatTime(record),
@@ -71,14 +208,17 @@ class StructuredFormatter(logging.Formatter):
         }
         
         # Add extra fields if present
-        if hasattr(record, "correlation_id"):
+        if getattr(record, "correlation_id", None) is not None:
             log_entry["correlation_id"] = record.correlation_id
-        if hasattr(record, "user_id"):
-            log_entry["user_id"] = record.user_id
-        if hasattr(record, "session_id"):
-            log_entry["session_id"] = record.session_id
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED and key not in log_entry:
+                log_entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_entry["exception"] = record.exc_text
         
-        return json.dumps(log_entry)
+        return json.dumps(log_entry, default=str)
     
     def formatTime(self, record: logging.LogRecord) -> str:
         """Format timestamp"""
@@ -1,5 +1,7 @@
 """Authentication Middleware"""
 
+import hmac
+import time
 from fastapi import Request, HTTPException
 from typing import Callable
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -7,9 +9,31 @@ from starlette.responses import Response
 from ..config import settings
 from ..logging_config import get_logger
 from ..utils import generate_correlation_id
+from ..core.request_stats import begin_request_stats
+from ..core.metrics import metrics
+from ..core.tracing import bind_correlation_id
+from ..core.profiling import profiler
+
+REQUEST_SECONDS = metrics.histogram(
+    "biodockviz_http_request_duration_seconds",
+    "HTTP request duration by route template",
+    ("method", "route", "status"),
+)
 
 logger = get_logger(__name__)
 
+def route_template(request: Request) -> str:
+    """Request path with path parameter values put back as {name} (bounded metric label)"""
+    if request.scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in (request.scope.get("path_params") or {}).items()}
+    return "/".join(f"{{{names[segment]}}}" if segment in names else segment for segment in request.url.path.split("/"))
+
+def is_admin(request: Request) -> bool:
+    """Whether the request carries the server's own key (required for profiling in every environment)"""
+    api_key = request.headers.get("X-API-Key")
+    return bool(api_key) and hmac.compare_digest(api_key, settings.SECRET_KEY)
+
 class AuthMiddleware(BaseHTTPMiddleware):
     """Authentication middleware"""
     
@@ -30,13 +54,61 @@ class AuthMiddleware(BaseHTTPMiddleware):
         # Generate correlation ID if not present
         correlation_id = request.headers.get("X-Correlation-ID") or generate_correlation_id()
         
-        # Add correlation ID to request state
+        # Add correlation ID to request state, and to spans opened while serving it
         request.state.correlation_id = correlation_id
+        bind_correlation_id(correlation_id)
+        start_ns = time.perf_counter_ns()
+        
+        # Collect storage bytes read while serving this request
+        stats = begin_request_stats()
+        
+        # Opt-in profiling of this request's parse/analysis work
+        profile, profile_status = None, None
+        if settings.PROFILING_ENABLED and request.headers.get("X-Profile"):
+            if is_admin(request):
+                profile = profiler.begin(correlation_id, "request", f"{request.method} {request.url.path}")
+                profile_status = "skipped" if profile is None else None
+            else:
+                logger.warning(f"Ignoring X-Profile without a valid API key: {request.method} {request.url.path}")
+        
+        # Finish the profile however the request ends (route exceptions and
+        # client disconnects propagate out of call_next), so it is released
+        summary = None
+        try:
+            response = await call_next(request)
+        finally:
+            if profile is not None:
+                summary = await profiler.finish(profile)
+        
+        if profile is not None:
+            profile_status = "stored" if summary else "empty"
+            if summary:
+                response.headers["X-Profile-Id"] = correlation_id
+        if profile_status:
+            response.headers["X-Profile-Status"] = profile_status
+        
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
+        route = route_template(request)
+        REQUEST_SECONDS.observe(duration, request.method, route, str(response.status_code))
         
-        # Log request
-        logger.info(f"API Request: {request.method} {request.url}", extra={"correlation_id": correlation_id})
+        # One line per request, after it completes; the path only (query strings may carry data)
+        logger.info(
+            f"API Request: {request.method} {request.url.path} {response.status_code} {duration * 1000:.1f}ms",
+            extra={
+                "correlation_id": correlation_id,
+                "method": request.method,
+                "route": route,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 3),
+            },
+        )
         
-        response = await call_next(request)
+        response.headers["X-DB-Bytes-Read"] = str(stats.bytes_read)
+        if stats.reads:
+            logger.info(
+                f"Storage read: {stats.bytes_read} bytes in {stats.reads} read(s)",
+                extra={"correlation_id": correlation_id, "storage_reads": stats.by_source},
+            )
         return response
 
 def add_auth_middleware(app):
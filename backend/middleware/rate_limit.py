@@ -0,0 +1,202 @@
+"""Rate Limiting Middleware - Cost-Aware Admission Control"""
+
+import hashlib
+import math
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Pattern, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from ..config import settings
+from ..database import get_db
+from ..logging_config import get_logger
+from ..schemas import ErrorResponse
+from ..services.structure_store import load_atom_count
+from ..core.rate_limit import Bucket, RateLimiter, rate_limiter
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class CostRule:
+    """
+    Predicted cost of a route: base tokens plus tokens per atom of the structure or per body byte
+    
+    per_byte routes name in body_limit the setting that bounds their body; a
+    body without Content-Length (chunked) is charged that bound, up to the
+    capacity of the client's smallest bucket so it can still be admitted.
+    conditional routes answer a matching If-None-Match with 304 before any
+    work; the per-atom tokens of such a response are refunded.
+    """
+    
+    method: str
+    pattern: Pattern
+    kind: str
+    base: float
+    per_atom: bool = False
+    per_byte: bool = False
+    body_limit: str = ""
+    conditional: bool = False
+
+# First match wins; other /api requests cost 1 token ("read")
+COST_RULES = (
+    CostRule("POST", re.compile(r"^/api/analyze/interactions/(?P<structure_id>[^/]+)$"), "analyze", 5, per_atom=True),
+    CostRule("POST", re.compile(r"^/api/upload/validate/(?P<structure_id>[^/]+)$"), "validate", 2, per_atom=True),
+    CostRule("POST", re.compile(r"^/api/upload/file$"), "upload", 5, per_byte=True, body_limit="MAX_FILE_SIZE"),
+    CostRule("POST", re.compile(r"^/api/upload/batch$"), "batch_upload", 20, per_byte=True, body_limit="BATCH_MAX_ARCHIVE_SIZE"),
+    CostRule("POST", re.compile(r"^/api/export/thumbnails$"), "thumbnail_batch", 20),
+    CostRule("GET", re.compile(r"^/api/export/thumbnail/(?P<structure_id>[^/]+)$"), "thumbnail", 2, per_atom=True, conditional=True),
+    CostRule("GET", re.compile(r"^/api/export/(structure|interactions)/(?P<structure_id>[^/]+)$"), "export", 2, per_atom=True),
+    CostRule("GET", re.compile(r"^/api/visualize/data/(?P<structure_id>[^/]+)$"), "visualize", 1, per_atom=True, conditional=True),
+)
+DEFAULT_KIND = "read"
+
+class AtomCountMemo:
+    """
+    LRU of atom counts, so costing needs no query
+    
+    Counts of parsed structures are fixed and kept until evicted; unknown
+    and not yet parsed structures are remembered as 0 for miss_ttl seconds.
+    """
+    
+    def __init__(self, max_entries: int = 100000, miss_ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.miss_ttl = miss_ttl
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # id -> (count, expires)
+    
+    async def get(self, structure_id: str) -> int:
+        entry = self._entries.get(structure_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(structure_id)
+            return entry[0]
+        try:
+            key = uuid.UUID(structure_id)
+        except ValueError:
+            return 0  # the router rejects it
+        async with get_db() as db:
+            count = await load_atom_count(db, key) or 0
+        self._entries[structure_id] = (count, math.inf if count > 0 else time.monotonic() + self.miss_ttl)
+        self._entries.move_to_end(structure_id)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return count
+
+atom_counts = AtomCountMemo()
+
+def estimate_cost(
+    request: Request, buckets: List[Bucket],
+) -> Tuple[str, float, Optional[CostRule], Optional[Callable[[], Awaitable[float]]]]:
+    """
+    Request kind, base cost in tokens, matched rule, and the per-atom surcharge
+    
+    The surcharge needs the structure's atom count, so it is left to the
+    limiter to look up once the base cost has been admitted.
+    """
+    path = request.url.path
+    for rule in COST_RULES:
+        if request.method != rule.method:
+            continue
+        match = rule.pattern.match(path)
+        if match is None:
+            continue
+        
+        cost = rule.base
+        if rule.per_byte:
+            length = request.headers.get("content-length", "")
+            if length.isdigit():
+                cost += int(length) / settings.RATE_LIMIT_BYTES_PER_TOKEN
+            else:
+                # Chunked: the body may be as large as the route accepts
+                limit = getattr(settings, rule.body_limit) / settings.RATE_LIMIT_BYTES_PER_TOKEN
+                cost = max(cost, min(cost + limit, min(bucket.capacity for bucket in buckets)))
+        surcharge = None
+        if rule.per_atom:
+            structure_id = match.group("structure_id")
+            
+            async def surcharge() -> float:
+                return await atom_counts.get(structure_id) / settings.RATE_LIMIT_ATOMS_PER_TOKEN
+        return rule.kind, cost, rule, surcharge
+    return DEFAULT_KIND, 1.0, None, None
+
+def client_ip(request: Request) -> str:
+    """
+    Client address, from X-Forwarded-For when running behind trusted proxies
+    
+    Each proxy appends the address it received the request from, so entries
+    left of those RATE_LIMIT_TRUSTED_PROXIES added are the client's own and
+    cannot be trusted; the client address is the last one a trusted proxy added.
+    """
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+        if forwarded:
+            return forwarded[-min(max(settings.RATE_LIMIT_TRUSTED_PROXIES, 1), len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+def client_buckets(request: Request) -> List[Bucket]:
+    """Per-IP bucket, plus a per-API-key bucket when a key is sent (keys are stored hashed)"""
+    burst = settings.RATE_LIMIT_BURST_SECONDS
+    buckets = [Bucket(f"ip:{client_ip(request)}", settings.RATE_LIMIT_PER_IP, settings.RATE_LIMIT_PER_IP * burst)]
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:24]
+        buckets.append(Bucket(f"key:{digest}", settings.RATE_LIMIT_PER_USER, settings.RATE_LIMIT_PER_USER * burst))
+    return buckets
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Token-bucket admission control for /api requests
+    
+    Each request draws its predicted cost (see COST_RULES) from the client's
+    IP bucket and API key bucket. Rejected requests get 429 with Retry-After;
+    admitted ones report X-RateLimit-Cost and X-RateLimit-Remaining. The
+    per-atom part of a conditional route's cost is refunded on 304.
+    """
+    
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        super().__init__(app)
+        self.limiter = limiter or rate_limiter
+    
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        if not self.limiter.enabled or not request.url.path.startswith("/api/"):
+            return await call_next(request)
+        
+        buckets = client_buckets(request)
+        kind, base, rule, surcharge = estimate_cost(request, buckets)
+        decision = await self.limiter.admit(buckets, base, kind, surcharge)
+        cost = decision.cost
+        
+        if not decision.admitted:
+            retry_after = max(1, math.ceil(decision.retry_after))
+            logger.warning(f"Rate limited {kind} request from {client_ip(request)}: cost {cost:.1f}, retry in {retry_after}s")
+            error = ErrorResponse(
+                type="http_error",
+                code="429",
+                message=f"Rate limit exceeded; retry in {retry_after} seconds",
+                correlation_id=getattr(request.state, "correlation_id", None),
+            )
+            return JSONResponse(
+                status_code=429,
+                content=error.dict(),
+                headers={"Retry-After": str(retry_after), "X-RateLimit-Cost": f"{cost:.1f}"},
+            )
+        
+        response = await call_next(request)
+        remaining = decision.remaining
+        if rule is not None and rule.conditional and response.status_code == 304 and cost > base:
+            await self.limiter.refund(buckets, cost - base, kind)
+            remaining += cost - base
+            cost = base
+        response.headers["X-RateLimit-Cost"] = f"{cost:.1f}"
+        if math.isfinite(remaining):
+            response.headers["X-RateLimit-Remaining"] = str(max(0, math.floor(remaining)))
+        return response
+
+def add_rate_limit_middleware(app):
+    """Add rate limiting middleware to app (add before auth so it runs after it)"""
+    app.add_middleware(RateLimitMiddleware)
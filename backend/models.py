@@ -1,6 +1,6 @@
 """Database Models - Re-export from database.py for compatibility"""
 
-from .database import Structure, Atom, Bond, Interaction
+from .database import Structure, Atom, Bond, Interaction, Job
 
 # Placeholder types for compatibility
 class InteractionType:
@@ -23,6 +23,7 @@ __all__ = [
     "Atom", 
     "Bond",
     "Interaction",
+    "Job",
     "InteractionType",
     "HydrogenBond",
     "VDWContact",
@@ -1,30 +1,137 @@
 """Analyze Router - Full Implementation"""
 
-from fastapi import APIRouter, HTTPException, Request
+import uuid
+from typing import Optional
 
-from ..services.analysis_service import AnalysisService
-from ..schemas import AnalysisResponse
-from ..core.exceptions import AnalysisException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from ..config import settings
+from ..services import get_analysis_service, get_query_service
+from ..services.interaction_store import INTERACTION_TYPES
+from ..schemas import AnalysisResponse, InteractionPage
+from ..database import get_db
+from ..services.structure_store import get_structure_version
+from ..core.deadline import cancel_on_disconnect
+from ..core.exceptions import AnalysisException, CancelledException, MemoryBudgetException, NotFoundException
+from ..core.fast_json import COLUMNAR_MEDIA_TYPE, FastJSONResponse, wants_columnar
+from ..core.http_cache import if_none_match, not_modified, validator_headers
 from ..logging_config import get_logger
 
-router = APIRouter(prefix="/api/analyze", tags=["Analyze"])
+router = APIRouter(tags=["Analyze"])
 logger = get_logger(__name__)
-analysis_service = AnalysisService()
 
 @router.post("/interactions/{structure_id}", response_model=AnalysisResponse)
-async def analyze_interactions(structure_id: str, request: Request):
-    """Analyze molecular interactions (hydrogen bonds, VdW contacts, salt bridges)"""
+async def analyze_interactions(
+    structure_id: str,
+    request: Request,
+    format: str = Query("", description="'columnar' for parallel arrays per interaction type"),
+    deadline: Optional[float] = Query(None, gt=0, description="Time budget in seconds (capped at ANALYSIS_DEADLINE_MAX)"),
+):
+    """
+    Analyze molecular interactions (hydrogen bonds, VdW contacts, salt bridges)
+    
+    With ?format=columnar or Accept: application/vnd.biodockviz.columnar+json
+    each interaction type is returned as parallel arrays, skipping the
+    per-interaction response models. An analysis that runs past its deadline
+    returns what it found so far with metadata.partial set; one whose client
+    disconnects is cancelled. One predicted to exceed the memory budget is
+    rejected with 413 or, with MEMORY_BUDGET_ACTION=partial, cut short.
+    """
     
     correlation_id = request.state.correlation_id
+    options = {"deadline": deadline} if deadline else None
     
     logger.info(f"Analyzing interactions: {structure_id}", extra={"correlation_id": correlation_id})
     
     try:
-        result = await analysis_service.analyze_interactions(structure_id)
+        if wants_columnar(request.headers.get("accept", ""), format):
+            result = await cancel_on_disconnect(request, get_analysis_service().analyze_interactions_columnar(structure_id, options))
+            return FastJSONResponse(result, media_type=COLUMNAR_MEDIA_TYPE)
+        
+        result = await cancel_on_disconnect(request, get_analysis_service().analyze_interactions(structure_id, options))
         return result
+    except CancelledException:
+        # Nobody is left to read a response
+        return Response(status_code=499)
+    except MemoryBudgetException as e:
+        raise HTTPException(status_code=413, detail=e.message)
     except AnalysisException as e:
         logger.error(f"Analysis failed: {structure_id} - {e.message}", exc_info=True)
         raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Unexpected error analyzing: {structure_id}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to analyze structure")
+
+@router.get("/interactions/{structure_id}", response_model=AnalysisResponse)
+async def get_interactions(
+    structure_id: str,
+    request: Request,
+    format: str = Query("", description="'columnar' for parallel arrays per interaction type"),
+):
+    """
+    Stored results of the last analysis
+    
+    Responses carry a strong ETag derived from the file hash, the analysis
+    algorithm version and the thresholds; a matching If-None-Match returns
+    304 without loading anything.
+    """
+    correlation_id = request.state.correlation_id
+    
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+    
+    columnar = wants_columnar(request.headers.get("accept", ""), format)
+    
+    async with get_db() as db:
+        version = await get_structure_version(db, structure_id, needs_analysis=True)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Structure not found")
+    
+    etag = version.etag("analysis", "columnar" if columnar else "json", needs_analysis=True)
+    headers = validator_headers(etag, version.settled(needs_analysis=True), vary="Accept")
+    if if_none_match(request, etag):
+        return not_modified(headers)
+    
+    try:
+        result = await get_analysis_service().get_interactions(structure_id, columnar=columnar)
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except Exception as e:
+        logger.error(f"Unexpected error loading interactions: {structure_id}", exc_info=True, extra={"correlation_id": correlation_id})
+        raise HTTPException(status_code=500, detail="Failed to load interactions")
+    
+    if columnar:
+        return FastJSONResponse(result, media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+    return FastJSONResponse(result.model_dump(), headers=headers)
+
+@router.get("/interactions/{structure_id}/query", response_model=InteractionPage)
+async def query_interactions(
+    structure_id: str,
+    type: Optional[str] = Query(None, pattern=f"^({'|'.join(INTERACTION_TYPES.values())})$"),
+    residue_seq: Optional[int] = Query(None, description="Residue number of either partner"),
+    distance_min: Optional[float] = Query(None, ge=0),
+    distance_max: Optional[float] = Query(None, ge=0),
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(settings.QUERY_PAGE_SIZE, ge=1, le=settings.QUERY_PAGE_MAX),
+):
+    """Stored interactions filtered by type, residue and distance range (keyset-paginated)"""
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+    
+    try:
+        return await get_query_service().interactions(
+            structure_id,
+            interaction_type=type,
+            residue_seq=residue_seq,
+            distance_min=distance_min,
+            distance_max=distance_max,
+            after=after,
+            limit=limit,
+        )
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
@@ -1,10 +1,143 @@
-"""Export Router - Placeholder for Part 2"""
+"""Export Router - Streaming Structure and Interaction Downloads"""
 
-from fastapi import APIRouter
+import uuid
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from ..database import get_db
+from ..jobs.queue import job_queue
+from ..schemas import ThumbnailBatchRequest, ThumbnailBatchResponse
+from ..services import get_export_service, get_thumbnail_service
+from ..services.interaction_store import INTERACTION_TYPES
+from ..services.structure_store import get_structure_version
+from ..core.exceptions import NotFoundException, VisualizationException
+from ..core.http_cache import if_none_match, not_modified, validator_headers
+from ..core.representations import RENDER_STYLES
+from ..logging_config import get_logger
+
+if TYPE_CHECKING:
+    from ..services.export_service import Export
 
 router = APIRouter(tags=["Export"])
+logger = get_logger(__name__)
+
+def _validate_id(structure_id: str) -> None:
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+
+def _stream(export: "Export") -> StreamingResponse:
+    return StreamingResponse(
+        export.body,
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.file_name}"'},
+    )
 
 @router.post("/snapshot/{structure_id}")
 async def export_snapshot(structure_id: str):
     """Export snapshot - To be implemented in Part 2"""
     return {"status": "not_implemented", "message": "Export endpoint will be implemented in Part 2"}
+
+@router.get("/structure/{structure_id}")
+async def export_structure(
+    structure_id: str,
+    format: str = Query(default="pdb", pattern="^(pdb|sdf)$"),
+):
+    """
+    Download the structure with its analysis summary
+    
+    pdb: ATOM/HETATM records (hybrid-36 serials past 99999), CONECT records for
+    every bond and the summary as REMARK 250 lines. sdf: a molfile (V3000
+    beyond 999 atoms) with the summary as SD properties.
+    """
+    _validate_id(structure_id)
+    try:
+        return _stream(await get_export_service().export_structure(structure_id, format))
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+
+@router.get("/interactions/{structure_id}")
+async def export_interactions(
+    structure_id: str,
+    format: str = Query(default="csv", pattern="^(csv|frame)$"),
+    type: Optional[str] = Query(None, pattern=f"^({'|'.join(INTERACTION_TYPES.values())})$"),
+):
+    """
+    Download the stored interaction table
+    
+    csv: one row per interaction. frame: gzip-compressed sequence of BDVZ
+    frames, one record batch each (see core.export_formats.interaction_frame).
+    """
+    _validate_id(structure_id)
+    try:
+        return _stream(await get_export_service().export_interactions(structure_id, format, type))
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+
+@router.get("/thumbnail/{structure_id}")
+async def export_thumbnail(
+    structure_id: str,
+    request: Request,
+    size: int = Query(default=256, ge=16),
+    style: str = Query(default="spheres", pattern=f"^({'|'.join(RENDER_STYLES)})$"),
+    azimuth: float = Query(default=0.0, description="Rotation about the vertical axis (degrees)"),
+    elevation: float = Query(default=0.0, description="Rotation about the horizontal axis (degrees)"),
+    background: str = Query(default="ffffff", description="Background colour (hex RGB)"),
+):
+    """
+    PNG thumbnail rendered on the server
+    
+    spheres: space-filling (van der Waals radii). sticks: ball-and-stick.
+    Thumbnails are cached by file hash and view, so they are rendered once per
+    distinct file and view; the ETag lets clients and nginx skip even the lookup.
+    """
+    from ..services.thumbnail_service import make_view
+    _validate_id(structure_id)
+    try:
+        view = make_view(size, style, azimuth, elevation, background)
+    except VisualizationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    async with get_db() as db:
+        version = await get_structure_version(db, structure_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Structure not found")
+    
+    etag = version.etag(view.key())
+    headers = validator_headers(etag, version.settled())
+    if if_none_match(request, etag):
+        return not_modified(headers)
+    
+    try:
+        png = await get_thumbnail_service().get_thumbnail(structure_id, view)
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+@router.post("/thumbnails", response_model=ThumbnailBatchResponse, status_code=202)
+async def export_thumbnails(batch: ThumbnailBatchRequest, request: Request):
+    """Queue a background job rendering thumbnails of many structures into the cache"""
+    for structure_id in batch.structure_ids:
+        _validate_id(structure_id)
+    from ..services.thumbnail_service import make_view
+    try:
+        view = make_view(batch.size, batch.style, batch.azimuth, batch.elevation, batch.background)
+    except VisualizationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    job_id = await job_queue.submit(
+        "render_thumbnails",
+        payload={
+            "structure_ids": batch.structure_ids,
+            "view": {
+                "size": view.size, "style": view.style, "azimuth": view.azimuth,
+                "elevation": view.elevation, "background": view.background,
+            },
+        },
+        correlation_id=request.state.correlation_id,
+    )
+    logger.info(f"Queued thumbnail job {job_id} for {len(batch.structure_ids)} structures")
+    return ThumbnailBatchResponse(job_id=job_id, structure_count=len(batch.structure_ids))
@@ -0,0 +1,39 @@
+"""Jobs Router - Background Job Status"""
+
+import uuid
+
+from fastapi import APIRouter, HTTPException
+
+from ..jobs.queue import job_queue
+from ..schemas import JobStatusResponse
+
+router = APIRouter(tags=["Jobs"])
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Get status and per-stage progress of a background job"""
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobStatusResponse(
+        job_id=str(job.id),
+        job_type=job.job_type,
+        status=job.status,
+        structure_id=str(job.structure_id) if job.structure_id else None,
+        stage=job.stage,
+        stages=job.stages or {},
+        progress=job.progress,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at.isoformat(),
+        started_at=job.started_at.isoformat() if job.started_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+    )
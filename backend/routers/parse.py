@@ -1,6 +1,18 @@
-"""Parse Router - Placeholder for Part 2"""
+"""Parse Router - Parsed Structure Summaries and Atom Queries"""
 
-from fastapi import APIRouter
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from ..config import settings
+from ..database import get_db
+from ..schemas import AtomPage
+from ..services import get_query_service
+from ..services.structure_store import get_structure, get_structure_version, load_parsed_parts
+from ..core.fast_json import FastJSONResponse
+from ..core.exceptions import NotFoundException
+from ..core.http_cache import if_none_match, not_modified, validator_headers
 
 router = APIRouter(tags=["Parse"])
 
@@ -8,3 +20,71 @@ router = APIRouter(tags=["Parse"])
 async def parse_pdb(structure_id: str):
     """Parse PDB file - To be implemented in Part 2"""
     return {"status": "not_implemented", "message": "Parse endpoint will be implemented in Part 2"}
+
+@router.get("/{structure_id}")
+async def get_parse_summary(structure_id: str, request: Request):
+    """
+    Parse state, counts and parser metadata of a structure
+    
+    Carries a strong ETag derived from the file hash and parse state; a
+    matching If-None-Match returns 304 without loading the structure.
+    """
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+    
+    async with get_db() as db:
+        version = await get_structure_version(db, structure_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Structure not found")
+        
+        etag = version.etag("parse-summary")
+        headers = validator_headers(etag, version.settled())
+        if if_none_match(request, etag):
+            return not_modified(headers)
+        
+        structure = await get_structure(db, structure_id)
+        if structure is None:
+            raise HTTPException(status_code=404, detail="Structure not found")
+        parsed = await load_parsed_parts(db, structure.id, ('metadata',)) if version.parsed else None
+    
+    return FastJSONResponse({
+        "structure_id": structure_id,
+        "file_name": structure.file_name,
+        "file_type": structure.file_type,
+        "file_hash": structure.file_hash,
+        "atom_count": structure.atom_count,
+        "bond_count": structure.bond_count,
+        "metadata": (parsed or {}).get('metadata') or {},
+        "stage": "parsed" if version.parsed else "uploaded",
+    }, headers=headers)
+
+@router.get("/{structure_id}/atoms", response_model=AtomPage)
+async def query_atoms(
+    structure_id: str,
+    chain: Optional[str] = Query(None, max_length=1, description="Chain identifier"),
+    res_seq_min: Optional[int] = Query(None, description="First residue number (inclusive)"),
+    res_seq_max: Optional[int] = Query(None, description="Last residue number (inclusive)"),
+    element: Optional[str] = Query(None, max_length=2, description="Element symbol"),
+    after: Optional[int] = Query(None, ge=-1, description="next_cursor of the previous page"),
+    limit: int = Query(settings.QUERY_PAGE_SIZE, ge=1, le=settings.QUERY_PAGE_MAX),
+):
+    """Atoms of one structure filtered by chain, residue range and element (keyset-paginated)"""
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+    
+    try:
+        return await get_query_service().atoms(
+            structure_id,
+            chain_id=chain,
+            res_seq_min=res_seq_min,
+            res_seq_max=res_seq_max,
+            element=element,
+            after=after,
+            limit=limit,
+        )
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
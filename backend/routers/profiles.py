@@ -0,0 +1,44 @@
+"""Profiles Router - Stored Request and Job Profiles"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+
+from ..config import settings
+from ..core.profiling import ARTIFACTS, profiler
+from ..middleware.auth import is_admin
+
+router = APIRouter(tags=["Profiles"])
+
+def _require_admin(request: Request) -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Profiles require the server API key")
+
+@router.get("")
+async def list_profiles(request: Request, correlation_id: Optional[str] = Query(None)):
+    """Stored profiles (newest first), optionally those of one correlation id"""
+    _require_admin(request)
+    profiles = profiler.list()
+    if correlation_id:
+        profiles = [profile for profile in profiles if profile.get("correlation_id") == correlation_id]
+    return {"profiles": profiles}
+
+@router.get("/{correlation_id}/{artifact}")
+async def download_profile(correlation_id: str, artifact: str, request: Request):
+    """
+    Download a profile artifact: '<kind>.pstats' (cProfile dump, open with
+    pstats or snakeviz) or '<kind>.collapsed' (sampled stacks for
+    flamegraph.pl / speedscope); kind is 'request' or the job type
+    """
+    _require_admin(request)
+    path = profiler.artifact_path(correlation_id, artifact)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        str(path),
+        media_type=ARTIFACTS[path.suffix.lstrip(".")],
+        filename=f"{correlation_id}-{artifact}",
+    )
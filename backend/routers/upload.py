@@ -1,6 +1,6 @@
 """File Upload Router - Production Ready Streaming Implementation"""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, BackgroundTasks, Request
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
 import os
@@ -9,15 +9,18 @@ from datetime import datetime
 from ..config import settings
 from ..logging_config import get_logger
 from ..database import Structure, get_db
-from ..schemas import StructureUploadResponse
-from ..services.parsing_service import ParsingService
+from ..schemas import StructureUploadResponse, BatchUploadResponse
+from ..services import get_batch_service, get_parsing_service
+from ..services.structure_store import get_structure, get_structure_arrays
+from ..services.batch_files import is_batch_filename
+from ..jobs.queue import job_queue
 from ..core.validators import FileValidator, AtomValidator, StructureValidator
-from ..core.exceptions import UploadException
+from ..core.exceptions import MemoryBudgetException, UploadException
 from ..core.utils import calculate_hash, generate_correlation_id, format_size, PerformanceTimer
+from ..core.tracing import span
 
-router = APIRouter(prefix="/api/upload", tags=["Upload"])
+router = APIRouter(tags=["Upload"])
 logger = get_logger(__name__)
-parsing_service = ParsingService()
 
 class ChunkedUploadState:
     """State for chunked uploads"""
@@ -33,9 +36,8 @@ active_uploads = {}
 
 @router.post("/file", response_model=StructureUploadResponse)
 async def upload_structure_file(
-    file: UploadFile = File(..., description="Molecular structure file (PDB, PDBQT, SDF, MOL2, etc.)"),
     request: Request,
-    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Molecular structure file (PDB, PDBQT, SDF, MOL2, etc.)"),
 ):
     """Upload molecular structure file with streaming support"""
     
@@ -45,39 +47,47 @@ async def upload_structure_file(
     
     logger.info(f"Upload request: {filename}", extra={"correlation_id": correlation_id})
     
-    with PerformanceTimer("File Upload"):
+    with PerformanceTimer("File Upload", "upload"):
         try:
             # Step 1: Validate file
-            is_valid, error_message = await FileValidator.validate_file(file, filename)
+            with span("validate"):
+                is_valid, error_message = await FileValidator.validate_file(file, filename)
             if not is_valid:
                 raise UploadException(message=error_message, code="VALIDATION_ERROR")
             
             # Step 2: Calculate file hash
             file_content = await file.read()
-            file_hash = calculate_hash(file_content)
+            with span("hash"):
+                file_hash = calculate_hash(file_content)
             
             # Step 3: Save structure to database (initial state)
-            async with get_db() as db:
-                structure = Structure(
-                    file_name=filename,
-                    file_type=file_ext,
-                    file_size=len(file_content),
-                    file_hash=file_hash,
-                    content=file_content.decode('utf-8', errors='replace'),
-                    parsed_data=None,
-                    metadata=None,
-                    atom_count=0,
-                    bond_count=0,
-                    analysis_data=None,
-                )
-                db.add(structure)
-                await db.commit()
-                await db.refresh(structure)
+            with span("persist"):
+                async with get_db() as db:
+                    structure = Structure(
+                        file_name=filename,
+                        file_type=file_ext,
+                        file_size=len(file_content),
+                        file_hash=file_hash,
+                        content=file_content.decode('utf-8', errors='replace'),
+                        parsed_data=None,
+                        metadata_=None,
+                        atom_count=0,
+                        bond_count=0,
+                        analysis_data=None,
+                    )
+                    db.add(structure)
+                    await db.commit()
+                    await db.refresh(structure)
             
             # Step 4: Parse structure asynchronously (long-running operation)
-            if len(file_content) > 1024 * 1024:  # 1MB threshold
-                background_tasks.add_task(parse_structure_task, str(structure.id), filename)
-                logger.info(f"Structure {filename} queued for parsing")
+            if len(file_content) > settings.JOB_ASYNC_THRESHOLD:
+                job_id = await job_queue.submit(
+                    "parse_structure",
+                    payload={"filename": filename},
+                    structure_id=str(structure.id),
+                    correlation_id=correlation_id,
+                )
+                logger.info(f"Structure {filename} queued for parsing (job {job_id})")
                 
                 return StructureUploadResponse(
                     structure_id=str(structure.id),
@@ -86,11 +96,12 @@ async def upload_structure_file(
                     file_hash=file_hash,
                     content_type=file.content_type or f"chemical/x-{file_ext}",
                     stage="parsing",
+                    job_id=job_id,
                     timestamp=datetime.now().isoformat(),
                 )
             else:
                 # Parse immediately for small files
-                await parsing_service.parse_structure(str(structure.id), file_content.decode('utf-8', errors='replace'), filename)
+                await get_parsing_service().parse_structure(str(structure.id), file_content.decode('utf-8', errors='replace'), filename)
                 
                 return StructureUploadResponse(
                     structure_id=str(structure.id),
@@ -101,59 +112,75 @@ async def upload_structure_file(
                     stage="parsed",
                     timestamp=datetime.now().isoformat(),
                 )
-                
+        
         except UploadException as e:
             logger.error(f"Upload failed: {filename} - {e.message}", exc_info=True)
             raise HTTPException(status_code=400, detail=e.message)
+        except MemoryBudgetException as e:
+            raise HTTPException(status_code=413, detail=e.message)
         except Exception as e:
             logger.error(f"Unexpected error during upload: {filename}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to upload file")
 
+@router.post("/batch", response_model=BatchUploadResponse)
+async def upload_structure_batch(
+    request: Request,
+    file: UploadFile = File(..., description="Archive (ZIP/TAR) of structure files, or a multi-record SDF"),
+    analyze: bool = False,
+):
+    """Upload many structures at once; members are deduplicated, parsed in parallel and bulk inserted"""
+    
+    correlation_id = request.state.correlation_id
+    filename = file.filename or ""
+    
+    logger.info(f"Batch upload request: {filename}", extra={"correlation_id": correlation_id})
+    
+    try:
+        if not is_batch_filename(filename):
+            raise UploadException(
+                message="Unsupported batch file: expected .zip, .tar[.gz|.bz2|.xz], .tgz or multi-record .sdf",
+                code="UNSUPPORTED_BATCH_TYPE",
+            )
+        if file.size is not None and file.size > settings.BATCH_MAX_ARCHIVE_SIZE:
+            raise UploadException(
+                message=f"Archive too large: {format_size(file.size)} (max: {format_size(settings.BATCH_MAX_ARCHIVE_SIZE)})",
+                code="VALIDATION_ERROR",
+            )
+        
+        return await get_batch_service().ingest(file.file, filename, analyze=analyze)
+    
+    except UploadException as e:
+        logger.error(f"Batch upload failed: {filename} - {e.message}")
+        raise HTTPException(status_code=400, detail=e.message)
+    except Exception as e:
+        logger.error(f"Unexpected error during batch upload: {filename}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to ingest batch")
+
 @router.post("/validate/{structure_id}")
 async def validate_structure(structure_id: str, request: Request):
     """Validate structure after parsing"""
     correlation_id = request.state.correlation_id
     
     async with get_db() as db:
-        structure = await db.get(Structure, structure_id)
-        
+        structure = await get_structure(db, structure_id)
         if not structure:
             raise HTTPException(status_code=404, detail="Structure not found")
         
-        if not structure.parsed_data or not structure.parsed_data.get('atoms'):
+        arrays = await get_structure_arrays(db, structure.id)
+        if arrays is None:
             raise HTTPException(status_code=400, detail="Structure not yet parsed")
         
-        atoms = structure.parsed_data['atoms']
+        atom_count = arrays.atom_count
         
-        if not StructureValidator.validate_atom_count(len(atoms)):
-            raise HTTPException(status_code=400, detail=f"Structure has {len(atoms)} atoms, exceeds maximum")
+        if not StructureValidator.validate_atom_count(atom_count):
+            raise HTTPException(status_code=400, detail=f"Structure has {atom_count} atoms, exceeds maximum")
         
-        invalid_atoms = []
-        for i, atom in enumerate(atoms):
-            if not AtomValidator.validate_coordinates(atom['x'], atom['y'], atom['z']):
-                invalid_atoms.append(i)
+        invalid_atoms = AtomValidator.invalid_coordinate_indices(arrays.coords)
         
         return {
             "structure_id": structure_id,
             "validation": "passed",
-            "atom_count": len(atoms),
+            "atom_count": atom_count,
             "invalid_atoms": invalid_atoms if invalid_atoms else None,
             "warnings": [],
         }
-
-async def parse_structure_task(structure_id: str, filename: str):
-    """Background task to parse structure"""
-    logger.info(f"Starting background parsing: {filename}")
-    
-    try:
-        async with get_db() as db:
-            structure = await db.get(Structure, structure_id)
-            if not structure:
-                logger.error(f"Structure not found: {structure_id}")
-                return
-            
-            content = structure.content
-            await parsing_service.parse_structure(structure_id, content, filename)
-            logger.info(f"Background parsing complete: {filename}")
-    except Exception as e:
-        logger.error(f"Background parsing failed: {filename}", exc_info=True)
@@ -1,10 +1,94 @@
-"""Visualize Router - Placeholder for Part 2"""
+"""Visualize Router - Render Buffers for the Molecular Viewer"""
 
-from fastapi import APIRouter
+import uuid
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+
+from ..database import get_db
+from ..services import get_visualization_service
+from ..services.structure_store import get_structure_version
+from ..core.fast_json import FastJSONResponse
+from ..core.http_cache import if_none_match, not_modified, validator_headers
+from ..core.exceptions import NotFoundException, VisualizationException
+from ..core.representations import FRAME_MEDIA_TYPE, FRAME_VERSION, LOD_TIERS
+from ..logging_config import get_logger
 
 router = APIRouter(tags=["Visualize"])
+logger = get_logger(__name__)
 
 @router.get("/data/{structure_id}")
-async def get_visualization_data(structure_id: str):
-    """Get visualization data - To be implemented in Part 2"""
-    return {"status": "not_implemented", "message": "Visualize endpoint will be implemented in Part 2"}
+async def get_visualization_data(
+    structure_id: str,
+    request: Request,
+    format: str = Query(default="binary", pattern="^(binary|json)$"),
+    interactions: bool = Query(default=True),
+    lod: str = Query(default="full", pattern=f"^({'|'.join(LOD_TIERS)})$"),
+    bbox: Optional[str] = Query(default=None, description="xmin,ymin,zmin,xmax,ymax,zmax in Angstroms"),
+):
+    """
+    Get packed visualization buffers
+    
+    format=binary (default) returns a BDVZ frame: float32 positions, uint8
+    element codes, uint32 bond pairs and uint32 interaction pairs with uint8
+    type codes. format=json returns the same flat arrays as JSON lists.
+    
+    lod selects a level of detail (trace, residues, octree, full) and bbox
+    restricts it to a region; such frames add an IDX section mapping each
+    item to its atom index (binary only).
+    
+    Responses carry a strong ETag (file hash, frame version, options and,
+    with interactions, the analysis version); a matching If-None-Match
+    returns 304 before any loading or encoding.
+    """
+    correlation_id = request.state.correlation_id
+    
+    try:
+        uuid.UUID(structure_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid structure ID")
+    
+    region = None
+    if bbox:
+        try:
+            region = tuple(float(value) for value in bbox.split(","))
+        except ValueError:
+            region = ()
+        if len(region) != 6:
+            raise HTTPException(status_code=400, detail="bbox must be six comma-separated numbers")
+    
+    if (lod != "full" or region) and format == "json":
+        raise HTTPException(status_code=400, detail="LOD and bbox selection require format=binary")
+    
+    async with get_db() as db:
+        version = await get_structure_version(db, structure_id, needs_analysis=interactions)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Structure not found")
+    
+    etag = version.etag(
+        f"frame-v{FRAME_VERSION}", format, lod, ",".join(map(str, region or ())), str(interactions),
+        needs_analysis=interactions,
+    )
+    headers = validator_headers(etag, version.settled(needs_analysis=interactions))
+    if if_none_match(request, etag):
+        return not_modified(headers)
+    
+    try:
+        if lod != "full" or region:
+            frame = await get_visualization_service().get_lod_frame(structure_id, lod, region, interactions)
+            return Response(content=frame, media_type=FRAME_MEDIA_TYPE, headers=headers)
+        
+        if format == "json":
+            columns = await get_visualization_service().get_columns(structure_id, interactions)
+            return FastJSONResponse(columns, headers=headers)
+        
+        frame = await get_visualization_service().get_frame(structure_id, interactions)
+        return Response(content=frame, media_type=FRAME_MEDIA_TYPE, headers=headers)
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except VisualizationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    except Exception as e:
+        logger.error(f"Unexpected error building visualization data: {structure_id}", exc_info=True, extra={"correlation_id": correlation_id})
+        raise HTTPException(status_code=500, detail="Failed to build visualization data")
@@ -49,6 +49,34 @@ class StructureUploadResponse(BaseModel):
     file_hash: str = Field(..., description="SHA-256 hash of file content")
     content_type: str = Field(..., description="Content type of file")
     stage: str = Field(default="upload", description="Current stage (upload/parse/analyze)")
+    job_id: Optional[str] = Field(None, description="Background job ID when parsing is queued")
+    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="Upload timestamp")
+
+class BatchManifestEntry(BaseModel):
+    """Batch upload manifest entry (one per archive member)"""
+    
+    member: str = Field(..., description="Member name within the archive")
+    status: str = Field(..., description="Outcome (created/duplicate/invalid/failed)")
+    structure_id: Optional[str] = Field(None, description="Structure ID (when created)")
+    file_hash: Optional[str] = Field(None, description="SHA-256 hash of member content")
+    duplicate_of: Optional[str] = Field(None, description="Existing structure ID or member with identical content")
+    atom_count: Optional[int] = Field(None, description="Parsed atom count")
+    bond_count: Optional[int] = Field(None, description="Parsed bond count")
+    error: Optional[str] = Field(None, description="Validation or parse error")
+
+class BatchUploadResponse(BaseModel):
+    """Batch upload response"""
+    
+    archive_name: str = Field(..., description="Uploaded archive file name")
+    total_members: int = Field(..., description="Members found in the archive")
+    created: int = Field(..., description="Structures created")
+    duplicates: int = Field(..., description="Members skipped as duplicates")
+    invalid: int = Field(..., description="Members rejected by validation")
+    failed: int = Field(..., description="Members that failed to parse")
+    elapsed_ms: float = Field(..., description="Total ingest time in milliseconds")
+    structures_per_second: float = Field(..., description="Throughput of created structures")
+    entries: List[BatchManifestEntry] = Field(default_factory=list, description="Per-member manifest")
+    stage: str = Field(default="parsed", description="Current stage (upload/parse/analyze)")
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="Upload timestamp")
 
 class AtomModel(BaseModel):
@@ -103,6 +131,14 @@ class StructureParseResponse(BaseModel):
     stage: str = Field(default="parsed", description="Current stage (upload/parse/analyze)")
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="Parse timestamp")
 
+class AtomPage(BaseModel):
+    """One page of a filtered atom query"""
+    
+    structure_id: str = Field(..., description="Unique structure ID")
+    atoms: List[AtomModel] = Field(default_factory=list, description="Atoms in index order")
+    limit: int = Field(..., description="Page size")
+    next_cursor: Optional[int] = Field(None, description="Pass as `after` for the next page (None on the last page)")
+
 # Analysis Schemas
 class HydrogenBond(BaseModel):
     """Hydrogen bond model"""
@@ -144,6 +180,17 @@ class SaltBridge(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score (0-1)")
     is_predicted: bool = Field(default=False, description="Whether this is a predicted bridge")
 
+class AnalysisCoverage(BaseModel):
+    """Share of a structure an analysis covered"""
+    
+    complete: bool = Field(..., description="Whether every atom was covered")
+    fraction: float = Field(..., ge=0.0, le=1.0, description="Fraction of atoms whose neighbourhoods were searched")
+    atoms_covered: int = Field(..., description="Atoms whose neighbourhoods were searched")
+    atom_count: int = Field(..., description="Total atom count")
+    cells_covered: int = Field(..., description="Spatial grid cells analyzed")
+    cell_count: int = Field(..., description="Total spatial grid cells")
+    stopped: Optional[str] = Field(default=None, description="Why the analysis stopped early ('deadline')")
+
 class AnalysisMetadata(BaseModel):
     """Analysis metadata"""
     
@@ -152,6 +199,12 @@ class AnalysisMetadata(BaseModel):
     bond_count: int = Field(..., description="Total bond count")
     algorithm: str = Field(..., description="Algorithm used for analysis")
     thresholds: Dict[str, Any] = Field(..., description="Thresholds used in analysis")
+    partial: bool = Field(default=False, description="Whether the deadline cut the analysis short")
+    deadline_seconds: Optional[float] = Field(default=None, description="Time budget the analysis ran under")
+    coverage: Optional[AnalysisCoverage] = Field(default=None, description="Coverage of the analysis (fresh runs only)")
+    stages: Optional[Dict[str, float]] = Field(default=None, description="Milliseconds per stage (load, grid_build, classification, persist)")
+    memory: Optional[Dict[str, Any]] = Field(default=None, description="Peak and retained bytes of the analysis and per stage (MEMORY_TRACKING on)")
+    predicted_memory_bytes: Optional[int] = Field(default=None, description="Peak memory predicted for the memory budget (MEMORY_BUDGET_MB set)")
 
 class AnalysisResponse(BaseModel):
     """Analysis response"""
@@ -163,7 +216,33 @@ class AnalysisResponse(BaseModel):
     total_interactions: int = Field(..., description="Total interaction count")
     metadata: AnalysisMetadata = Field(..., description="Analysis metadata")
     stage: str = Field(default="analyzed", description="Current stage (upload/parse/analyze)")
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="Analysis timestamp")
+    timestamp: Optional[str] = Field(
+        default_factory=lambda: datetime.now().isoformat(),
+        description="Response time (null in stored results, whose body must not change under their ETag)",
+    )
+
+class InteractionRecord(BaseModel):
+    """Stored interaction"""
+    
+    id: int = Field(..., description="Interaction row ID (pagination key)")
+    interaction_type: str = Field(..., description="hydrogen_bond, vdw_contact or salt_bridge")
+    atom1_index: int = Field(..., description="Index of first atom")
+    atom2_index: int = Field(..., description="Index of second atom")
+    distance: float = Field(..., description="Distance in Angstroms")
+    angle: Optional[float] = Field(None, description="Angle in degrees (hydrogen bonds)")
+    atom1_residue: Optional[str] = Field(None, description="Residue of first atom")
+    atom1_residue_seq: Optional[int] = Field(None, description="Residue sequence number of first atom")
+    atom2_residue: Optional[str] = Field(None, description="Residue of second atom")
+    atom2_residue_seq: Optional[int] = Field(None, description="Residue sequence number of second atom")
+    confidence: Optional[float] = Field(None, description="Confidence score (0-1)")
+
+class InteractionPage(BaseModel):
+    """One page of a filtered interaction query"""
+    
+    structure_id: str = Field(..., description="Unique structure ID")
+    interactions: List[InteractionRecord] = Field(default_factory=list, description="Interactions in id order")
+    limit: int = Field(..., description="Page size")
+    next_cursor: Optional[int] = Field(None, description="Pass as `after` for the next page (None on the last page)")
 
 # Export Schemas
 class SnapshotMetadata(BaseModel):
@@ -191,6 +270,41 @@ class ExportResponse(BaseModel):
     stage: str = Field(default="exported", description="Current stage (upload/parse/analyze/export)")
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="Export timestamp")
 
+class ThumbnailBatchRequest(BaseModel):
+    """Batch thumbnail rendering request (one view for every structure)"""
+    
+    structure_ids: List[str] = Field(..., min_length=1, max_length=10000, description="Structures to render")
+    size: int = Field(default=256, ge=16, description="Image width and height in pixels")
+    style: str = Field(default="spheres", pattern="^(spheres|sticks)$", description="spheres (space-filling) or sticks (ball-and-stick)")
+    azimuth: float = Field(default=0.0, description="Rotation about the vertical axis (degrees)")
+    elevation: float = Field(default=0.0, description="Rotation about the horizontal axis (degrees)")
+    background: str = Field(default="ffffff", pattern="^[0-9a-fA-F]{6}$", description="Background colour (hex RGB)")
+
+class ThumbnailBatchResponse(BaseModel):
+    """Queued batch thumbnail job"""
+    
+    job_id: str = Field(..., description="Background job ID (poll /api/jobs/{job_id})")
+    structure_count: int = Field(..., description="Structures queued for rendering")
+
+# Job Schemas
+class JobStatusResponse(BaseModel):
+    """Background job status response"""
+    
+    job_id: str = Field(..., description="Unique job ID")
+    job_type: str = Field(..., description="Job type")
+    status: str = Field(..., description="Job status (queued/running/retrying/succeeded/failed)")
+    structure_id: Optional[str] = Field(None, description="Structure the job operates on")
+    stage: Optional[str] = Field(None, description="Current stage")
+    stages: Dict[str, float] = Field(default_factory=dict, description="Per-stage progress (0-1)")
+    progress: float = Field(..., description="Overall progress (0-1)")
+    attempts: int = Field(..., description="Attempts made so far")
+    max_attempts: int = Field(..., description="Maximum attempts before the job fails")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job result (when succeeded)")
+    error: Optional[str] = Field(None, description="Last error message")
+    created_at: str = Field(..., description="Creation timestamp")
+    started_at: Optional[str] = Field(None, description="Start timestamp of the latest attempt")
+    finished_at: Optional[str] = Field(None, description="Completion timestamp")
+
 # Upload Schemas
 class AnalysisRequest(BaseModel):
     """Analysis request"""
@@ -1 +1,78 @@
-"""Services module"""
+"""Services module
+
+Service singletons are built on first use through the get_* functions, each
+importing its module only then, so importing the application neither loads
+the service modules nor constructs their clients and caches; routers and
+job handlers share the same instances.
+"""
+
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from .analysis_service import AnalysisService
+    from .batch_service import BatchUploadService
+    from .export_service import ExportService
+    from .parsing_service import ParsingService
+    from .query_service import QueryService
+    from .thumbnail_service import ThumbnailService
+    from .visualization_service import VisualizationService
+
+_instances: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+def _get(name: str, build: Callable[[], Any]) -> Any:
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _instances[name] = build()
+    return instance
+
+def built_service(name: str) -> Optional[Any]:
+    """The named service if it has been built, without building it"""
+    return _instances.get(name)
+
+def get_parsing_service() -> "ParsingService":
+    from .parsing_service import ParsingService
+    return _get("parsing", ParsingService)
+
+def get_analysis_service() -> "AnalysisService":
+    from .analysis_service import AnalysisService
+    return _get("analysis", AnalysisService)
+
+def get_query_service() -> "QueryService":
+    from .query_service import QueryService
+    return _get("query", QueryService)
+
+def get_visualization_service() -> "VisualizationService":
+    from .visualization_service import VisualizationService
+    return _get("visualization", VisualizationService)
+
+def get_export_service() -> "ExportService":
+    from .export_service import ExportService
+    return _get("export", ExportService)
+
+def get_thumbnail_service() -> "ThumbnailService":
+    from .thumbnail_service import ThumbnailService
+    return _get("thumbnail", ThumbnailService)
+
+def get_batch_service() -> "BatchUploadService":
+    from .batch_service import BatchUploadService
+    return _get("batch", BatchUploadService)
+
+async def close_services() -> None:
+    """Release what built services hold (Redis clients, process pools)"""
+    analysis = built_service("analysis")
+    if analysis is not None:
+        await analysis.close()
+    # Process pools exist only if their modules were loaded
+    batch = sys.modules.get(f"{__name__}.batch_service")
+    if batch is not None:
+        batch.shutdown_executor()
+    thumbnail = sys.modules.get(f"{__name__}.thumbnail_service")
+    if thumbnail is not None:
+        thumbnail.shutdown_render_executor()
+    _instances.clear()
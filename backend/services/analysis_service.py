@@ -1,15 +1,28 @@
 """Analysis Service - Orchestrates Molecular Analysis"""
 
-from typing import Optional
+import asyncio
+import hashlib
+import json
+from typing import Optional, Dict, Any
 from datetime import datetime
 
-from ..database import Structure, Interaction, get_db
+from ..database import Structure, get_db, write_lock
 from ..schemas import AnalysisResponse, AnalysisMetadata, HydrogenBond, VDWContact, SaltBridge
 from ..logging_config import get_logger
-from ..core.engines.molecular_engine import MolecularEngine
+from .interaction_store import replace_interactions, columnar_results, load_interaction_results
+from .structure_store import get_structure, get_structure_arrays, load_analysis_data
+from ..config import settings
+from ..core.deadline import Deadline
 from ..core.engines.interaction_pipeline import InteractionPipeline
-from ..core.exceptions import AnalysisException
-from ..core.utils import PerformanceTimer, get_current_time_ms
+from ..core.engines.thresholds import ALGORITHM_VERSION
+from ..core.engines.molecular_engine import MolecularContext
+from ..core.exceptions import AnalysisException, NotFoundException
+from ..core.http_cache import structure_versions
+from ..core.memory import memory_budget
+from ..core.profiling import profile_active, profiled
+from ..core.single_flight import SharedFlightLock, SingleFlight
+from ..core.tracing import span
+from ..core.utils import PerformanceTimer
 
 logger = get_logger(__name__)
 
@@ -17,145 +30,314 @@ class AnalysisService:
     """Analysis service for molecular interactions"""
     
     def __init__(self):
-        self.molecular_engine = MolecularEngine()
+        # Holds thresholds only; each analysis builds its own MolecularContext
         self.interaction_pipeline = InteractionPipeline()
+        self.thresholds_fingerprint = self.interaction_pipeline.thresholds.fingerprint()
+        # Concurrent identical analyses share one run: per worker, and across workers through Redis
+        self.flights = SingleFlight()
+        self.shared_lock = SharedFlightLock.from_settings()
     
     async def analyze_interactions(self, structure_id: str, options: Optional[dict] = None) -> AnalysisResponse:
-        """Analyze molecular interactions (H-bonds, VdW, Salt Bridges)"""
-        logger.info(f"Analyzing interactions: {structure_id}")
+        """
+        Analyze molecular interactions (H-bonds, VdW, Salt Bridges)
+        
+        options['deadline'] sets the time budget in seconds (capped at
+        ANALYSIS_DEADLINE_MAX; default ANALYSIS_DEADLINE). Past it the
+        interactions found so far are returned, flagged partial with their
+        coverage in the metadata, and not stored. Cancelling the call stops
+        the analysis at its next chunk unless other callers share it. An
+        analysis predicted to exceed MEMORY_BUDGET_MB raises
+        MemoryBudgetException or covers only the atoms that fit (partial).
+        """
+        run = await self._coalesced_run(structure_id, options)
+        with span("serialize"):
+            return self._response(structure_id, run)
+    
+    async def analyze_interactions_columnar(self, structure_id: str, options: Optional[dict] = None) -> Dict[str, Any]:
+        """
+        Analyze molecular interactions, returning each type as parallel arrays
         
-        start_time = get_current_time_ms()
+        Same analysis as analyze_interactions without per-interaction models:
+        interactions[type] maps column names (atom1_index, atom2_index,
+        distance, ...) to equal-length lists.
+        """
+        run = await self._coalesced_run(structure_id, options)
+        with span("serialize"):
+            return self._columnar_response(structure_id, run)
+    
+    async def get_interactions(self, structure_id: str, columnar: bool = False):
+        """Stored results of the last analysis, in the same shape analyze_interactions returns"""
+        run = await self._stored_run(structure_id)
+        return self._columnar_response(structure_id, run) if columnar else self._response(structure_id, run)
+    
+    async def close(self) -> None:
+        if self.shared_lock is not None:
+            await self.shared_lock.close()
+    
+    def _flight_key(self, structure_id: str, options: Optional[dict]) -> str:
+        """Identity of an analysis: structure, algorithm version, thresholds and options"""
+        identity = f"{structure_id}|{ALGORITHM_VERSION}|{self.thresholds_fingerprint}|{json.dumps(options or {}, sort_keys=True)}"
+        return "analysis:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+    
+    async def _coalesced_run(self, structure_id: str, options: Optional[dict]) -> Dict[str, Any]:
+        """Run an analysis, or attach to an identical one already running"""
+        key = self._flight_key(structure_id, options)
+        deadline_seconds = self._deadline_seconds(options)
+        if profile_active():
+            # A profiled request runs its own analysis rather than waiting on someone else's
+            return await self._run_analysis(structure_id, deadline_seconds)
+        run, shared = await self.flights.do(key, lambda: self._run_once(key, structure_id, deadline_seconds))
+        if shared:
+            logger.info(f"Joined in-flight analysis of {structure_id}")
+        return run
+    
+    @staticmethod
+    def _deadline_seconds(options: Optional[dict]) -> Optional[float]:
+        requested = (options or {}).get('deadline')
+        if requested:
+            return min(float(requested), settings.ANALYSIS_DEADLINE_MAX)
+        return settings.ANALYSIS_DEADLINE or None
+    
+    async def _run_once(self, key: str, structure_id: str, deadline_seconds: Optional[float]) -> Dict[str, Any]:
+        if self.shared_lock is None:
+            return await self._run_analysis(structure_id, deadline_seconds)
+        
+        async def load_stored() -> Dict[str, Any]:
+            try:
+                run = await self._stored_run(structure_id)
+                del run['timestamp']  # a fresh POST response, not the cacheable GET body
+                return run
+            except NotFoundException:
+                # The other worker's run stored nothing (e.g. fewer than two atoms)
+                return await self._run_analysis(structure_id, deadline_seconds)
         
+        # Partial results are not stored, so other workers must not wait on them
+        run, shared = await self.shared_lock.do(
+            key,
+            lambda: self._run_analysis(structure_id, deadline_seconds),
+            load_stored,
+            shareable=lambda run: not run['metadata'].get('partial'),
+        )
+        if shared:
+            logger.info(f"Reused analysis of {structure_id} completed by another worker")
+        return run
+    
+    async def _stored_run(self, structure_id: str) -> Dict[str, Any]:
         async with get_db() as db:
-            structure = await db.get(Structure, structure_id)
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+            
+            summary = await load_analysis_data(db, structure.id)
+            if not summary:
+                raise NotFoundException(message="Structure not analyzed", code="STRUCTURE_NOT_ANALYZED")
             
-            if not structure or not structure.parsed_data:
+            results = await load_interaction_results(db, structure.id)
+        
+        run = {
+            'results': results,
+            'total_interactions': sum(len(records) for records in results.values()),
+            'metadata': {
+                'processing_time_ms': 0,
+                'atom_count': structure.atom_count,
+                'bond_count': structure.bond_count,
+                'algorithm': "O(n) spatial hash grid",
+                'thresholds': self.interaction_pipeline.thresholds.dict(),
+                'partial': False,
+            },
+            # No timestamp: the body must be the same for as long as its ETag
+            'timestamp': None,
+        }
+        return run
+    
+    @staticmethod
+    def _response(structure_id: str, run: Dict[str, Any]) -> AnalysisResponse:
+        results = run['results']
+        
+        hydrogen_bonds = [
+            HydrogenBond(
+                atom1_index=hb['atom1_index'],
+                atom2_index=hb['atom2_index'],
+                distance=hb['distance'],
+                angle=hb.get('angle'),
+                atom1_residue=hb['atom1_residue'],
+                atom1_residue_seq=hb['atom1_residue_seq'],
+                atom2_residue=hb['atom2_residue'],
+                atom2_residue_seq=hb['atom2_residue_seq'],
+                confidence=hb['confidence'],
+                is_predicted=False,
+            )
+            for hb in results.get('hydrogen_bonds', [])
+        ]
+        
+        vdw_contacts = [
+            VDWContact(
+                atom1_index=vdw['atom1_index'],
+                atom2_index=vdw['atom2_index'],
+                distance=vdw['distance'],
+                atom1_residue=vdw['atom1_residue'],
+                atom1_residue_seq=vdw['atom1_residue_seq'],
+                atom2_residue=vdw['atom2_residue'],
+                atom2_residue_seq=vdw['atom2_residue_seq'],
+                confidence=vdw['confidence'],
+                is_predicted=False,
+            )
+            for vdw in results.get('vdw_contacts', [])
+        ]
+        
+        salt_bridges = [
+            SaltBridge(
+                atom1_index=sb['atom1_index'],
+                atom2_index=sb['atom2_index'],
+                distance=sb['distance'],
+                atom1_residue=sb['atom1_residue'],
+                atom1_residue_seq=sb['atom1_residue_seq'],
+                atom2_residue=sb['atom2_residue'],
+                atom2_residue_seq=sb['atom2_residue_seq'],
+                confidence=sb['confidence'],
+                is_predicted=False,
+            )
+            for sb in results.get('salt_bridges', [])
+        ]
+        
+        return AnalysisResponse(
+            structure_id=structure_id,
+            hydrogen_bonds=hydrogen_bonds,
+            vdw_contacts=vdw_contacts,
+            salt_bridges=salt_bridges,
+            total_interactions=run['total_interactions'],
+            metadata=AnalysisMetadata(**run['metadata']),
+            stage="analyzed",
+            timestamp=run['timestamp'] if 'timestamp' in run else datetime.now().isoformat(),
+        )
+    
+    @staticmethod
+    def _columnar_response(structure_id: str, run: Dict[str, Any]) -> Dict[str, Any]:
+        columns = columnar_results(run['results'])
+        
+        return {
+            "structure_id": structure_id,
+            "format": "columnar",
+            "interactions": columns,
+            "counts": {interaction_type: len(table['atom1_index']) for interaction_type, table in columns.items()},
+            "total_interactions": run['total_interactions'],
+            "metadata": run['metadata'],
+            "stage": "analyzed",
+            "timestamp": run['timestamp'] if 'timestamp' in run else datetime.now().isoformat(),
+        }
+    
+    async def _run_analysis(self, structure_id: str, deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Run the pipeline, persist complete interactions and summary; returns raw results and metadata"""
+        logger.info(f"Analyzing interactions: {structure_id}")
+        
+        with PerformanceTimer("Interaction Analysis", "analysis") as timer, profiled("analysis"):
+            # The session is closed before the compute so a long analysis does not hold a pooled connection
+            async with get_db() as db:
+                with span("load"):
+                    structure = await get_structure(db, structure_id)
+                    # Checked before the atoms are loaded; raises MemoryBudgetException when rejected
+                    atom_limit = memory_budget.admit(
+                        "analysis", structure.atom_count or 0, f"analysis of {structure_id}", partial=True,
+                    ) if structure else None
+                    arrays = await get_structure_arrays(db, structure.id) if structure else None
+            
+            if not structure or not arrays:
                 raise AnalysisException(
                     message="Structure not found or not parsed",
                     code="STRUCTURE_NOT_FOUND"
                 )
             
-            atoms_data = structure.parsed_data.get('atoms', [])
-            bonds_data = structure.parsed_data.get('bonds', [])
+            atoms_data = arrays.atom_records()
+            bonds_data = arrays.bond_records()
             
             if not atoms_data:
                 raise AnalysisException(message="No atoms found in structure", code="NO_ATOMS")
             
             if len(atoms_data) < 2:
-                return AnalysisResponse(
-                    structure_id=structure_id,
-                    hydrogen_bonds=[],
-                    vdw_contacts=[],
-                    salt_bridges=[],
-                    total_interactions=0,
-                    metadata=AnalysisMetadata(
-                        processing_time_ms=0,
-                        atom_count=len(atoms_data),
-                        bond_count=0,
-                        algorithm="skipped",
-                        thresholds={},
-                    ),
-                    stage="analyzed",
-                    timestamp=datetime.now().isoformat(),
-                )
+                return {
+                    'results': {'hydrogen_bonds': [], 'vdw_contacts': [], 'salt_bridges': []},
+                    'total_interactions': 0,
+                    'metadata': {
+                        'processing_time_ms': 0,
+                        'atom_count': len(atoms_data),
+                        'bond_count': 0,
+                        'algorithm': "skipped",
+                        'thresholds': {},
+                        'partial': False,
+                    },
+                }
+            
+            deadline = Deadline(deadline_seconds)
+            
+            def analyze():
+                with profiled("interaction_pipeline"):
+                    return self.interaction_pipeline.analyze_partial(
+                        MolecularContext.build(atoms_data, bonds_data), deadline, atom_limit,
+                    )
             
             try:
-                with PerformanceTimer("Interaction Analysis"):
-                    self.molecular_engine.initialize(atoms_data, bonds_data)
-                    interaction_results = self.interaction_pipeline.analyze(atoms_data, bonds_data)
-                    
-                    hydrogen_bonds = []
-                    vdw_contacts = []
-                    salt_bridges = []
-                    
-                    for hb in interaction_results.get('hydrogen_bonds', []):
-                        hydrogen_bonds.append(HydrogenBond(
-                            atom1_index=hb['atom1_index'],
-                            atom2_index=hb['atom2_index'],
-                            distance=hb['distance'],
-                            angle=hb.get('angle'),
-                            atom1_residue=hb['atom1_residue'],
-                            atom1_residue_seq=hb['atom1_residue_seq'],
-                            atom2_residue=hb['atom2_residue'],
-                            atom2_residue_seq=hb['atom2_residue_seq'],
-                            confidence=hb['confidence'],
-                            is_predicted=False,
-                        ))
-                    
-                    for vdw in interaction_results.get('vdw_contacts', []):
-                        vdw_contacts.append(VDWContact(
-                            atom1_index=vdw['atom1_index'],
-                            atom2_index=vdw['atom2_index'],
-                            distance=vdw['distance'],
-                            atom1_residue=vdw['atom1_residue'],
-                            atom1_residue_seq=vdw['atom1_residue_seq'],
-                            atom2_residue=vdw['atom2_residue'],
-                            atom2_residue_seq=vdw['atom2_residue_seq'],
-                            confidence=vdw['confidence'],
-                            is_predicted=False,
-                        ))
-                    
-                    for sb in interaction_results.get('salt_bridges', []):
-                        salt_bridges.append(SaltBridge(
-                            atom1_index=sb['atom1_index'],
-                            atom2_index=sb['atom2_index'],
-                            distance=sb['distance'],
-                            atom1_residue=sb['atom1_residue'],
-                            atom1_residue_seq=sb['atom1_residue_seq'],
-                            atom2_residue=sb['atom2_residue'],
-                            atom2_residue_seq=sb['atom2_residue_seq'],
-                            confidence=sb['confidence'],
-                            is_predicted=False,
-                        ))
-                    
-                    # Save to database
-                    for hb in hydrogen_bonds:
-                        db.add(Interaction(
-                            structure_id=structure_id,
-                            interaction_type="hydrogen_bond",
-                            atom1_index=hb.atom1_index,
-                            atom2_index=hb.atom2_index,
-                            distance=hb.distance,
-                            atom1_residue=hb.atom1_residue,
-                            atom1_residue_seq=hb.atom1_residue_seq,
-                            atom2_residue=hb.atom2_residue,
-                            atom2_residue_seq=hb.atom2_residue_seq,
-                            confidence=hb.confidence,
-                            metadata={'angle': hb.angle},
-                        ))
-                    
-                    total_interactions = len(hydrogen_bonds) + len(vdw_contacts) + len(salt_bridges)
-                    
-                    structure.analysis_data = {
-                        'hydrogen_bonds': len(hydrogen_bonds),
-                        'vdw_contacts': len(vdw_contacts),
-                        'salt_bridges': len(salt_bridges),
-                        'total_interactions': total_interactions,
-                    }
-                    
-                    await db.commit()
-                    
-                    processing_time = get_current_time_ms() - start_time
+                # Off the event loop; the context lives only for this call
+                try:
+                    interaction_results, coverage = await asyncio.to_thread(analyze)
+                except asyncio.CancelledError:
+                    # The thread cannot be interrupted; this stops it at its next chunk
+                    deadline.cancel()
+                    raise
+                
+                counts = {key: len(records) for key, records in interaction_results.items()}
+                total_interactions = sum(counts.values())
+                
+                if coverage.complete:
+                    # Save to database (replaces rows from earlier analyses)
+                    with span("persist"):
+                        async with write_lock(), get_db() as db:
+                            stored = await db.get(Structure, structure.id)
+                            if not stored:
+                                raise AnalysisException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+                            
+                            await replace_interactions(db, stored.id, interaction_results)
+                            
+                            stored.analysis_data = {
+                                'hydrogen_bonds': counts.get('hydrogen_bonds', 0),
+                                'vdw_contacts': counts.get('vdw_contacts', 0),
+                                'salt_bridges': counts.get('salt_bridges', 0),
+                                'total_interactions': total_interactions,
+                            }
+                            
+                            await db.commit()
+                        structure_versions.invalidate(structure_id)
                     
                     logger.info(f"Analysis complete: {structure_id}")
-                    
-                    return AnalysisResponse(
-                        structure_id=structure_id,
-                        hydrogen_bonds=hydrogen_bonds,
-                        vdw_contacts=vdw_contacts,
-                        salt_bridges=salt_bridges,
-                        total_interactions=total_interactions,
-                        metadata=AnalysisMetadata(
-                            processing_time_ms=processing_time,
-                            atom_count=len(atoms_data),
-                            bond_count=len(bonds_data) if bonds_data else 0,
-                            algorithm="O(n) spatial hash grid",
-                            thresholds=self.interaction_pipeline.thresholds.dict(),
-                        ),
-                        stage="analyzed",
-                        timestamp=datetime.now().isoformat(),
+                else:
+                    reason = f"its {deadline_seconds}s deadline" if coverage.stopped == "deadline" else "its memory budget allowance"
+                    logger.warning(
+                        f"Analysis of {structure_id} stopped at {reason}: "
+                        f"{coverage.atoms_covered}/{coverage.atom_count} atoms covered; partial results not stored"
                     )
-                    
+                
+                memory = timer.span.memory_breakdown()
+                predicted_memory = memory_budget.predict("analysis", len(atoms_data)) if memory_budget.enabled else None
+                if memory is not None and coverage.complete:
+                    memory_budget.observe("analysis", len(atoms_data), memory['peak_bytes'])
+                
+                return {
+                    'results': interaction_results,
+                    'total_interactions': total_interactions,
+                    'metadata': {
+                        'processing_time_ms': round(timer.duration_ms, 3),
+                        'atom_count': len(atoms_data),
+                        'bond_count': len(bonds_data) if bonds_data else 0,
+                        'algorithm': "O(n) spatial hash grid",
+                        'thresholds': self.interaction_pipeline.thresholds.dict(),
+                        'partial': not coverage.complete,
+                        'deadline_seconds': deadline_seconds,
+                        'coverage': coverage.dict(),
+                        'stages': timer.span.breakdown_ms(),
+                        'memory': memory,
+                        'predicted_memory_bytes': predicted_memory,
+                    },
+                }
+            
             except Exception as e:
                 logger.error(f"Analysis failed: {structure_id}", exc_info=True)
                 raise AnalysisException(message=f"Failed to analyze: {str(e)}", code="ANALYSIS_ERROR")
@@ -0,0 +1,95 @@
+"""Atom Store - Indexed Atom Rows for Paginated Queries"""
+
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import Atom
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Fields of a parsed atom record stored in the atoms table
+ATOM_COLUMNS = (
+    'index', 'serial', 'name', 'alt_loc', 'res_name', 'chain_id', 'res_seq', 'i_code',
+    'x', 'y', 'z', 'occupancy', 'temp_factor', 'element', 'charge',
+)
+
+def _row(atom: dict) -> tuple:
+    return tuple(atom.get(column) for column in ATOM_COLUMNS)
+
+async def insert_atoms(db: AsyncSession, structure_id: uuid.UUID, atoms: List[dict]) -> int:
+    """
+    Insert the atoms of a parsed structure (records in the parsed_data layout)
+    
+    Runs inside the caller's transaction (the caller commits). Uses PostgreSQL
+    COPY when the asyncpg driver is in use, otherwise batched executemany inserts.
+    """
+    if not atoms:
+        return 0
+    
+    connection = await db.connection()
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'asyncpg':
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Atom.__tablename__,
+            records=((structure_id, *_row(atom)) for atom in atoms),
+            columns=['structure_id', *ATOM_COLUMNS],
+        )
+    else:
+        table = Atom.__table__
+        batch_size = settings.ATOM_INSERT_BATCH_SIZE
+        for start in range(0, len(atoms), batch_size):
+            batch = [
+                dict(zip(ATOM_COLUMNS, _row(atom)), structure_id=structure_id)
+                for atom in atoms[start:start + batch_size]
+            ]
+            await db.execute(insert(table), batch)
+    return len(atoms)
+
+async def replace_atoms(db: AsyncSession, structure_id: uuid.UUID, atoms: List[dict]) -> int:
+    """Replace the stored atom rows of a structure (re-parse)"""
+    await db.execute(delete(Atom).where(Atom.structure_id == structure_id))
+    count = await insert_atoms(db, structure_id, atoms)
+    logger.info(f"Stored {count} atoms for {structure_id}")
+    return count
+
+async def has_atoms(db: AsyncSession, structure_id: uuid.UUID) -> bool:
+    result = await db.execute(select(Atom.id).where(Atom.structure_id == structure_id).limit(1))
+    return result.first() is not None
+
+async def query_atoms(
+    db: AsyncSession,
+    structure_id: uuid.UUID,
+    chain_id: Optional[str] = None,
+    res_seq_min: Optional[int] = None,
+    res_seq_max: Optional[int] = None,
+    element: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = settings.QUERY_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    One page of atoms in index order, with the cursor of the next page
+    
+    Keyset pagination: `after` is the last atom index of the previous page, so
+    each page is an index range scan of at most limit + 1 rows.
+    """
+    query = select(*(getattr(Atom, column) for column in ATOM_COLUMNS)).where(Atom.structure_id == structure_id)
+    if chain_id is not None:
+        query = query.where(Atom.chain_id == chain_id)
+    if res_seq_min is not None:
+        query = query.where(Atom.res_seq >= res_seq_min)
+    if res_seq_max is not None:
+        query = query.where(Atom.res_seq <= res_seq_max)
+    if element is not None:
+        query = query.where(Atom.element == element)
+    if after is not None:
+        query = query.where(Atom.index > after)
+    
+    rows = (await db.execute(query.order_by(Atom.index).limit(limit + 1))).all()
+    atoms = [dict(zip(ATOM_COLUMNS, row)) for row in rows[:limit]]
+    next_cursor = atoms[-1]['index'] if len(rows) > limit else None
+    return atoms, next_cursor
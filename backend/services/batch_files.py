@@ -0,0 +1,13 @@
+"""Batch Files - File Names Accepted by the Batch Upload Endpoint
+
+Kept apart from batch_service so the upload router can check names without
+importing the archive readers, parsers and process pool behind ingestion.
+"""
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+MULTI_RECORD_SUFFIXES = (".sdf", ".sd")
+
+def is_batch_filename(filename: str) -> bool:
+    """Whether a file name is accepted by the batch endpoint"""
+    lowered = filename.lower()
+    return lowered.endswith(ARCHIVE_SUFFIXES) or lowered.endswith(MULTI_RECORD_SUFFIXES)
@@ -0,0 +1,404 @@
+"""Batch Upload Service - Parallel Ingestion of Structure Archives"""
+
+import asyncio
+import tarfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from ..config import settings
+from ..database import Structure, get_db, write_lock
+from ..schemas import BatchManifestEntry, BatchUploadResponse
+from ..logging_config import get_logger
+from .atom_store import insert_atoms
+from .batch_files import ARCHIVE_SUFFIXES, MULTI_RECORD_SUFFIXES
+from .interaction_store import replace_interactions
+from ..core.validators import ContentScanner
+from ..core.exceptions import UploadException, BioDockVizException
+from ..core.utils import calculate_hash, PerformanceTimer
+
+logger = get_logger(__name__)
+
+SDF_RECORD_DELIMITER = b"$$$$"
+# Windows inserted again after losing a race with a concurrent upload of the same files
+INSERT_ATTEMPTS = 3
+
+@dataclass
+class ArchiveMember:
+    """Single structure file extracted from a batch archive"""
+    name: str
+    extension: Optional[str]
+    content: Optional[bytes]
+    error: Optional[str] = None
+
+def _member_extension(name: str) -> Optional[str]:
+    base = name.rsplit("/", 1)[-1]
+    return base.rsplit(".", 1)[-1].lower() if "." in base else None
+
+def _skip_member(name: str) -> bool:
+    base = name.rsplit("/", 1)[-1]
+    return not base or base.startswith(".") or name.startswith("__MACOSX/")
+
+def _oversized(name: str, size: int) -> ArchiveMember:
+    return ArchiveMember(
+        name=name,
+        extension=_member_extension(name),
+        content=None,
+        error=f"Member too large: {size} bytes (max: {settings.MAX_FILE_SIZE})",
+    )
+
+def _iter_zip(fileobj: BinaryIO) -> Iterator[ArchiveMember]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or _skip_member(info.filename):
+                continue
+            if info.file_size > settings.MAX_FILE_SIZE:
+                yield _oversized(info.filename, info.file_size)
+                continue
+            with archive.open(info) as member:
+                # Bounded read guards against headers that under-report the size
+                content = member.read(settings.MAX_FILE_SIZE + 1)
+            if len(content) > settings.MAX_FILE_SIZE:
+                yield _oversized(info.filename, len(content))
+                continue
+            yield ArchiveMember(name=info.filename, extension=_member_extension(info.filename), content=content)
+
+def _iter_tar(fileobj: BinaryIO) -> Iterator[ArchiveMember]:
+    # Stream mode: members are read sequentially without seeking
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile() or _skip_member(info.name):
+                continue
+            if info.size > settings.MAX_FILE_SIZE:
+                yield _oversized(info.name, info.size)
+                continue
+            member = archive.extractfile(info)
+            content = member.read() if member else b""
+            yield ArchiveMember(name=info.name, extension=_member_extension(info.name), content=content)
+
+def _iter_sdf_records(fileobj: BinaryIO, filename: str) -> Iterator[ArchiveMember]:
+    extension = _member_extension(filename)
+    record: List[bytes] = []
+    size = 0
+    index = 0
+    
+    def member(name: str) -> ArchiveMember:
+        if size > settings.MAX_FILE_SIZE:
+            return _oversized(name, size)
+        return ArchiveMember(name=name, extension=extension, content=b"".join(record))
+    
+    # Lines are read at most MAX_FILE_SIZE + 1 bytes at a time, so input without
+    # newlines cannot be buffered whole either
+    for line in iter(lambda: fileobj.readline(settings.MAX_FILE_SIZE + 1), b""):
+        size += len(line)
+        # An oversized record is only measured, not buffered, up to its delimiter
+        if size <= settings.MAX_FILE_SIZE or not record:
+            record.append(line)
+        if line.strip() == SDF_RECORD_DELIMITER:
+            title = record[0].strip().decode("utf-8", errors="replace")[:80] if record else ""
+            yield member(f"{filename}#{index}" + (f" {title}" if title else ""))
+            record = []
+            size = 0
+            index += 1
+    
+    # Trailing record without a $$$$ terminator
+    if any(line.strip() for line in record):
+        yield member(f"{filename}#{index}")
+
+def iter_batch_members(fileobj: BinaryIO, filename: str) -> Iterator[ArchiveMember]:
+    """Stream structure members from a zip/tar archive or a multi-record SDF"""
+    lowered = filename.lower()
+    if lowered.endswith(".zip"):
+        return _iter_zip(fileobj)
+    if lowered.endswith(ARCHIVE_SUFFIXES):
+        return _iter_tar(fileobj)
+    if lowered.endswith(MULTI_RECORD_SUFFIXES):
+        return _iter_sdf_records(fileobj, filename)
+    raise UploadException(message=f"Unsupported batch file: {filename}", code="UNSUPPORTED_BATCH_TYPE")
+
+def _take(members: Iterator[ArchiveMember], count: int, max_bytes: Optional[int] = None) -> List[ArchiveMember]:
+    """Up to count members, stopping after the one that brings their content to max_bytes"""
+    window: List[ArchiveMember] = []
+    size = 0
+    for member in islice(members, count):
+        window.append(member)
+        size += len(member.content or b"")
+        if max_bytes is not None and size >= max_bytes:
+            break
+    return window
+
+def parse_member(name: str, extension: str, content: bytes, analyze: bool) -> Dict:
+    """Parse (and optionally analyze) one member; runs in a worker process"""
+    from .parsing_service import ParsingService
+    from ..core.engines.interaction_pipeline import InteractionPipeline
+    from ..core.lod import build_lod_index
+    from ..core.structure_arrays import StructureArrays
+    
+    text = content.decode("utf-8", errors="replace")
+    try:
+        parser = ParsingService.PARSERS[extension](strict_mode=True)
+        parse_result = asyncio.run(parser.parse(text))
+        atoms, bonds, metadata = ParsingService.build_structure(parse_result, name, len(content))
+    except BioDockVizException as e:
+        return {"error": e.message}
+    except Exception as e:
+        return {"error": f"Failed to parse structure: {e}"}
+    
+    parsed_data = {
+        "atoms": [atom.dict() for atom in atoms],
+        "bonds": [bond.dict() for bond in bonds],
+        "metadata": metadata.dict(),
+    }
+    parsed_data["lod"] = build_lod_index(StructureArrays.from_parsed(name, None, parsed_data)).encode()
+    
+    # The summary marks the structure analyzed, so it is stored only with the
+    # interaction rows it summarizes (see _insert_interactions)
+    analysis_data = interactions = None
+    if analyze and len(atoms) >= 2:
+        interactions = InteractionPipeline().analyze_atoms(parsed_data["atoms"], parsed_data["bonds"])
+        analysis_data = {key: len(value) for key, value in interactions.items()}
+        analysis_data["total_interactions"] = sum(analysis_data.values())
+    
+    return {
+        "parsed_data": parsed_data,
+        "atom_count": metadata.atom_count,
+        "bond_count": metadata.bond_count,
+        "analysis_data": analysis_data,
+        "interactions": interactions,
+    }
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_executor() -> ProcessPoolExecutor:
+    """Shared process pool for batch parsing (created on first use)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.BATCH_WORKERS)
+    return _executor
+
+def shutdown_executor() -> None:
+    """Shut down the batch process pool"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+class BatchUploadService:
+    """Ingests archives of structures: validate, dedup, parse in parallel, bulk insert"""
+    
+    async def ingest(self, fileobj: BinaryIO, filename: str, analyze: bool = False) -> BatchUploadResponse:
+        """Ingest every member of a batch file and return the manifest"""
+        logger.info(f"Batch ingest: {filename}")
+        
+        start = time.perf_counter()
+        members = iter_batch_members(fileobj, filename)
+        entries: List[BatchManifestEntry] = []
+        seen_hashes: Dict[str, str] = {}  # file hash -> id of the stored structure
+        member_count = 0
+        
+        with PerformanceTimer("Batch Ingest"):
+            while member_count < settings.BATCH_MAX_MEMBERS:
+                window_size = min(settings.BATCH_WINDOW, settings.BATCH_MAX_MEMBERS - member_count)
+                window = await asyncio.to_thread(_take, members, window_size, settings.BATCH_WINDOW_MAX_BYTES)
+                if not window:
+                    break
+                member_count += len(window)
+                entries.extend(await self._ingest_window(window, seen_hashes, analyze))
+            else:
+                if await asyncio.to_thread(_take, members, 1):
+                    logger.warning(f"Batch {filename} truncated at {settings.BATCH_MAX_MEMBERS} members")
+        
+        elapsed = time.perf_counter() - start
+        counts = {status: 0 for status in ("created", "duplicate", "invalid", "failed")}
+        for entry in entries:
+            counts[entry.status] += 1
+        
+        logger.info(
+            f"Batch ingest complete: {filename} - {counts['created']} created in {elapsed:.2f}s "
+            f"({counts['created'] / elapsed if elapsed > 0 else 0.0:.1f} structures/s)"
+        )
+        
+        return BatchUploadResponse(
+            archive_name=filename,
+            total_members=len(entries),
+            created=counts["created"],
+            duplicates=counts["duplicate"],
+            invalid=counts["invalid"],
+            failed=counts["failed"],
+            elapsed_ms=elapsed * 1000,
+            structures_per_second=counts["created"] / elapsed if elapsed > 0 else 0.0,
+            entries=entries,
+        )
+    
+    async def _ingest_window(
+        self,
+        window: List[ArchiveMember],
+        seen_hashes: Dict[str, str],
+        analyze: bool,
+    ) -> List[BatchManifestEntry]:
+        entries: List[BatchManifestEntry] = []
+        pending: List[tuple] = []  # (entry, member)
+        window_hashes: Dict[str, str] = {}  # file hash -> first member with it in this window
+        
+        # Validate and dedup within the batch
+        for member in window:
+            entry = BatchManifestEntry(member=member.name, status="invalid")
+            entries.append(entry)
+            
+            if member.error:
+                entry.error = member.error
+                continue
+            if member.extension not in settings.ALLOWED_FILE_TYPES:
+                entry.error = f"Unsupported file type: .{member.extension or 'unknown'}"
+                continue
+            
+            scanner = ContentScanner(member.extension)
+            error = scanner.feed(member.content) or scanner.finish()
+            if error:
+                entry.error = error
+                continue
+            
+            entry.file_hash = calculate_hash(member.content)
+            duplicate_of = seen_hashes.get(entry.file_hash) or window_hashes.get(entry.file_hash)
+            if duplicate_of:
+                entry.status = "duplicate"
+                entry.duplicate_of = duplicate_of
+                continue
+            window_hashes[entry.file_hash] = member.name
+            pending.append((entry, member))
+        
+        # Dedup against structures already stored
+        existing = await self._existing_hashes([entry.file_hash for entry, _ in pending])
+        candidates = []
+        for entry, member in pending:
+            if entry.file_hash in existing:
+                entry.status = "duplicate"
+                entry.duplicate_of = existing[entry.file_hash]
+            else:
+                candidates.append((entry, member))
+        
+        if not candidates:
+            self._record_stored(pending, seen_hashes)
+            return entries
+        
+        # Parse in parallel worker processes
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, parse_member, member.name, member.extension, member.content, analyze)
+            for _, member in candidates
+        ))
+        
+        rows = []
+        interactions: Dict[uuid.UUID, Dict[str, List[dict]]] = {}
+        for (entry, member), result in zip(candidates, results):
+            if result.get("error"):
+                entry.status = "failed"
+                entry.error = result["error"]
+                continue
+            
+            structure_id = uuid.uuid4()
+            entry.status = "created"
+            entry.structure_id = str(structure_id)
+            entry.atom_count = result["atom_count"]
+            entry.bond_count = result["bond_count"]
+            rows.append({
+                "id": structure_id,
+                "file_name": member.name.rsplit("/", 1)[-1][:255],
+                "file_type": member.extension,
+                "file_size": len(member.content),
+                "file_hash": entry.file_hash,
+                "content": member.content.decode("utf-8", errors="replace"),
+                "parsed_data": result["parsed_data"],
+                "atom_count": result["atom_count"],
+                "bond_count": result["bond_count"],
+                "analysis_data": result["analysis_data"],
+            })
+            if result["interactions"] is not None:
+                interactions[structure_id] = result["interactions"]
+        
+        await self._insert_rows(rows, entries, interactions)
+        self._record_stored(pending, seen_hashes)
+        return entries
+    
+    @staticmethod
+    def _record_stored(pending: List[tuple], seen_hashes: Dict[str, str]) -> None:
+        """Remember the window's stored hashes, by this batch or another upload, for later windows"""
+        for entry, _ in pending:
+            if entry.status == "created":
+                seen_hashes[entry.file_hash] = entry.structure_id
+            elif entry.status == "duplicate":
+                seen_hashes[entry.file_hash] = entry.duplicate_of
+    
+    async def _existing_hashes(self, hashes: List[str]) -> Dict[str, str]:
+        if not hashes:
+            return {}
+        async with get_db() as db:
+            result = await db.execute(
+                select(Structure.file_hash, Structure.id).where(Structure.file_hash.in_(hashes))
+            )
+            return {file_hash: str(structure_id) for file_hash, structure_id in result.all()}
+    
+    async def _insert_rows(
+        self,
+        rows: List[dict],
+        entries: List[BatchManifestEntry],
+        interactions: Dict[uuid.UUID, Dict[str, List[dict]]],
+    ) -> None:
+        """Insert a window of structures, their atoms and interactions in one transaction"""
+        if not rows:
+            return
+        
+        by_hash = {entry.file_hash: entry for entry in entries if entry.status == "created"}
+        for attempt in range(INSERT_ATTEMPTS):
+            try:
+                async with write_lock(), get_db() as db:
+                    await db.execute(insert(Structure), rows)
+                    await self._insert_atoms(db, rows)
+                    await self._insert_interactions(db, rows, interactions)
+                    await db.commit()
+                return
+            except IntegrityError:
+                logger.warning("Batch insert hit concurrent duplicates; retrying without them")
+            
+            # Another upload stored some of these hashes meanwhile
+            existing = await self._existing_hashes([row["file_hash"] for row in rows])
+            remaining = []
+            for row in rows:
+                if row["file_hash"] in existing:
+                    entry = by_hash[row["file_hash"]]
+                    entry.status = "duplicate"
+                    entry.structure_id = None
+                    entry.duplicate_of = existing[row["file_hash"]]
+                else:
+                    remaining.append(row)
+            rows = remaining
+            if not rows:
+                return
+        
+        logger.error(f"Batch insert of {len(rows)} structures failed after {INSERT_ATTEMPTS} attempts")
+        for row in rows:
+            entry = by_hash[row["file_hash"]]
+            entry.status = "failed"
+            entry.structure_id = None
+            entry.error = "Could not be stored alongside concurrent uploads; upload it again"
+    
+    @staticmethod
+    async def _insert_atoms(db, rows: List[dict]) -> None:
+        """Atom rows for the paginated atom queries, in the same transaction as the structures"""
+        for row in rows:
+            await insert_atoms(db, row["id"], row["parsed_data"]["atoms"])
+    
+    @staticmethod
+    async def _insert_interactions(db, rows: List[dict], interactions: Dict[uuid.UUID, Dict[str, List[dict]]]) -> None:
+        """Interaction rows of analyzed structures, which stored results are read from"""
+        for row in rows:
+            if row["id"] in interactions:
+                await replace_interactions(db, row["id"], interactions[row["id"]])
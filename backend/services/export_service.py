@@ -0,0 +1,113 @@
+"""Export Service - Streaming Structure and Interaction Exports"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from ..config import settings
+from ..database import get_db
+from ..logging_config import get_logger
+from .interaction_store import INTERACTION_COLUMNS, stream_interactions
+from .structure_store import get_structure, get_structure_arrays, load_analysis_data
+from ..core.export_formats import GzipStream, csv_chunk, interaction_frame, iter_pdb, iter_sdf
+from ..core.exceptions import NotFoundException
+
+logger = get_logger(__name__)
+
+@dataclass
+class Export:
+    """A streamed export: body chunks plus response metadata"""
+    
+    body: Union[Iterator[bytes], AsyncIterator[bytes]]
+    file_name: str
+    media_type: str
+
+class ExportService:
+    """Streams exports chunk by chunk so no file is ever built whole in memory"""
+    
+    STRUCTURE_FORMATS = {
+        "pdb": ("chemical/x-pdb", "pdb"),
+        "sdf": ("chemical/x-mdl-sdfile", "sdf"),
+    }
+    INTERACTION_FORMATS = {
+        "csv": ("text/csv", "csv"),
+        "frame": ("application/gzip", "bdvz.gz"),
+    }
+    
+    async def export_structure(self, structure_id: str, format: str = "pdb") -> Export:
+        """Coordinates and bonds (PDB with CONECT records, or SDF) annotated with the analysis summary"""
+        async with get_db() as db:
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+            arrays = await get_structure_arrays(db, structure.id)
+            if arrays is None:
+                raise NotFoundException(message="Structure not parsed", code="STRUCTURE_NOT_PARSED")
+            summary = await load_analysis_data(db, structure.id) or {}
+        
+        properties = {
+            "BIODOCKVIZ_ID": structure_id,
+            "SOURCE_FILE": structure.file_name,
+            "ATOM_COUNT": arrays.atom_count,
+            "BOND_COUNT": arrays.bond_count,
+        }
+        properties.update({key.upper(): value for key, value in summary.items()})
+        
+        if format == "sdf":
+            chunks = iter_sdf(arrays, title=structure.file_name, properties=properties, chunk_rows=settings.EXPORT_CHUNK_ROWS)
+        else:
+            remarks = [f"{key} {value}" for key, value in properties.items()]
+            chunks = iter_pdb(arrays, remarks=remarks, chunk_rows=settings.EXPORT_CHUNK_ROWS)
+        
+        media_type, extension = self.STRUCTURE_FORMATS[format]
+        logger.info(f"Exporting structure {structure_id} as {format}")
+        return Export(_encode(chunks), _export_name(structure.file_name, structure_id, extension), media_type)
+    
+    async def export_interactions(self, structure_id: str, format: str = "csv", interaction_type: Optional[str] = None) -> Export:
+        """Stored interactions as CSV or gzip-compressed BDVZ record batches, read through a cursor"""
+        async with get_db() as db:
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+        
+        rows = _interaction_batches(structure.id, interaction_type)
+        body = _csv_stream(rows) if format == "csv" else _frame_stream(rows)
+        
+        media_type, extension = self.INTERACTION_FORMATS[format]
+        logger.info(f"Exporting interactions of {structure_id} as {format}")
+        return Export(body, _export_name(structure.file_name, structure_id, extension, "interactions"), media_type)
+
+def _export_name(file_name: str, structure_id: str, extension: str, suffix: str = "") -> str:
+    stem = Path(file_name or "structure").stem or "structure"
+    parts = [stem, structure_id[:8]] + ([suffix] if suffix else [])
+    return f"{'_'.join(parts)}.{extension}"
+
+def _encode(chunks: Iterator[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+async def _interaction_batches(structure_id: Any, interaction_type: Optional[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+    # The session lives as long as the response streams
+    async with get_db() as db:
+        async for batch in stream_interactions(db, structure_id, interaction_type):
+            yield batch
+
+async def _csv_stream(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    columns = ('id', 'interaction_type', *INTERACTION_COLUMNS)
+    header = columns
+    async for batch in batches:
+        yield csv_chunk(([row[column] for column in columns] for row in batch), header).encode("utf-8")
+        header = None
+    if header:
+        yield csv_chunk((), header).encode("utf-8")
+
+async def _frame_stream(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    gzip = GzipStream()
+    chunk = 0
+    async for batch in batches:
+        types = sorted({row['interaction_type'] for row in batch})
+        compressed = gzip.compress(interaction_frame(batch, types, chunk))
+        chunk += 1
+        if compressed:
+            yield compressed
+    yield gzip.flush()
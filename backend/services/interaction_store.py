@@ -0,0 +1,208 @@
+"""Interaction Store - Bulk Persistence of Interaction Rows"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Any, Iterator, Optional, Tuple
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import Interaction
+from ..logging_config import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = get_logger(__name__)
+
+# Pipeline result key -> stored interaction_type
+INTERACTION_TYPES = {
+    'hydrogen_bonds': 'hydrogen_bond',
+    'vdw_contacts': 'vdw_contact',
+    'salt_bridges': 'salt_bridge',
+}
+
+# Per-interaction fields carried from pipeline results into the table
+INTERACTION_COLUMNS = (
+    'atom1_index', 'atom2_index', 'distance', 'angle',
+    'atom1_residue', 'atom1_residue_seq', 'atom2_residue', 'atom2_residue_seq',
+    'confidence',
+)
+
+def interaction_type_for(result_key: str) -> str:
+    """Stored type name for a pipeline result key (new types map 'foo_bars' -> 'foo_bar')"""
+    if result_key in INTERACTION_TYPES:
+        return INTERACTION_TYPES[result_key]
+    return result_key[:-1] if result_key.endswith('s') else result_key
+
+def to_columns(records: List[dict]) -> Dict[str, list]:
+    """Convert a list of interaction records into parallel column lists"""
+    return {column: [record.get(column) for record in records] for column in INTERACTION_COLUMNS}
+
+def columnar_results(results: Dict[str, List[dict]]) -> Dict[str, Dict[str, list]]:
+    """Columnar view of every interaction type in a pipeline result"""
+    return {interaction_type_for(key): to_columns(records) for key, records in results.items()}
+
+def _iter_rows(columns: Dict[str, Dict[str, list]]) -> Iterator[Tuple[str, tuple]]:
+    for interaction_type, table in columns.items():
+        for values in zip(*(table[column] for column in INTERACTION_COLUMNS)):
+            yield interaction_type, values
+
+async def replace_interactions(
+    db: AsyncSession,
+    structure_id: uuid.UUID,
+    results: Dict[str, List[dict]],
+) -> Dict[str, int]:
+    """
+    Replace all stored interactions of a structure with a new analysis result
+    
+    Runs inside the caller's transaction (the caller commits). Rows are written
+    with PostgreSQL COPY when the asyncpg driver is in use, otherwise with
+    batched executemany inserts. Returns row counts per interaction type.
+    """
+    columns = columnar_results(results)
+    counts = {interaction_type: len(table['atom1_index']) for interaction_type, table in columns.items()}
+    
+    await db.execute(delete(Interaction).where(Interaction.structure_id == structure_id))
+    
+    if sum(counts.values()) == 0:
+        return counts
+    
+    connection = await db.connection()
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'asyncpg':
+        await _copy_rows(connection, structure_id, columns)
+    else:
+        await _insert_rows(db, structure_id, columns)
+    
+    logger.info(f"Stored {sum(counts.values())} interactions for {structure_id}")
+    return counts
+
+async def _insert_rows(db: AsyncSession, structure_id: uuid.UUID, columns: Dict[str, Dict[str, list]]) -> None:
+    table = Interaction.__table__
+    batch_size = settings.INTERACTION_INSERT_BATCH_SIZE
+    batch: List[Dict[str, Any]] = []
+    
+    for interaction_type, values in _iter_rows(columns):
+        row = dict(zip(INTERACTION_COLUMNS, values))
+        row['structure_id'] = structure_id
+        row['interaction_type'] = interaction_type
+        row['is_predicted'] = False
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await db.execute(insert(table), batch)
+            batch = []
+    
+    if batch:
+        await db.execute(insert(table), batch)
+
+async def _copy_rows(connection, structure_id: uuid.UUID, columns: Dict[str, Dict[str, list]]) -> None:
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection = raw_connection.driver_connection
+    created_at = datetime.now(timezone.utc)
+    
+    records = (
+        (structure_id, interaction_type, *values, False, created_at)
+        for interaction_type, values in _iter_rows(columns)
+    )
+    await asyncpg_connection.copy_records_to_table(
+        Interaction.__tablename__,
+        records=records,
+        columns=['structure_id', 'interaction_type', *INTERACTION_COLUMNS, 'is_predicted', 'created_at'],
+    )
+
+async def load_interaction_index(db: AsyncSession, structure_id: uuid.UUID) -> Tuple["np.ndarray", "np.ndarray", List[str]]:
+    """
+    Stored interactions of a structure as index arrays
+    
+    Returns (pairs, codes, types): uint32 (k, 2) atom index pairs, uint8 codes
+    into the list of interaction type names.
+    """
+    import numpy as np
+    
+    result = await db.execute(
+        select(Interaction.interaction_type, Interaction.atom1_index, Interaction.atom2_index)
+        .where(Interaction.structure_id == structure_id)
+        .order_by(Interaction.interaction_type, Interaction.id)
+    )
+    rows = result.all()
+    if not rows:
+        return np.zeros((0, 2), dtype=np.uint32), np.zeros(0, dtype=np.uint8), []
+    
+    type_column, atom1, atom2 = zip(*rows)
+    types, codes = np.unique(np.array(type_column), return_inverse=True)
+    pairs = np.column_stack((np.array(atom1, dtype=np.uint32), np.array(atom2, dtype=np.uint32)))
+    return pairs, codes.reshape(-1).astype(np.uint8), types.tolist()
+
+async def load_interaction_results(db: AsyncSession, structure_id: uuid.UUID) -> Dict[str, List[dict]]:
+    """Stored interactions of a structure in the pipeline result layout ({'hydrogen_bonds': [...], ...})"""
+    result_keys = {interaction_type: key for key, interaction_type in INTERACTION_TYPES.items()}
+    results: Dict[str, List[dict]] = {key: [] for key in INTERACTION_TYPES}
+    
+    rows = await db.execute(
+        select(Interaction.interaction_type, *(getattr(Interaction, column) for column in INTERACTION_COLUMNS))
+        .where(Interaction.structure_id == structure_id)
+        .order_by(Interaction.interaction_type, Interaction.id)
+    )
+    for interaction_type, *values in rows:
+        key = result_keys.get(interaction_type, f"{interaction_type}s")
+        results.setdefault(key, []).append(dict(zip(INTERACTION_COLUMNS, values)))
+    return results
+
+async def query_interactions(
+    db: AsyncSession,
+    structure_id: uuid.UUID,
+    interaction_type: Optional[str] = None,
+    residue_seq: Optional[int] = None,
+    distance_min: Optional[float] = None,
+    distance_max: Optional[float] = None,
+    after: Optional[int] = None,
+    limit: int = settings.QUERY_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    One page of stored interactions in id order, with the cursor of the next page
+    
+    residue_seq matches either partner. Keyset pagination: `after` is the last
+    id of the previous page, so no rows before it are read.
+    """
+    query = (
+        select(Interaction.id, Interaction.interaction_type, *(getattr(Interaction, column) for column in INTERACTION_COLUMNS))
+        .where(Interaction.structure_id == structure_id)
+    )
+    if interaction_type is not None:
+        query = query.where(Interaction.interaction_type == interaction_type)
+    if residue_seq is not None:
+        query = query.where(or_(Interaction.atom1_residue_seq == residue_seq, Interaction.atom2_residue_seq == residue_seq))
+    if distance_min is not None:
+        query = query.where(Interaction.distance >= distance_min)
+    if distance_max is not None:
+        query = query.where(Interaction.distance <= distance_max)
+    if after is not None:
+        query = query.where(Interaction.id > after)
+    
+    rows = (await db.execute(query.order_by(Interaction.id).limit(limit + 1))).all()
+    columns = ('id', 'interaction_type', *INTERACTION_COLUMNS)
+    interactions = [dict(zip(columns, row)) for row in rows[:limit]]
+    next_cursor = interactions[-1]['id'] if len(rows) > limit else None
+    return interactions, next_cursor
+
+async def stream_interactions(
+    db: AsyncSession,
+    structure_id: uuid.UUID,
+    interaction_type: Optional[str] = None,
+    chunk_rows: int = settings.EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stored interactions in id order, fetched through a server-side cursor chunk_rows at a time"""
+    query = (
+        select(Interaction.id, Interaction.interaction_type, *(getattr(Interaction, column) for column in INTERACTION_COLUMNS))
+        .where(Interaction.structure_id == structure_id)
+        .order_by(Interaction.id)
+        .execution_options(yield_per=chunk_rows)
+    )
+    if interaction_type is not None:
+        query = query.where(Interaction.interaction_type == interaction_type)
+    
+    columns = ('id', 'interaction_type', *INTERACTION_COLUMNS)
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield [dict(zip(columns, row)) for row in partition]
@@ -1,16 +1,24 @@
 """Parsing Service - Orchestrates Structure Parsing"""
 
-from typing import Optional, List
+from typing import Optional, List, Tuple, Callable, Awaitable
 
 from ..core.parsers.pdb_parser import PDBParser
 from ..core.parsers.sdf_parser import SDFParser
 from ..core.parsers.mol2_parser import MOL2Parser
-from ..database import Structure, get_db
+from ..database import Structure, get_db, write_lock
 from ..schemas import StructureParseResponse, AtomModel, BondModel, StructureMetadata
 from ..logging_config import get_logger
+from .atom_store import replace_atoms
 from ..core.validators import StructureValidator
+from ..core.cache import structure_cache
+from ..core.http_cache import structure_versions
+from ..core.lod import build_lod_index
+from ..core.structure_arrays import StructureArrays
 from ..core.exceptions import ParseException
+from ..core.memory import memory_budget
 from ..core.utils import PerformanceTimer
+from ..core.tracing import span
+from ..core.profiling import profiled
 
 logger = get_logger(__name__)
 
@@ -33,8 +41,75 @@ class ParsingService:
         for ext, parser_class in self.PARSERS.items():
             self.parsers[ext] = parser_class(strict_mode=True)
     
-    async def parse_structure(self, structure_id: str, content: str, filename: str) -> StructureParseResponse:
-        """Parse structure file and save to database"""
+    @staticmethod
+    def build_structure(parse_result, filename: str, file_size: int) -> Tuple[List[AtomModel], List[BondModel], StructureMetadata]:
+        """Convert a parser result into atom/bond models and metadata (validates atom count)"""
+        atoms = []
+        bonds = []
+        
+        for i, atom in enumerate(parse_result.atoms):
+            atoms.append(AtomModel(
+                index=i,
+                serial=atom.get('serial', i),
+                name=atom.get('name', ''),
+                alt_loc=atom.get('alt_loc', ''),
+                res_name=atom.get('res_name', ''),
+                chain_id=atom.get('chain_id', ''),
+                res_seq=atom.get('res_seq', 0),
+                i_code=atom.get('i_code', ''),
+                x=atom['x'],
+                y=atom['y'],
+                z=atom['z'],
+                occupancy=atom.get('occupancy', 1.0),
+                temp_factor=atom.get('temp_factor', 0.0),
+                element=atom.get('element', 'C'),
+                charge=atom.get('charge', 0.0),
+            ))
+        
+        if getattr(parse_result, 'bonds', None):
+            for bond in parse_result.bonds:
+                bonds.append(BondModel(
+                    atom1_index=bond['atom1_index'],
+                    atom2_index=bond['atom2_index'],
+                    type=bond['type'],
+                    order=bond.get('order', 1),
+                    distance=bond['distance'],
+                ))
+        
+        chains = set()
+        for atom in atoms:
+            if atom.chain_id:
+                chains.add(atom.chain_id)
+        
+        metadata = StructureMetadata(
+            file_name=filename,
+            file_size=file_size,
+            atom_count=len(atoms),
+            bond_count=len(bonds),
+            chain_count=len(chains),
+            model_count=len(parse_result.models) if getattr(parse_result, 'models', None) else 1,
+            title=parse_result.metadata.get('title'),
+            experimental_technique=parse_result.metadata.get('experimental_technique'),
+            resolution=parse_result.metadata.get('resolution'),
+            warnings=getattr(parse_result, 'warnings', []),
+        )
+        
+        if not StructureValidator.validate_atom_count(metadata.atom_count):
+            raise ParseException(
+                message=f"Structure contains {metadata.atom_count} atoms, exceeds maximum",
+                code="ATOM_COUNT_EXCEEDED"
+            )
+        
+        return atoms, bonds, metadata
+    
+    async def parse_structure(
+        self,
+        structure_id: str,
+        content: str,
+        filename: str,
+        progress: Optional[Callable[[str, float], Awaitable[None]]] = None,
+    ) -> StructureParseResponse:
+        """Parse structure file and save to database (progress is called with stage name and fraction)"""
         logger.info(f"Parsing structure: {filename}")
         
         file_ext = filename.split('.')[-1].lower() if '.' in filename else 'pdb'
@@ -43,80 +118,59 @@ class ParsingService:
         if not parser:
             raise ParseException(message=f"Unsupported file type: {file_ext}", code="UNSUPPORTED_FILE_TYPE")
         
+        # No format has more than one atom per line; raises MemoryBudgetException when over budget
+        memory_budget.admit("parse", content.count("\n") + 1, f"parse of {filename}")
+        
         try:
-            with PerformanceTimer("Parsing"):
+            with PerformanceTimer("Parsing", "parse") as timer, profiled("parse"):
+                if progress:
+                    await progress("parse", 0.0)
                 parse_result = await parser.parse(content)
                 
-                atoms = []
-                bonds = []
+                with span("build_models"):
+                    atoms, bonds, metadata = self.build_structure(parse_result, filename, len(content))
                 
-                for i, atom in enumerate(parse_result.atoms):
-                    atoms.append(AtomModel(
-                        index=i,
-                        serial=atom.get('serial', i),
-                        name=atom.get('name', ''),
-                        alt_loc=atom.get('alt_loc', ''),
-                        res_name=atom.get('res_name', ''),
-                        chain_id=atom.get('chain_id', ''),
-                        res_seq=atom.get('res_seq', 0),
-                        i_code=atom.get('i_code', ''),
-                        x=atom['x'],
-                        y=atom['y'],
-                        z=atom['z'],
-                        occupancy=atom.get('occupancy', 1.0),
-                        temp_factor=atom.get('temp_factor', 0.0),
-                        element=atom.get('element', 'C'),
-                        charge=atom.get('charge', 0.0),
-                    ))
+                parsed_data = {
+                    'atoms': [atom.dict() for atom in atoms],
+                    'bonds': [bond.dict() for bond in bonds],
+                    'metadata': metadata.dict(),
+                }
                 
-                if parse_result.bonds:
-                    for bond in parse_result.bonds:
-                        bonds.append(BondModel(
-                            atom1_index=bond['atom1_index'],
-                            atom2_index=bond['atom2_index'],
-                            type=bond['type'],
-                            order=bond.get('order', 1),
-                            distance=bond['distance'],
-                        ))
+                # LOD tiers are stored with the parsed data, so no request rebuilds them
+                with span("build_lod"):
+                    arrays = StructureArrays.from_parsed(structure_id, None, parsed_data)
+                    arrays.lod = build_lod_index(arrays)
+                    parsed_data['lod'] = arrays.lod.encode()
                 
-                chains = set()
-                for atom in atoms:
-                    if atom.chain_id:
-                        chains.add(atom.chain_id)
+                if progress:
+                    await progress("persist", 0.0)
                 
-                metadata = StructureMetadata(
-                    file_name=filename,
-                    file_size=len(content),
-                    atom_count=len(atoms),
-                    bond_count=len(bonds),
-                    chain_count=len(chains),
-                    model_count=len(parse_result.models) if parse_result.models else 1,
-                    title=parse_result.metadata.get('title'),
-                    experimental_technique=parse_result.metadata.get('experimental_technique'),
-                    resolution=parse_result.metadata.get('resolution'),
-                    warnings=parse_result.warnings,
-                )
+                with span("persist"):
+                    async with write_lock(), get_db() as db:
+                        structure = await db.get(Structure, structure_id)
+                        if not structure:
+                            raise ParseException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+                        
+                        structure.parsed_data = parsed_data
+                        structure.atom_count = metadata.atom_count
+                        structure.bond_count = metadata.bond_count
+                        arrays.file_hash = structure.file_hash
+                        await replace_atoms(db, structure.id, parsed_data['atoms'])
+                        
+                        await db.commit()
+                    structure_versions.invalidate(structure_id)
                 
-                if not StructureValidator.validate_atom_count(metadata.atom_count):
-                    raise ParseException(
-                        message=f"Structure contains {metadata.atom_count} atoms, exceeds maximum",
-                        code="ATOM_COUNT_EXCEEDED"
-                    )
+                # Drop any stale entry from both tiers first, so none survives a
+                # put that is skipped (too large for memory) or fails (shared
+                # tier down); other workers' memory tiers age out with CACHE_TTL
+                if structure_cache.enabled:
+                    with span("cache_fill"):
+                        await structure_cache.invalidate(structure_id)
+                        await structure_cache.put(structure_id, arrays)
                 
-                async with get_db() as db:
-                    structure = await db.get(Structure, structure_id)
-                    if not structure:
-                        raise ParseException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
-                    
-                    structure.parsed_data = {
-                        'atoms': [atom.dict() for atom in atoms],
-                        'bonds': [bond.dict() for bond in bonds],
-                        'metadata': metadata.dict(),
-                    }
-                    structure.atom_count = metadata.atom_count
-                    structure.bond_count = metadata.bond_count
-                    
-                    await db.commit()
+                memory = timer.span.memory_breakdown()
+                if memory is not None:
+                    memory_budget.observe("parse", metadata.atom_count, memory['peak_bytes'])
                 
                 logger.info(f"Structure parsed successfully: {filename}")
                 
@@ -128,7 +182,7 @@ class ParsingService:
                     stage="parsed",
                     timestamp="",
                 )
-                
+        
         except Exception as e:
             logger.error(f"Failed to parse structure: {filename}", exc_info=True)
             raise ParseException(message=f"Failed to parse structure: {str(e)}", code="PARSE_ERROR")
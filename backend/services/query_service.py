@@ -0,0 +1,84 @@
+"""Query Service - Filtered, Paginated Atom and Interaction Queries"""
+
+from typing import Optional
+
+from ..config import settings
+from ..database import get_db, write_lock
+from ..schemas import AtomPage, InteractionPage
+from ..logging_config import get_logger
+from .atom_store import has_atoms, query_atoms, replace_atoms
+from .interaction_store import query_interactions
+from .structure_store import get_structure, get_structure_arrays
+from ..core.exceptions import NotFoundException
+
+logger = get_logger(__name__)
+
+class QueryService:
+    """Serves pages of atoms and interactions from the indexed atoms/interactions tables"""
+    
+    async def atoms(
+        self,
+        structure_id: str,
+        chain_id: Optional[str] = None,
+        res_seq_min: Optional[int] = None,
+        res_seq_max: Optional[int] = None,
+        element: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: int = settings.QUERY_PAGE_SIZE,
+    ) -> AtomPage:
+        """Atoms filtered by chain, residue range and element, in index order"""
+        filters = dict(chain_id=chain_id, res_seq_min=res_seq_min, res_seq_max=res_seq_max, element=element)
+        
+        async with get_db() as db:
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+            
+            atoms, next_cursor = await query_atoms(db, structure.id, after=after, limit=limit, **filters)
+            
+            # Structures stored before atom rows were written at parse time
+            if not atoms and structure.atom_count and not await has_atoms(db, structure.id):
+                await self._backfill_atoms(db, structure.id)
+                atoms, next_cursor = await query_atoms(db, structure.id, after=after, limit=limit, **filters)
+        
+        return AtomPage(structure_id=structure_id, atoms=atoms, limit=limit, next_cursor=next_cursor)
+    
+    @staticmethod
+    async def _backfill_atoms(db, structure_id) -> None:
+        arrays = await get_structure_arrays(db, structure_id)
+        if arrays is None:
+            return
+        logger.info(f"Backfilling atom rows: {structure_id}")
+        async with write_lock():
+            if not await has_atoms(db, structure_id):
+                await replace_atoms(db, structure_id, arrays.atom_records())
+            await db.commit()
+    
+    async def interactions(
+        self,
+        structure_id: str,
+        interaction_type: Optional[str] = None,
+        residue_seq: Optional[int] = None,
+        distance_min: Optional[float] = None,
+        distance_max: Optional[float] = None,
+        after: Optional[int] = None,
+        limit: int = settings.QUERY_PAGE_SIZE,
+    ) -> InteractionPage:
+        """Stored interactions filtered by type, residue and distance range, in id order"""
+        async with get_db() as db:
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+            
+            interactions, next_cursor = await query_interactions(
+                db,
+                structure.id,
+                interaction_type=interaction_type,
+                residue_seq=residue_seq,
+                distance_min=distance_min,
+                distance_max=distance_max,
+                after=after,
+                limit=limit,
+            )
+        
+        return InteractionPage(structure_id=structure_id, interactions=interactions, limit=limit, next_cursor=next_cursor)
@@ -0,0 +1,135 @@
+"""Structure Store - Column-Selective Access to Stored Structures"""
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+from sqlalchemy import Text, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import Structure
+from ..core.cache import structure_cache
+from ..core.http_cache import StructureVersion, structure_versions
+from ..core.request_stats import record_bytes_read
+
+if TYPE_CHECKING:
+    from ..core.structure_arrays import StructureArrays
+
+# Heavy columns are deferred on the Structure model; a plain db.get() loads only
+# metadata and counts. These helpers load exactly the heavy part a caller needs
+# and account the bytes read to the current request.
+
+async def get_structure(db: AsyncSession, structure_id: Any) -> Optional[Structure]:
+    """Load structure metadata and counts (no content or JSON blobs)"""
+    return await db.get(Structure, structure_id)
+
+async def load_atom_count(db: AsyncSession, structure_id: Any) -> Optional[int]:
+    """Atom count of a structure (0 until parsed), None if it does not exist"""
+    result = await db.execute(select(Structure.atom_count).where(Structure.id == structure_id))
+    return result.scalar_one_or_none()
+
+async def load_content(db: AsyncSession, structure_id: Any) -> Optional[str]:
+    """Load the raw file content of a structure"""
+    result = await db.execute(select(Structure.content).where(Structure.id == structure_id))
+    content = result.scalar_one_or_none()
+    if content is not None:
+        record_bytes_read('structure.content', len(content))
+    return content
+
+async def load_parsed_parts(
+    db: AsyncSession,
+    structure_id: Any,
+    parts: Iterable[str] = ('atoms', 'bonds'),
+) -> Optional[Dict[str, Any]]:
+    """
+    Load selected top-level keys of parsed_data (e.g. atoms, bonds, metadata)
+    
+    Keys are extracted in the database so the rest of the document is never
+    transferred. Returns None if the structure does not exist or is not parsed;
+    missing keys map to None.
+    """
+    parts = tuple(parts)
+    query = select(*(Structure.parsed_data[part].as_string() for part in parts)).where(Structure.id == structure_id)
+    row = (await db.execute(query)).first()
+    if row is None:
+        return None
+    
+    loaded = {}
+    for part, raw in zip(parts, row):
+        if raw is None:
+            loaded[part] = None
+            continue
+        record_bytes_read(f'structure.parsed_data.{part}', len(raw))
+        loaded[part] = json.loads(raw)
+    
+    if all(value is None for value in loaded.values()):
+        return None
+    return loaded
+
+async def load_structure_arrays(db: AsyncSession, structure_id: Any) -> Optional["StructureArrays"]:
+    """Load atoms, bonds, metadata and LOD tiers of a parsed structure and decode them into arrays"""
+    # Imported on first use so importing the app does not load numpy
+    from ..core.lod import LODIndex
+    from ..core.structure_arrays import StructureArrays
+    
+    parsed = await load_parsed_parts(db, structure_id, ('atoms', 'bonds', 'metadata', 'lod'))
+    if not parsed or not parsed.get('atoms'):
+        return None
+    file_hash = (await db.execute(select(Structure.file_hash).where(Structure.id == structure_id))).scalar_one_or_none()
+    arrays = StructureArrays.from_parsed(structure_id, file_hash, parsed)
+    # Stored at parse time; structures parsed before that get theirs built on first LOD request
+    if parsed.get('lod'):
+        arrays.lod = LODIndex.decode(parsed['lod'])
+    return arrays
+
+async def get_structure_arrays(db: AsyncSession, structure_id: Any) -> Optional["StructureArrays"]:
+    """Decoded arrays of a parsed structure through the structure cache"""
+    return await structure_cache.get_or_load(structure_id, lambda: load_structure_arrays(db, structure_id))
+
+async def load_parsed_data(db: AsyncSession, structure_id: Any) -> Optional[Dict[str, Any]]:
+    """Load the whole parsed_data document"""
+    result = await db.execute(select(cast(Structure.parsed_data, Text)).where(Structure.id == structure_id))
+    raw = result.scalar_one_or_none()
+    if raw is None:
+        return None
+    record_bytes_read('structure.parsed_data', len(raw))
+    return json.loads(raw)
+
+async def load_analysis_data(db: AsyncSession, structure_id: Any) -> Optional[Dict[str, Any]]:
+    """Load the stored analysis summary"""
+    result = await db.execute(select(cast(Structure.analysis_data, Text)).where(Structure.id == structure_id))
+    raw = result.scalar_one_or_none()
+    if raw is None:
+        return None
+    record_bytes_read('structure.analysis_data', len(raw))
+    return json.loads(raw)
+
+async def load_structure_version(db: AsyncSession, structure_id: Any) -> Optional[StructureVersion]:
+    """Load file hash and parse/analysis state (no JSON documents are transferred)"""
+    # JSON columns hold JSON null rather than SQL NULL until set
+    query = select(
+        Structure.file_hash,
+        Structure.atom_count > 0,
+        func.coalesce(cast(Structure.analysis_data, Text), 'null') != 'null',
+    ).where(Structure.id == structure_id)
+    row = (await db.execute(query)).first()
+    if row is None:
+        return None
+    file_hash, parsed, analyzed = row
+    return StructureVersion(file_hash=file_hash, parsed=bool(parsed), analyzed=bool(analyzed))
+
+async def get_structure_version(db: AsyncSession, structure_id: Any, needs_analysis: bool = False) -> Optional[StructureVersion]:
+    """
+    Version of a structure for ETags, from memory once it is settled
+    
+    A remembered version is returned without touching the database when it
+    already covers what the caller needs (parsed, and analyzed if needs_analysis).
+    """
+    key = str(structure_id)
+    version = structure_versions.get(key)
+    if version is not None and version.settled(needs_analysis):
+        return version
+    
+    version = await load_structure_version(db, structure_id)
+    if version is not None:
+        structure_versions.put(key, version)
+    return version
@@ -0,0 +1,170 @@
+"""Thumbnail Service - Server-Side PNG Thumbnails with a Render Cache"""
+
+import asyncio
+import hashlib
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from ..database import get_db
+from ..logging_config import get_logger
+from .structure_store import get_structure_arrays, get_structure_version
+from ..core.binary_frame import element_codes
+from ..core.cache import BlobFileTier
+from ..core.exceptions import NotFoundException, VisualizationException
+from ..core.rendering import ViewParams, render_png
+from ..core.representations import RENDER_STYLES
+from ..core.structure_arrays import StructureArrays
+
+logger = get_logger(__name__)
+
+HEX_COLOR = re.compile(r"[0-9a-fA-F]{6}")
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_render_executor() -> ProcessPoolExecutor:
+    """Shared process pool for rendering (created on first use)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+    return _executor
+
+def shutdown_render_executor() -> None:
+    """Shut down the render process pool"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def make_view(size: int, style: str, azimuth: float, elevation: float, background: str) -> ViewParams:
+    """Validated view parameters (angles are normalized so equivalent views share a cache entry)"""
+    if not 16 <= size <= settings.THUMBNAIL_MAX_SIZE:
+        raise VisualizationException(message=f"Thumbnail size must be between 16 and {settings.THUMBNAIL_MAX_SIZE}", code="INVALID_VIEW")
+    if style not in RENDER_STYLES:
+        raise VisualizationException(message=f"Unknown thumbnail style: {style}", code="INVALID_VIEW")
+    if not HEX_COLOR.fullmatch(background):
+        raise VisualizationException(message=f"Invalid background colour: {background}", code="INVALID_VIEW")
+    return ViewParams(
+        size=size,
+        style=style,
+        azimuth=round(azimuth % 360.0, 2),
+        elevation=round(elevation % 360.0, 2),
+        background=background.lower(),
+    )
+
+def thumbnail_key(file_hash: str, view: ViewParams) -> str:
+    """Cache key of a rendered thumbnail: identical files share thumbnails across structures"""
+    return hashlib.sha256(f"{file_hash}|{view.key()}".encode("utf-8")).hexdigest()
+
+class ThumbnailService:
+    """Renders structures to PNG in worker processes and keeps the results in a file cache"""
+    
+    def __init__(self, cache: Optional[BlobFileTier] = None):
+        self.cache = cache or BlobFileTier(settings.THUMBNAIL_DIR, ttl=0, max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES, suffix=".png")
+    
+    async def _render(self, arrays: StructureArrays, view: ViewParams) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_render_executor(),
+            render_png,
+            arrays.coords.astype(np.float32),
+            element_codes(arrays.elements),
+            arrays.bonds,
+            view,
+        )
+    
+    async def _cache_key(self, structure_id: str, view: ViewParams) -> str:
+        async with get_db() as db:
+            version = await get_structure_version(db, structure_id)
+        if version is None:
+            raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+        if not version.parsed:
+            raise NotFoundException(message="Structure not parsed", code="STRUCTURE_NOT_PARSED")
+        return thumbnail_key(version.file_hash or structure_id, view)
+    
+    async def _load_arrays(self, structure_id: str) -> StructureArrays:
+        async with get_db() as db:
+            arrays = await get_structure_arrays(db, uuid.UUID(structure_id))
+        if arrays is None:
+            raise NotFoundException(message="Structure not parsed", code="STRUCTURE_NOT_PARSED")
+        return arrays
+    
+    async def _store(self, key: str, png: bytes) -> None:
+        # Best effort: a rendered thumbnail is returned even if caching it fails
+        try:
+            await self.cache.put(key, png)
+        except Exception as e:
+            logger.warning(f"Thumbnail cache write failed for {key}: {e}")
+    
+    async def get_thumbnail(self, structure_id: str, view: ViewParams) -> bytes:
+        """PNG thumbnail of a structure, rendered on a cache miss"""
+        key = await self._cache_key(structure_id, view)
+        png = await self.cache.get(key)
+        if png is not None:
+            return png
+        
+        arrays = await self._load_arrays(structure_id)
+        start = time.perf_counter()
+        png = await self._render(arrays, view)
+        logger.info(f"Rendered thumbnail {structure_id} ({arrays.atom_count} atoms, {view.key()}) in {time.perf_counter() - start:.3f}s")
+        await self._store(key, png)
+        return png
+    
+    async def render_batch(
+        self,
+        structure_ids: List[str],
+        view: ViewParams,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Render thumbnails of many structures with the worker pool
+        
+        Cached thumbnails are skipped. At most two renders per worker are in
+        flight, which bounds the decoded structures held at once. Returns
+        counts, failures and render throughput in images per second.
+        """
+        in_flight = asyncio.Semaphore(max(1, settings.THUMBNAIL_WORKERS) * 2)
+        counts = {"rendered": 0, "cached": 0}
+        failed: Dict[str, str] = {}
+        done = 0
+        
+        async def render_one(structure_id: str) -> None:
+            nonlocal done
+            async with in_flight:
+                try:
+                    key = await self._cache_key(structure_id, view)
+                    if await self.cache.get(key) is not None:
+                        counts["cached"] += 1
+                    else:
+                        png = await self._render(await self._load_arrays(structure_id), view)
+                        await self._store(key, png)
+                        counts["rendered"] += 1
+                except (NotFoundException, ValueError) as e:
+                    failed[structure_id] = getattr(e, "message", str(e))
+                except Exception as e:
+                    logger.error(f"Thumbnail render failed: {structure_id}", exc_info=True)
+                    failed[structure_id] = str(e)
+                done += 1
+                if progress is not None:
+                    await progress(done, len(structure_ids))
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(render_one(structure_id) for structure_id in structure_ids))
+        elapsed = time.perf_counter() - start
+        
+        images_per_second = counts["rendered"] / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Rendered {counts['rendered']} thumbnails ({counts['cached']} cached) in {elapsed:.2f}s: {images_per_second:.1f} images/s")
+        return {
+            **counts,
+            "failed": failed,
+            "view": view.key(),
+            "elapsed_seconds": round(elapsed, 3),
+            "images_per_second": round(images_per_second, 2),
+        }
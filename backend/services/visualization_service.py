@@ -0,0 +1,90 @@
+"""Visualization Service - Packed Render Buffers for the Viewer"""
+
+from typing import Dict, Any, Optional
+
+from ..database import get_db
+from ..logging_config import get_logger
+from .interaction_store import load_interaction_index
+from .structure_store import get_structure, get_structure_arrays
+from ..core.binary_frame import encode_structure_frame, encode_view_frame, element_codes
+from ..core.cache import structure_cache
+from ..core.lod import BBox, LODIndex, build_lod_index, remap_interactions, select_lod
+from ..core.exceptions import NotFoundException, VisualizationException
+from ..core.structure_arrays import StructureArrays
+
+logger = get_logger(__name__)
+
+class VisualizationService:
+    """Builds viewer buffers straight from the cached columnar structure arrays"""
+    
+    async def _load(self, structure_id: str, include_interactions: bool):
+        async with get_db() as db:
+            structure = await get_structure(db, structure_id)
+            if not structure:
+                raise NotFoundException(message="Structure not found", code="STRUCTURE_NOT_FOUND")
+            
+            arrays = await get_structure_arrays(db, structure.id)
+            if arrays is None:
+                raise VisualizationException(message="Structure not yet parsed", code="STRUCTURE_NOT_PARSED")
+            
+            interactions = await load_interaction_index(db, structure.id) if include_interactions else None
+        return arrays, interactions
+    
+    async def get_frame(self, structure_id: str, include_interactions: bool = True) -> bytes:
+        """Binary frame (see core.binary_frame) with positions, elements, bonds and interactions"""
+        arrays, interactions = await self._load(structure_id, include_interactions)
+        if interactions is None:
+            return encode_structure_frame(arrays)
+        pairs, codes, types = interactions
+        return encode_structure_frame(arrays, pairs, codes, types)
+    
+    async def get_lod_frame(
+        self,
+        structure_id: str,
+        tier: str,
+        bbox: Optional[BBox] = None,
+        include_interactions: bool = True,
+    ) -> bytes:
+        """Binary frame of one LOD tier, optionally restricted to a bounding box"""
+        arrays, interactions = await self._load(structure_id, include_interactions)
+        lod = await self._lod_index(arrays)
+        view = select_lod(arrays, lod, tier, bbox)
+        
+        if interactions is None:
+            return encode_view_frame(arrays.structure_id, view)
+        pairs, codes, types = interactions
+        pairs, codes = remap_interactions(view, arrays.atom_count, pairs, codes)
+        return encode_view_frame(arrays.structure_id, view, pairs, codes, types)
+    
+    @staticmethod
+    async def _lod_index(arrays: StructureArrays) -> LODIndex:
+        # Stored at parse time; structures parsed before that get their tiers
+        # built once and written back to the cache
+        if arrays.lod is None:
+            arrays.lod = build_lod_index(arrays)
+            await structure_cache.put(arrays.structure_id, arrays)
+        return arrays.lod
+    
+    async def get_columns(self, structure_id: str, include_interactions: bool = True) -> Dict[str, Any]:
+        """The same buffers as flat JSON lists (fallback for clients without frame support)"""
+        arrays, interactions = await self._load(structure_id, include_interactions)
+        data = self._columns(arrays)
+        if interactions is not None:
+            pairs, codes, types = interactions
+            data.update({
+                "interaction_types": types,
+                "interactions": pairs.reshape(-1).tolist(),
+                "interaction_codes": codes.tolist(),
+            })
+        return data
+    
+    @staticmethod
+    def _columns(arrays: StructureArrays) -> Dict[str, Any]:
+        return {
+            "structure_id": arrays.structure_id,
+            "atom_count": arrays.atom_count,
+            "bond_count": arrays.bond_count,
+            "positions": arrays.coords.reshape(-1).round(3).tolist(),
+            "elements": element_codes(arrays.elements).tolist(),
+            "bonds": arrays.bonds.reshape(-1).tolist(),
+        }
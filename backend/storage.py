@@ -0,0 +1,134 @@
+"""Storage Backends - Database Engine Selection from DATABASE_URL"""
+
+import asyncio
+import os
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url, URL
+
+from .config import settings
+
+class StorageBackend:
+    """Engine configuration for one database family"""
+    
+    name = "generic"
+    async_driver = ""
+    sync_driver = ""
+    # Whether the application creates the schema itself on startup
+    create_schema = False
+    
+    def __init__(self, url: URL):
+        self.url = url
+    
+    def async_url(self) -> URL:
+        return self.url.set(drivername=f"{self.url.get_backend_name()}+{self.async_driver}")
+    
+    def sync_url(self) -> URL:
+        return self.url.set(drivername=f"{self.url.get_backend_name()}+{self.sync_driver}")
+    
+    def engine_options(self) -> Dict[str, Any]:
+        return {"echo": settings.DATABASE_ECHO}
+    
+    def configure(self, sync_engine: Engine) -> None:
+        """Attach per-connection setup to an engine"""
+    
+    def write_lock(self):
+        """Context manager serializing write transactions (no-op unless the backend needs it)"""
+        return nullcontext()
+
+class PostgresBackend(StorageBackend):
+    """PostgreSQL server (asyncpg for the app, psycopg2 for migrations)"""
+    
+    name = "postgresql"
+    async_driver = "asyncpg"
+    sync_driver = "psycopg2"
+    
+    def engine_options(self) -> Dict[str, Any]:
+        options = super().engine_options()
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        return options
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded SQLite database file (desktop build, single-host deployments)
+    
+    Connections run in WAL mode with synchronous=NORMAL and a memory-mapped
+    file, so readers never block the writer and commits skip the full fsync.
+    SQLite allows one writer at a time; write_lock() serializes write
+    transactions inside the process instead of failing on a busy database.
+    """
+    
+    name = "sqlite"
+    async_driver = "aiosqlite"
+    sync_driver = "pysqlite"
+    create_schema = True
+    
+    def __init__(self, url: URL):
+        super().__init__(url)
+        self._write_lock: Optional[asyncio.Lock] = None
+        if url.database and url.database != ":memory:":
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+    
+    def engine_options(self) -> Dict[str, Any]:
+        options = super().engine_options()
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT}
+        if self.url.database and self.url.database != ":memory:":
+            # Same pool size as the server backend, so pool pressure measured here carries over
+            options["pool_size"] = settings.DATABASE_POOL_SIZE
+        return options
+    
+    def configure(self, sync_engine: Engine) -> None:
+        @event.listens_for(sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+            cursor.close()
+    
+    def write_lock(self):
+        # Created lazily so it binds to the running event loop
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+BACKENDS = {
+    "postgresql": PostgresBackend,
+    "sqlite": SQLiteBackend,
+}
+
+def desktop_database_url() -> str:
+    """SQLite file in the per-user data directory (used by the frozen desktop build)"""
+    if settings.DESKTOP_DATA_DIR:
+        data_dir = Path(settings.DESKTOP_DATA_DIR)
+    elif os.name == "nt":
+        data_dir = Path(os.environ.get("LOCALAPPDATA", Path.home())) / "BioDockViz"
+    else:
+        data_dir = Path.home() / ".biodockviz"
+    return f"sqlite:///{(data_dir / 'biodockviz.sqlite3').as_posix()}"
+
+def resolve_database_url() -> str:
+    """DATABASE_URL, or the embedded SQLite file when running frozen without one"""
+    if getattr(sys, "frozen", False) and "DATABASE_URL" not in settings.model_fields_set:
+        return desktop_database_url()
+    return settings.DATABASE_URL
+
+def create_backend(url: Optional[str] = None) -> StorageBackend:
+    """Pick the storage backend from the URL scheme (e.g. postgresql+asyncpg://, sqlite:///)"""
+    parsed = make_url(url or resolve_database_url())
+    backend_name = parsed.get_backend_name()
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unsupported database backend: {backend_name}")
+    return BACKENDS[backend_name](parsed)
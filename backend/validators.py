@@ -1,5 +1,5 @@
 """Core Validators - Placeholder exports"""
 
-from .core.validators import FileValidator, ContentTypeValidator, AtomValidator, StructureValidator
+from .core.validators import FileValidator, ContentScanner, ContentTypeValidator, AtomValidator, StructureValidator
 
-__all__ = ["FileValidator", "ContentTypeValidator", "AtomValidator", "StructureValidator"]
+__all__ = ["FileValidator", "ContentScanner", "ContentTypeValidator", "AtomValidator", "StructureValidator"]
@@ -0,0 +1,98 @@
+"""Analysis Isolation Stress Check - Concurrent Analyses Must Not Share State
+
+Usage:
+    python benchmarks/analysis_isolation_stress.py [--structures 8] [--atoms 400] [--rounds 2] [--threads 8] [--processes 2]
+
+Analyzes distinct synthetic structures serially to get reference results,
+then again concurrently through one shared InteractionPipeline, from a
+thread pool and from a process pool, in shuffled order. Every concurrent
+result must equal its structure's reference. Also checks that a structure's
+MolecularContext is freed as soon as its analysis returns. Exits with status
+1 on any mismatch.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.core.engines.interaction_pipeline import InteractionPipeline
+from backend.core.engines.molecular_engine import MolecularContext
+
+RESIDUES = ("ALA", "LYS", "ASP", "GLU", "ARG", "SER")
+ELEMENTS = ("C", "C", "N", "O", "H", "S")
+
+def synthetic_atoms(count: int, seed: int) -> list:
+    """Atoms at protein density with charged residues and hydrogens, different for every seed"""
+    rng = random.Random(seed)
+    side = (count / 0.1) ** (1 / 3)
+    return [
+        {
+            'index': i, 'serial': i + 1, 'name': 'X', 'element': rng.choice(ELEMENTS),
+            'res_name': rng.choice(RESIDUES), 'res_seq': i // 8 + 1, 'chain_id': 'A',
+            'x': rng.uniform(0, side), 'y': rng.uniform(0, side), 'z': rng.uniform(0, side),
+        }
+        for i in range(count)
+    ]
+
+def digest(results: dict) -> str:
+    return hashlib.sha256(json.dumps(results, sort_keys=True).encode("utf-8")).hexdigest()
+
+def check_release(pipeline: InteractionPipeline, atoms: list) -> bool:
+    """The context is unreachable once analyze returns (no gc pass needed)"""
+    context = MolecularContext.build(atoms)
+    reference = weakref.ref(context)
+    pipeline.analyze(context)
+    del context
+    return reference() is None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--structures", type=int, default=8)
+    parser.add_argument("--atoms", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+    
+    # Sizes differ so a result leaking between structures cannot match by accident
+    structures = [synthetic_atoms(args.atoms + 37 * k, seed=k) for k in range(args.structures)]
+    pipeline = InteractionPipeline()
+    
+    start = time.perf_counter()
+    reference = [digest(pipeline.analyze_atoms(atoms)) for atoms in structures]
+    serial_seconds = time.perf_counter() - start
+    
+    order = [k for k in range(args.structures) for _ in range(args.rounds)]
+    random.Random(0).shuffle(order)
+    report = {
+        "structures": args.structures,
+        "analyses_per_mode": len(order),
+        "serial_seconds": round(serial_seconds, 3),
+        "context_released": check_release(pipeline, structures[0]),
+    }
+    
+    for mode, executor in (
+        ("threads", ThreadPoolExecutor(max_workers=args.threads)),
+        ("processes", ProcessPoolExecutor(max_workers=args.processes)),
+    ):
+        with executor:
+            start = time.perf_counter()
+            results = list(executor.map(pipeline.analyze_atoms, [structures[k] for k in order]))
+            elapsed = time.perf_counter() - start
+        mismatches = sum(digest(result) != reference[k] for k, result in zip(order, results))
+        report[mode] = {"seconds": round(elapsed, 3), "mismatches": mismatches}
+    
+    print(json.dumps(report, indent=2))
+    if not report["context_released"] or report["threads"]["mismatches"] or report["processes"]["mismatches"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
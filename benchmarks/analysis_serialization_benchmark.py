@@ -0,0 +1,125 @@
+"""Analysis Serialization Benchmark - Model-Based vs Columnar Response Encoding
+
+Usage:
+    python benchmarks/analysis_serialization_benchmark.py [--interactions 100000] [--runs 5]
+
+Encodes the same synthetic pipeline result through the default path
+(response models, jsonable_encoder, json.dumps as FastAPI does) and the
+columnar path (parallel arrays, fast_json.dumps), reporting interactions
+per second and payload size.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.core import fast_json
+from backend.schemas import AnalysisResponse, AnalysisMetadata, HydrogenBond, VDWContact, SaltBridge
+from backend.services.interaction_store import columnar_results
+
+METADATA = {
+    "processing_time_ms": 0,
+    "atom_count": 0,
+    "bond_count": 0,
+    "algorithm": "O(n) spatial hash grid",
+    "thresholds": {},
+}
+
+def synthetic_results(count: int, seed: int = 0) -> dict:
+    """Pipeline-shaped result with count interactions split across the three types"""
+    rng = random.Random(seed)
+    
+    def record(low: float, high: float, with_angle: bool = False) -> dict:
+        return {
+            "atom1_index": rng.randrange(100000),
+            "atom2_index": rng.randrange(100000),
+            "distance": rng.uniform(low, high),
+            "angle": rng.uniform(120.0, 180.0) if with_angle else None,
+            "atom1_residue": "SER",
+            "atom1_residue_seq": rng.randrange(1000),
+            "atom2_residue": "ASP",
+            "atom2_residue_seq": rng.randrange(1000),
+            "confidence": rng.random(),
+        }
+    
+    return {
+        "hydrogen_bonds": [record(1.5, 2.5, True) for _ in range(count // 4)],
+        "vdw_contacts": [record(3.0, 5.0) for _ in range(count - count // 4 - count // 8)],
+        "salt_bridges": [record(2.5, 4.0) for _ in range(count // 8)],
+    }
+
+def encode_models(structure_id: str, results: dict) -> bytes:
+    """Default path: one response model per interaction, then FastAPI's JSON encoding"""
+    response = AnalysisResponse(
+        structure_id=structure_id,
+        hydrogen_bonds=[HydrogenBond(**hb, is_predicted=False) for hb in results["hydrogen_bonds"]],
+        vdw_contacts=[
+            VDWContact(**{k: v for k, v in vdw.items() if k != "angle"}, is_predicted=False)
+            for vdw in results["vdw_contacts"]
+        ],
+        salt_bridges=[
+            SaltBridge(**{k: v for k, v in sb.items() if k != "angle"}, is_predicted=False)
+            for sb in results["salt_bridges"]
+        ],
+        total_interactions=sum(len(records) for records in results.values()),
+        metadata=AnalysisMetadata(**METADATA),
+        stage="analyzed",
+        timestamp=datetime.now().isoformat(),
+    )
+    return json.dumps(jsonable_encoder(response), separators=(",", ":")).encode("utf-8")
+
+def encode_columnar(structure_id: str, results: dict) -> bytes:
+    """Columnar path: parallel arrays per type, encoded with fast_json"""
+    columns = columnar_results(results)
+    return fast_json.dumps({
+        "structure_id": structure_id,
+        "format": "columnar",
+        "interactions": columns,
+        "counts": {interaction_type: len(table["atom1_index"]) for interaction_type, table in columns.items()},
+        "total_interactions": sum(len(records) for records in results.values()),
+        "metadata": METADATA,
+        "stage": "analyzed",
+        "timestamp": datetime.now().isoformat(),
+    })
+
+def measure(encode, results: dict, runs: int) -> dict:
+    timings, size = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(encode("00000000-0000-0000-0000-000000000000", results))
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    count = sum(len(records) for records in results.values())
+    return {
+        "median_ms": round(median * 1000, 1),
+        "interactions_per_second": round(count / median),
+        "bytes": size,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interactions", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    
+    results = synthetic_results(args.interactions)
+    report = {
+        "interactions": args.interactions,
+        "encoder": "orjson" if fast_json.orjson is not None else "json",
+        "models": measure(encode_models, results, args.runs),
+        "columnar": measure(encode_columnar, results, args.runs),
+    }
+    report["speedup"] = round(report["models"]["median_ms"] / max(report["columnar"]["median_ms"], 0.1), 1)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
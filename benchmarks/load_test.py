@@ -0,0 +1,425 @@
+"""Load Test - Concurrent Clients Against the Full Application
+
+Usage:
+    python benchmarks/load_test.py [--mix parse_summary=4,atoms=4,interactions=4,analyze=2,visualize=2,upload=1]
+        [--concurrency 32] [--duration 30] [--warmup 3] [--rate 0]
+        [--structures 8] [--atoms 2000] [--pool-size 10]
+        [--spawn-workers N] [--port 8765]
+        [--url http://host:port --structure-ids ID,ID]
+        [--output report.json]
+
+Targets:
+    (default)        the app in-process through httpx.ASGITransport, with its
+                     startup and shutdown hooks run around the test
+    --spawn-workers  uvicorn with N worker processes on localhost, for sizing
+                     WORKERS (needs uvicorn, as in requirements.txt)
+    --url            a server that is already running; operations on stored
+                     structures use --structure-ids
+
+For the first two the database is a scratch SQLite file standing in for
+Postgres (its connection pool sized by --pool-size, as DATABASE_POOL_SIZE
+sizes the server's), seeded with --structures synthetic proteins of --atoms
+atoms through the parse persistence path, each analyzed once so stored
+interactions exist. Rate limiting is off and logging is at ERROR.
+
+Closed loop (default): --concurrency clients each pick an operation from
+the mix by weight and issue it when their previous one returns. Open loop
+(--rate R): operations start on a Poisson schedule of R per second however
+slow the server is, and latency counts from the scheduled start, so
+queueing shows up in the percentiles instead of slowing the clients down.
+
+Operations: health, parse_summary, atoms (keyset page of one chain),
+interactions (stored, columnar), analyze (POST, columnar; concurrent
+identical analyses coalesce), visualize (binary frame), upload (1000-atom
+PDB), and workflow (upload, job poll if queued, parse summary, analyze of
+the upload; each step reported as workflow/<step>). The PDB parser is
+still a placeholder that finds no atoms, so uploads are currently rejected
+(500) and the workflow stops after its upload step; they show up as error
+statuses, and the upload latency still covers the receive-and-parse path.
+
+Prints a JSON report: per endpoint requests, throughput, errors by status
+and latency percentiles (ms); and the database pool's checked-out
+connections sampled from /metrics every 250 ms (with several workers each
+sample comes from whichever worker answered).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synthetic import protein, to_pdb
+
+OPERATIONS = ("health", "parse_summary", "atoms", "interactions", "analyze", "visualize", "upload", "workflow")
+DEFAULT_MIX = "parse_summary=4,atoms=4,interactions=4,analyze=2,visualize=2,upload=1"
+# Operations that need seeded (parsed and analyzed) structures
+NEEDS_STRUCTURES = ("parse_summary", "atoms", "interactions", "analyze", "visualize")
+METRICS_INTERVAL = 0.25
+
+def configure_environment(scratch: str, pool_size: int) -> None:
+    """Settings for a self-contained run; must happen before the backend is imported"""
+    defaults = {
+        "BIODOCKVIZ_DATABASE_URL": f"sqlite:///{scratch}/load.sqlite3",
+        "BIODOCKVIZ_DATABASE_POOL_SIZE": str(pool_size),
+        "BIODOCKVIZ_JOB_QUEUE_PATH": f"{scratch}/jobs.sqlite3",
+        "BIODOCKVIZ_CACHE_DIR": f"{scratch}/cache",
+        "BIODOCKVIZ_RATE_LIMIT_ENABLED": "false",
+        "BIODOCKVIZ_LOG_LEVEL": "ERROR",
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+class Stats:
+    """Latencies and statuses per endpoint name"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.recording = False
+    
+    def record(self, name: str, seconds: float, status) -> None:
+        if self.recording:
+            self.latencies[name].append(seconds)
+            self.statuses[name][str(status)] += 1
+    
+    @staticmethod
+    def _summary(latencies: List[float], statuses: Counter, duration: float) -> dict:
+        ms = np.array(latencies) * 1000
+        return {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / duration, 2),
+            "errors": {status: count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400},
+            "latency_ms": {
+                "mean": round(float(ms.mean()), 2),
+                "p50": round(float(np.percentile(ms, 50)), 2),
+                "p90": round(float(np.percentile(ms, 90)), 2),
+                "p99": round(float(np.percentile(ms, 99)), 2),
+                "p99.9": round(float(np.percentile(ms, 99.9)), 2),
+                "max": round(float(ms.max()), 2),
+            },
+        }
+    
+    def report(self, duration: float) -> dict:
+        endpoints = {
+            name: self._summary(latencies, self.statuses[name], duration)
+            for name, latencies in sorted(self.latencies.items())
+        }
+        # Workflow steps are already counted in their workflow
+        top = [name for name in self.latencies if "/" not in name]
+        total = self._summary(
+            [latency for name in top for latency in self.latencies[name]],
+            sum((self.statuses[name] for name in top), Counter()),
+            duration,
+        ) if top else None
+        return {"endpoints": endpoints, "total": total}
+
+class Load:
+    """The operations of the mix, timed into Stats"""
+    
+    def __init__(self, client: httpx.AsyncClient, structure_ids: List[str], stats: Stats, rng: random.Random):
+        self.client = client
+        self.structure_ids = structure_ids
+        self.stats = stats
+        self.rng = rng
+        self.upload_text = to_pdb(protein(1000, seed=99)).encode()
+    
+    def structure(self) -> str:
+        return self.rng.choice(self.structure_ids)
+    
+    async def call(self, name: str, method: str, url: str, start: Optional[float] = None, **kwargs) -> Optional[httpx.Response]:
+        start = start or time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.stats.record(name, time.perf_counter() - start, status)
+        return response
+    
+    async def health(self, start: float) -> None:
+        await self.call("health", "GET", "/health", start)
+    
+    async def parse_summary(self, start: float) -> None:
+        await self.call("parse_summary", "GET", f"/api/parse/{self.structure()}", start)
+    
+    async def atoms(self, start: float) -> None:
+        await self.call("atoms", "GET", f"/api/parse/{self.structure()}/atoms", start, params={"chain": "A", "limit": 200})
+    
+    async def interactions(self, start: float) -> None:
+        await self.call("interactions", "GET", f"/api/analyze/interactions/{self.structure()}", start, params={"format": "columnar"})
+    
+    async def analyze(self, start: float) -> None:
+        await self.call("analyze", "POST", f"/api/analyze/interactions/{self.structure()}", start, params={"format": "columnar"})
+    
+    async def visualize(self, start: float) -> None:
+        await self.call("visualize", "GET", f"/api/visualize/data/{self.structure()}", start)
+    
+    async def upload(self, start: float, name: str = "upload") -> Optional[httpx.Response]:
+        # A distinct file each time (the header line differs), like independent users
+        content = f"REMARK   load {self.rng.getrandbits(64)}\n".encode() + self.upload_text
+        return await self.call(name, "POST", "/api/upload/file", start, files={"file": ("load.pdb", content, "chemical/x-pdb")})
+    
+    async def workflow(self, start: float) -> None:
+        response = await self.upload(start, "workflow/upload")
+        if response is None or response.status_code >= 400:
+            self.stats.record("workflow", time.perf_counter() - start, response.status_code if response is not None else "error")
+            return
+        body = response.json()
+        structure_id = body["structure_id"]
+        
+        if body.get("job_id"):
+            step = time.perf_counter()
+            status = "timeout"
+            while time.perf_counter() - step < 60:
+                job = await self.client.get(f"/api/jobs/{body['job_id']}")
+                if job.status_code >= 400 or job.json()["status"] in ("succeeded", "failed", "dead"):
+                    status = job.status_code
+                    break
+                await asyncio.sleep(0.05)
+            self.stats.record("workflow/job", time.perf_counter() - step, status)
+        
+        await self.call("workflow/parse_summary", "GET", f"/api/parse/{structure_id}")
+        response = await self.call("workflow/analyze", "POST", f"/api/analyze/interactions/{structure_id}", params={"format": "columnar"})
+        self.stats.record("workflow", time.perf_counter() - start, response.status_code if response is not None else "error")
+
+async def closed_loop(load: Load, mix: Dict[str, float], concurrency: int, stop_at: float) -> None:
+    names, weights = list(mix), list(mix.values())
+    
+    async def client(rng: random.Random) -> None:
+        while time.perf_counter() < stop_at:
+            await getattr(load, rng.choices(names, weights)[0])(time.perf_counter())
+    
+    await asyncio.gather(*(client(random.Random(n)) for n in range(concurrency)))
+
+async def open_loop(load: Load, mix: Dict[str, float], rate: float, stop_at: float, rng: random.Random) -> None:
+    names, weights = list(mix), list(mix.values())
+    tasks = set()
+    next_at = time.perf_counter()
+    while next_at < stop_at:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(getattr(load, rng.choices(names, weights)[0])(next_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_at += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+async def sample_pool(client: httpx.AsyncClient, samples: List[Dict[str, float]], stop: asyncio.Event) -> None:
+    """Connection pool gauges from /metrics until stop is set"""
+    wanted = ("biodockviz_db_pool_size", "biodockviz_db_pool_checked_out", "biodockviz_db_pool_overflow")
+    while not stop.is_set():
+        try:
+            response = await client.get("/metrics")
+            values = {}
+            for line in response.text.splitlines():
+                name, _, value = line.partition(" ")
+                if name in wanted:
+                    values[name] = float(value)
+            if values:
+                samples.append(values)
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), METRICS_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+def pool_report(samples: List[Dict[str, float]]) -> Optional[dict]:
+    if not samples:
+        return None
+    checked_out = [sample.get("biodockviz_db_pool_checked_out", 0.0) for sample in samples]
+    size = max(sample.get("biodockviz_db_pool_size", 0.0) for sample in samples)
+    return {
+        "size": size,
+        "samples": len(samples),
+        "max_checked_out": max(checked_out),
+        "mean_checked_out": round(sum(checked_out) / len(checked_out), 2),
+        "saturated_fraction": round(sum(value >= size for value in checked_out) / len(checked_out), 3) if size else None,
+        "max_overflow": max(sample.get("biodockviz_db_pool_overflow", 0.0) for sample in samples),
+    }
+
+async def seed_structures(count: int, atoms: int) -> List[str]:
+    """Store synthetic structures the way the parse stage persists them"""
+    from backend.database import Structure, get_db, write_lock
+    from backend.services.atom_store import replace_atoms
+    from backend.services.parsing_service import ParsingService
+    
+    structure_ids = []
+    for k in range(count):
+        generated = protein(atoms, seed=k)
+        text = to_pdb(generated)
+        parsed = SimpleNamespace(atoms=generated, bonds=None, models=None, metadata={}, warnings=[])
+        models, _, metadata = ParsingService.build_structure(parsed, f"load-{k}.pdb", len(text))
+        parsed_data = {"atoms": [model.dict() for model in models], "bonds": [], "metadata": metadata.dict()}
+        async with write_lock(), get_db() as db:
+            structure = Structure(
+                file_name=f"load-{k}.pdb",
+                file_type="pdb",
+                file_size=len(text),
+                file_hash=hashlib.sha256(text.encode()).hexdigest(),
+                content=text,
+                parsed_data=parsed_data,
+                atom_count=len(models),
+                bond_count=0,
+            )
+            db.add(structure)
+            await db.flush()
+            await replace_atoms(db, structure.id, parsed_data["atoms"])
+            await db.commit()
+            structure_ids.append(str(structure.id))
+    return structure_ids
+
+def spawn_server(workers: int, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.perf_counter() > deadline:
+            raise SystemExit("Server did not become healthy")
+        await asyncio.sleep(0.5)
+
+async def run(args: argparse.Namespace, mix: Dict[str, float]) -> dict:
+    headers = {"X-API-Key": os.environ["BIODOCKVIZ_SECRET_KEY"]} if os.environ.get("BIODOCKVIZ_SECRET_KEY") else {}
+    server = None
+    app = None
+    if args.url:
+        target = args.url
+        transport = None
+    elif args.spawn_workers:
+        target = f"http://127.0.0.1:{args.port}"
+        transport = None
+        server = spawn_server(args.spawn_workers, args.port)
+    else:
+        import backend
+        app = backend
+        target = "http://load-test"
+        transport = httpx.ASGITransport(app=backend.app)
+        await backend.startup_event()
+    
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    client = httpx.AsyncClient(transport=transport, base_url=target, headers=headers, limits=limits, timeout=120)
+    try:
+        await wait_until_healthy(client)
+        if args.url:
+            structure_ids = [structure_id for structure_id in args.structure_ids.split(",") if structure_id]
+        else:
+            structure_ids = await seed_structures(args.structures, args.atoms)
+        
+        if not structure_ids:
+            dropped = [name for name in mix if name in NEEDS_STRUCTURES]
+            if dropped:
+                print(f"No structures; dropping {', '.join(dropped)} from the mix", file=sys.stderr)
+            mix = {name: weight for name, weight in mix.items() if name not in NEEDS_STRUCTURES}
+        if not mix:
+            raise SystemExit("Nothing left in the mix")
+        
+        # Stored interactions for the read paths
+        for structure_id in structure_ids:
+            await client.post(f"/api/analyze/interactions/{structure_id}", params={"format": "columnar"})
+        
+        stats = Stats()
+        load = Load(client, structure_ids, stats, random.Random(args.seed))
+        samples: List[Dict[str, float]] = []
+        stop_sampling = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(client, samples, stop_sampling))
+        
+        async def start_recording() -> None:
+            await asyncio.sleep(args.warmup)
+            stats.recording = True
+            samples.clear()
+        
+        recorder = asyncio.create_task(start_recording())
+        started = time.perf_counter()
+        stop_at = started + args.warmup + args.duration
+        if args.rate:
+            await open_loop(load, mix, args.rate, stop_at, random.Random(args.seed))
+        else:
+            await closed_loop(load, mix, args.concurrency, stop_at)
+        elapsed = time.perf_counter() - started - args.warmup
+        stop_sampling.set()
+        await asyncio.gather(sampler, recorder)
+        
+        return {
+            "target": "url" if args.url else f"uvicorn x{args.spawn_workers}" if args.spawn_workers else "in-process",
+            "load": {"rate_per_second": args.rate} if args.rate else {"concurrency": args.concurrency},
+            "mix": mix,
+            "duration_seconds": round(elapsed, 2),
+            "structures": len(structure_ids),
+            "atoms_per_structure": None if args.url else args.atoms,
+            "pool_size_setting": None if args.url else args.pool_size,
+            **stats.report(elapsed),
+            "db_pool": pool_report(samples),
+        }
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.shutdown_event()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop operations per second (0: closed loop)")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--structures", type=int, default=8)
+    parser.add_argument("--atoms", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--spawn-workers", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url")
+    parser.add_argument("--structure-ids", default="")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    
+    mix = parse_mix(args.mix)
+    configure_environment(tempfile.mkdtemp(prefix="biodockviz-load-"), args.pool_size)
+    report = asyncio.run(run(args, mix))
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
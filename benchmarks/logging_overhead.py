@@ -0,0 +1,112 @@
+"""Logging Overhead Benchmark - Cost of a Log Call on the Calling Thread
+
+Usage:
+    python benchmarks/logging_overhead.py [--records 50000] [--requests 500] [--max-request-us 500]
+
+Measures what a logger.info call costs the thread that makes it (wall time,
+and that thread's CPU time, which leaves out the writer thread): with a
+synchronous FileHandler (the previous setup), through the queue pipeline
+with text and JSON output, and for a record dropped by sampling. On a
+single core the writer thread's work still shows up in wall time.
+Then serves requests through the ASGI app with request logging on and off
+and reports the added time per request. Exits with status 1 if logging adds
+more than --max-request-us microseconds per request.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.logging_config import logging_stats, setup_logging, shutdown_logging
+
+def per_call_us(logger: logging.Logger, records: int) -> dict:
+    """Wall time per call, and CPU time of the calling thread alone (excludes the writer thread)"""
+    start, start_cpu = time.perf_counter_ns(), time.thread_time_ns()
+    for i in range(records):
+        logger.info("Analyzing %d atoms", i, extra={"structure_id": "bench"})
+    return {
+        "wall_us": round((time.perf_counter_ns() - start) / records / 1000, 2),
+        "caller_cpu_us": round((time.thread_time_ns() - start_cpu) / records / 1000, 2),
+    }
+
+def synchronous_file_us(path: str, records: int) -> dict:
+    """The previous setup: formatting and file writes on the caller's thread"""
+    root = logging.getLogger()
+    shutdown_logging()
+    root.handlers.clear()
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    try:
+        return per_call_us(logging.getLogger("bench.sync"), records)
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+
+def queued_us(path: str, records: int, json_format: bool, sampling=None, name: str = "bench.queue") -> dict:
+    setup_logging("INFO", path, json_format=json_format, sampling=sampling, queue_size=records + 10)
+    timing = per_call_us(logging.getLogger(name), records)
+    stats = logging_stats()
+    shutdown_logging()
+    return dict(timing, dropped=stats["dropped"], sampled_out=stats["sampled_out"])
+
+async def request_us(requests: int, log_level: str) -> float:
+    import httpx
+    import backend
+    
+    setup_logging(log_level, None)
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(20):
+            await client.get("/")
+        start = time.perf_counter_ns()
+        for _ in range(requests):
+            await client.get("/")
+        elapsed = time.perf_counter_ns() - start
+    shutdown_logging()
+    return elapsed / requests / 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--max-request-us", type=float, default=500.0)
+    args = parser.parse_args()
+    
+    os.environ.setdefault("BIODOCKVIZ_RATE_LIMIT_ENABLED", "false")
+    # The console handler writes to stdout; keep it out of the report
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "bench.log")
+        report = {
+            "records": args.records,
+            "sync_file_handler": synchronous_file_us(log_file, args.records),
+            "queue_text": queued_us(log_file, args.records, json_format=False),
+            "queue_json": queued_us(log_file, args.records, json_format=True),
+            "queue_sampled_out": queued_us(log_file, args.records, json_format=True, sampling={"bench": 0.0}, name="bench.hot"),
+        }
+    
+    try:
+        logged = asyncio.run(request_us(args.requests, "INFO"))
+        silent = asyncio.run(request_us(args.requests, "CRITICAL"))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    
+    report["request_us"] = {"logging_on": round(logged, 1), "logging_off": round(silent, 1), "added": round(logged - silent, 1)}
+    print(json.dumps(report, indent=2))
+    if logged - silent > args.max_request_us:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
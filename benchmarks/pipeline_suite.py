@@ -0,0 +1,304 @@
+"""Pipeline Benchmark Suite - Stage Timings, Peak Memory and Scaling per Structure Size
+
+Usage:
+    python benchmarks/pipeline_suite.py [--generators protein,solvated,complex]
+        [--sizes 1000,10000,100000] [--stages grid_build,bond_detection,...]
+        [--repeat 3] [--seed 0] [--no-memory]
+        [--history benchmarks/results/pipeline_history.json] [--no-record]
+        [--threshold 0.25] [--memory-threshold 0.10] [--max-exponent 1.3]
+
+For each synthetic structure (see synthetic.py) times every stage a
+structure goes through:
+
+    pdb_parse           PDBParser.parse on the structure's PDB text
+    build_models        ParsingService.build_structure (atom/bond models)
+    grid_build          SpatialHashGrid construction
+    bond_detection      detect_bonds over the grid
+    interactions        InteractionPipeline.analyze
+    serialize_models    analysis response models encoded as the GET route does
+    serialize_columnar  columnar analysis response
+
+Times are the median of --repeat runs (a single run above 20k atoms); peak
+memory is the tracemalloc peak of one extra run, above what was allocated
+before it. The scaling exponent of each stage is the slope of log(time)
+against log(atoms) across the sizes: about 1 for the O(n) stages, 2 for
+all-pairs work (only judged once the largest size takes 50 ms or more).
+
+Every run is appended to a JSON history (with commit, Python and machine).
+A stage regresses when it is more than --threshold slower (or uses more
+than --memory-threshold more memory) than the median of the last five
+recorded runs on the same machine. Exits with status 1 on a regression, or
+when grid_build, bond_detection or interactions scale worse than
+--max-exponent. Runs offline: settings point at a throwaway SQLite file, so
+no database server is needed. 1M atoms (--sizes ...,1000000) takes hours in
+the pure-Python stages; run it deliberately.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Importing the services builds a database engine from settings; keep it local and offline
+_scratch = tempfile.mkdtemp(prefix="biodockviz-bench-")
+os.environ.setdefault("BIODOCKVIZ_DATABASE_URL", f"sqlite:///{_scratch}/bench.sqlite3")
+
+from synthetic import GENERATORS, to_pdb
+
+from backend.core.engines.interaction_pipeline import InteractionPipeline
+from backend.core.engines.molecular_engine import MolecularContext, detect_bonds
+from backend.core.fast_json import COLUMNAR_MEDIA_TYPE, FastJSONResponse
+from backend.core.parsers.pdb_parser import PDBParser
+from backend.core.spatial_hash import SpatialHashGrid
+from backend.services.analysis_service import AnalysisService
+from backend.services.parsing_service import ParsingService
+
+STAGES = (
+    "pdb_parse", "build_models", "grid_build", "bond_detection",
+    "interactions", "serialize_models", "serialize_columnar",
+)
+
+# Stages documented as O(n); their scaling exponent is checked
+LINEAR_STAGES = ("grid_build", "bond_detection", "interactions")
+
+DEFAULT_HISTORY = ROOT / "benchmarks" / "results" / "pipeline_history.json"
+BASELINE_RUNS = 5
+HISTORY_LIMIT = 200
+# Differences below this are timer and scheduler noise
+NOISE_SECONDS = 0.002
+# Scaling is only judged on stages whose largest size takes at least this long
+SCALING_MIN_SECONDS = 0.05
+
+class StructureRun:
+    """Inputs and outputs of one structure passing through the stages"""
+    
+    def __init__(self, atoms: List[dict]):
+        self.atoms = atoms
+        self.pdb_text = to_pdb(atoms)
+        self.grid: Optional[SpatialHashGrid] = None
+        self.results: Optional[Dict[str, List[dict]]] = None
+        self.loop = asyncio.new_event_loop()
+        self.pipeline = InteractionPipeline()
+    
+    def pdb_parse(self) -> Dict[str, Any]:
+        result = self.loop.run_until_complete(PDBParser().parse(self.pdb_text))
+        return {"atoms_parsed": len(result.atoms), "bytes": len(self.pdb_text)}
+    
+    def build_models(self) -> Dict[str, Any]:
+        # Parser-shaped result of the generated atoms (independent of the parser's state)
+        parsed = SimpleNamespace(atoms=self.atoms, bonds=None, models=None, metadata={}, warnings=[])
+        atoms, _, _ = ParsingService.build_structure(parsed, "bench.pdb", len(self.pdb_text))
+        return {"models": len(atoms)}
+    
+    def grid_build(self) -> Dict[str, Any]:
+        self.grid = SpatialHashGrid(self.atoms)
+        return {"cells": len(self.grid.grid), "cell_size": round(float(self.grid.cell_size), 3)}
+    
+    def bond_detection(self) -> Dict[str, Any]:
+        return {"bonds": len(detect_bonds(tuple(self.atoms), self._grid()))}
+    
+    def interactions(self) -> Dict[str, Any]:
+        context = MolecularContext(atoms=tuple(self.atoms), given_bonds=(), spatial_grid=self._grid())
+        self.results = self.pipeline.analyze(context)
+        return {key: len(records) for key, records in self.results.items()}
+    
+    def serialize_models(self) -> Dict[str, Any]:
+        response = AnalysisService._response("bench", self._run())
+        return {"bytes": len(FastJSONResponse(response.model_dump()).body)}
+    
+    def serialize_columnar(self) -> Dict[str, Any]:
+        content = AnalysisService._columnar_response("bench", self._run())
+        return {"bytes": len(FastJSONResponse(content, media_type=COLUMNAR_MEDIA_TYPE).body)}
+    
+    def _grid(self) -> SpatialHashGrid:
+        if self.grid is None:
+            self.grid = SpatialHashGrid(self.atoms)
+        return self.grid
+    
+    def _run(self) -> Dict[str, Any]:
+        if self.results is None:
+            self.interactions()
+        return {
+            "results": self.results,
+            "total_interactions": sum(len(records) for records in self.results.values()),
+            "metadata": {
+                "processing_time_ms": 0,
+                "atom_count": len(self.atoms),
+                "bond_count": 0,
+                "algorithm": "O(n) spatial hash grid",
+                "thresholds": self.pipeline.thresholds.dict(),
+                "partial": False,
+            },
+            "timestamp": "1970-01-01T00:00:00",
+        }
+    
+    def close(self) -> None:
+        self.loop.close()
+
+def measure(stage: Callable[[], Dict[str, Any]], repeat: int, memory: bool) -> Dict[str, Any]:
+    timings = []
+    details: Dict[str, Any] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        details = stage()
+        timings.append(time.perf_counter() - start)
+    result = {"seconds": round(statistics.median(timings), 6), "runs": repeat, **details}
+    
+    if memory:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        stage()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return result
+
+def scaling_exponents(results: Dict[str, Dict[str, Any]], generators: List[str], sizes: List[int], stages: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Slope of log(seconds) over log(atoms) per generator and stage, and whether it is long enough to judge"""
+    exponents = {}
+    for generator in generators:
+        for stage in stages:
+            points = [
+                (results[key]["atoms"], results[key]["seconds"])
+                for key in (f"{generator}/{size}/{stage}" for size in sizes)
+                if key in results and results[key].get("seconds", 0) > 0
+            ]
+            if len(points) >= 2:
+                atoms, seconds = zip(*points)
+                slope = np.polyfit(np.log(atoms), np.log(seconds), 1)[0]
+                exponents[f"{generator}/{stage}"] = {
+                    "exponent": round(float(slope), 3),
+                    "measurable": max(seconds) >= SCALING_MIN_SECONDS,
+                }
+    return exponents
+
+def machine() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu",
+    }
+
+def load_history(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {"runs": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def regressions(history: Dict[str, Any], run: Dict[str, Any], threshold: float, memory_threshold: float) -> List[Dict[str, Any]]:
+    """Stages of this run slower (or bigger) than the median of recent runs on the same machine"""
+    earlier = [r for r in history["runs"] if r.get("machine") == run["machine"]]
+    found = []
+    for key, result in run["results"].items():
+        previous = [r["results"][key] for r in earlier if key in r["results"]][-BASELINE_RUNS:]
+        if not previous:
+            continue
+        
+        baseline = statistics.median(p["seconds"] for p in previous)
+        if result["seconds"] > baseline * (1 + threshold) and result["seconds"] - baseline > NOISE_SECONDS:
+            found.append({"stage": key, "metric": "seconds", "baseline": baseline, "value": result["seconds"]})
+        
+        peaks = [p["peak_bytes"] for p in previous if "peak_bytes" in p]
+        if peaks and "peak_bytes" in result:
+            baseline = statistics.median(peaks)
+            if result["peak_bytes"] > baseline * (1 + memory_threshold):
+                found.append({"stage": key, "metric": "peak_bytes", "baseline": baseline, "value": result["peak_bytes"]})
+    return found
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generators", default=",".join(GENERATORS))
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--no-record", action="store_true", help="Compare with the history without appending to it")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--memory-threshold", type=float, default=0.10)
+    parser.add_argument("--max-exponent", type=float, default=1.3)
+    args = parser.parse_args()
+    
+    generators = args.generators.split(",")
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    stages = [stage for stage in STAGES if stage in args.stages.split(",")]
+    
+    # Warm up imports, caches and the allocator so the first measured stage is not penalized
+    warmup = StructureRun(GENERATORS["protein"](200, args.seed))
+    for stage in stages:
+        getattr(warmup, stage)()
+    warmup.close()
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    for generator in generators:
+        for size in sizes:
+            run = StructureRun(GENERATORS[generator](size, args.seed))
+            repeat = args.repeat if size <= 20000 else 1
+            for stage in stages:
+                key = f"{generator}/{size}/{stage}"
+                try:
+                    results[key] = {"atoms": len(run.atoms), **measure(getattr(run, stage), repeat, not args.no_memory)}
+                except Exception as e:
+                    results[key] = {"atoms": len(run.atoms), "error": f"{type(e).__name__}: {e}"}
+                print(f"{key}: {results[key]}", file=sys.stderr)
+            run.close()
+    
+    exponents = scaling_exponents(results, generators, sizes, stages)
+    timed = {key: result for key, result in results.items() if "seconds" in result}
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **machine(),
+        "seed": args.seed,
+        "results": timed,
+    }
+    
+    history = load_history(args.history)
+    found = regressions(history, record, args.threshold, args.memory_threshold)
+    superlinear = {
+        key: scaling["exponent"] for key, scaling in exponents.items()
+        if key.split("/")[1] in LINEAR_STAGES and scaling["measurable"] and scaling["exponent"] > args.max_exponent
+    }
+    
+    if not args.no_record:
+        history["runs"] = (history["runs"] + [record])[-HISTORY_LIMIT:]
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=1)
+    
+    report = {
+        "commit": record["commit"],
+        "results": results,
+        "scaling_exponents": exponents,
+        "superlinear": superlinear,
+        "regressions": found,
+        "history": None if args.no_record else str(args.history),
+    }
+    print(json.dumps(report, indent=2))
+    if found or superlinear:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Startup Budget - Import Time and Cold Start of the API in Fresh Interpreters
+
+Usage:
+    python benchmarks/startup_budget.py [--runs 5] [--import-budget-ms 1200]
+        [--startup-budget-ms 1400] [--top 15]
+
+Each run starts a new interpreter and measures:
+
+    import_ms    import backend (the FastAPI app, its routers and middleware)
+    startup_ms   import, then the lifespan startup (logging, schema, engine)
+                 and the first GET /health through an in-process ASGI client
+
+and reports the median of --runs runs. Whatever the timings, importing the
+app must not load the database drivers, numpy, the Redis client, the
+services or the legacy parser and analyzer re-exports: they are created on
+first use, and LAZY_MODULES lists those whose appearance at import means
+that regressed. The slowest imports of one `python -X importtime` run are
+listed to show where the time went.
+
+Exits with status 1 when a median is over its budget or a lazy module is
+loaded at import. Runs offline against a throwaway SQLite file. The
+defaults sit just above the highest medians measured on the reference
+machine (880-1050 ms import, 800-1130 ms cold start), so a regression of
+a few hundred milliseconds fails; retune them when the machine changes.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use, never by importing the app
+LAZY_MODULES = (
+    "aiosqlite",
+    "asyncpg",
+    "numpy",
+    "psycopg2",
+    "redis",
+    "backend.parsers",
+    "backend.analyzers",
+    "backend.services.analysis_service",
+    "backend.services.batch_service",
+    "backend.services.parsing_service",
+    "backend.services.query_service",
+    "backend.services.visualization_service",
+    "backend.services.export_service",
+    "backend.services.thumbnail_service",
+)
+
+IMPORT_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import backend
+t1 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+STARTUP_SNIPPET = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import backend
+import httpx
+
+async def cold_start():
+    async with backend.app.router.lifespan_context(backend.app):
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            health = (await client.get("/health")).json()
+        elapsed = time.perf_counter() - t0
+    return elapsed, health["status"]
+
+elapsed, status = asyncio.run(cold_start())
+print(json.dumps({"startup_ms": elapsed * 1000, "status": status}))
+"""
+
+def environment(scratch: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": str(ROOT),
+        "BIODOCKVIZ_DATABASE_URL": f"sqlite:///{scratch}/startup.sqlite3",
+        "BIODOCKVIZ_JOB_QUEUE_PATH": f"{scratch}/jobs.sqlite3",
+        "BIODOCKVIZ_CACHE_DIR": f"{scratch}/cache",
+        "BIODOCKVIZ_REDIS_URL": "",
+        "BIODOCKVIZ_JOB_EMBEDDED_WORKERS": "0",
+        "BIODOCKVIZ_LOG_LEVEL": "ERROR",
+    })
+    return env
+
+def run_snippet(snippet: str, env: Dict[str, str], *flags: str) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", snippet],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Snippet failed:\n{result.stderr}")
+    return result
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[dict]:
+    """Top-level packages and backend modules by cumulative import time (-X importtime)"""
+    stderr = run_snippet("import backend", env, "-X", "importtime").stderr
+    entries = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if not match:
+            continue
+        depth = len(match.group(3)) // 2
+        name = match.group(4)
+        # Top-level imports, and backend modules at any depth
+        if depth <= 1 or name.startswith("backend."):
+            entries.append({"module": name, "self_ms": int(match.group(1)) / 1000, "cumulative_ms": int(match.group(2)) / 1000})
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return entries[:top]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1200.0)
+    parser.add_argument("--startup-budget-ms", type=float, default=1400.0)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+    
+    env = environment(tempfile.mkdtemp(prefix="biodockviz-startup-"))
+    
+    # One unmeasured run so every measured one finds the bytecode cache written
+    run_snippet(IMPORT_SNIPPET, env)
+    
+    import_times: List[float] = []
+    loaded = set()
+    for _ in range(args.runs):
+        result = json.loads(run_snippet(IMPORT_SNIPPET, env).stdout)
+        import_times.append(result["import_ms"])
+        loaded.update(result["modules"])
+    
+    startup_times: List[float] = []
+    statuses = set()
+    for _ in range(args.runs):
+        result = json.loads(run_snippet(STARTUP_SNIPPET, env).stdout)
+        startup_times.append(result["startup_ms"])
+        statuses.add(result["status"])
+    
+    eager = sorted(
+        name for name in loaded
+        if any(name == module or name.startswith(f"{module}.") for module in LAZY_MODULES)
+    )
+    report = {
+        "runs": args.runs,
+        "import_ms": {
+            "median": round(statistics.median(import_times), 1),
+            "min": round(min(import_times), 1),
+            "max": round(max(import_times), 1),
+            "budget": args.import_budget_ms,
+        },
+        "startup_ms": {
+            "median": round(statistics.median(startup_times), 1),
+            "min": round(min(startup_times), 1),
+            "max": round(max(startup_times), 1),
+            "budget": args.startup_budget_ms,
+        },
+        "health": sorted(statuses),
+        "modules_loaded": len(loaded),
+        "eager_lazy_modules": eager,
+        "slowest_imports": slowest_imports(env, args.top),
+    }
+    
+    failures = []
+    if report["import_ms"]["median"] > args.import_budget_ms:
+        failures.append(f"import {report['import_ms']['median']} ms over {args.import_budget_ms} ms")
+    if report["startup_ms"]["median"] > args.startup_budget_ms:
+        failures.append(f"cold start {report['startup_ms']['median']} ms over {args.startup_budget_ms} ms")
+    if statuses != {"healthy"}:
+        failures.append(f"health check reported {sorted(statuses)}")
+    if eager:
+        failures.append(f"loaded at import: {', '.join(eager)}")
+    report["failures"] = failures
+    
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Synthetic Structures - Deterministic Generators for Benchmarks
+
+Each generator takes an atom count and a seed and always returns the same
+atoms (dicts in the parsed-structure shape the engines consume):
+
+    protein(n)   chains of bonded atoms (1.53 A steps) packed at protein
+                 density (~0.08 atoms/A^3), residues of eight atoms with
+                 charged residues for salt bridges
+    solvated(n)  a water box (O-H 0.96 A, ~0.1 atoms/A^3) around a small
+                 protein core (10% of the atoms)
+    ligand_complex(n)  a receptor with a 60-atom ligand (HETATM, chain L)
+                 in a pocket carved out of one face
+
+Coordinates come from numpy's PCG64 generator, so a given seed yields the
+same structure on every run (and platform) with the same numpy version.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+
+PROTEIN_DENSITY = 0.08  # atoms per cubic angstrom
+WATER_SPACING = 3.1  # angstrom between water oxygens (~0.033 waters/A^3)
+BOND_LENGTH = 1.53
+CHAIN_LENGTH = 1000
+LIGAND_ATOMS = 60
+
+# Backbone-like element pattern of one residue
+RESIDUE_ELEMENTS = ("N", "C", "C", "O", "C", "C", "N", "O")
+RESIDUE_NAMES = ("ALA", "LYS", "ASP", "GLU", "ARG", "SER", "LEU", "GLY", "HIS", "THR")
+
+def _fold(positions: np.ndarray, side: float) -> np.ndarray:
+    """Reflect free random-walk positions back into [0, side) (keeps step lengths)"""
+    period = 2.0 * side
+    wrapped = np.mod(positions, period)
+    return side - np.abs(side - wrapped)
+
+def _chains(count: int, side: float, rng: np.random.Generator, origin: np.ndarray) -> np.ndarray:
+    """count atoms as random-walk chains of CHAIN_LENGTH inside a cube of the given side"""
+    coords = np.empty((count, 3))
+    for start in range(0, count, CHAIN_LENGTH):
+        length = min(CHAIN_LENGTH, count - start)
+        steps = rng.normal(size=(length, 3))
+        steps *= BOND_LENGTH / np.linalg.norm(steps, axis=1, keepdims=True)
+        steps[0] = rng.uniform(0.0, side, size=3)
+        coords[start:start + length] = _fold(np.cumsum(steps, axis=0), side)
+    return coords + origin
+
+def _records(coords: np.ndarray, elements: List[str], res_names: List[str], res_seqs: np.ndarray,
+             chain_ids: List[str], start: int = 0, hetero: bool = False) -> List[dict]:
+    rounded = np.round(coords, 3).tolist()
+    return [
+        {
+            "index": start + i,
+            "serial": start + i + 1,
+            "name": f"{elements[i]}{i % 8 + 1}",
+            "alt_loc": "",
+            "res_name": res_names[i],
+            "chain_id": chain_ids[i],
+            "res_seq": int(res_seqs[i]),
+            "i_code": "",
+            "x": xyz[0],
+            "y": xyz[1],
+            "z": xyz[2],
+            "occupancy": 1.0,
+            "temp_factor": 0.0,
+            "element": elements[i],
+            "charge": 0.0,
+            "hetero": hetero,
+        }
+        for i, xyz in enumerate(rounded)
+    ]
+
+def _protein_records(count: int, rng: np.random.Generator, side: float, origin: np.ndarray, start: int = 0) -> List[dict]:
+    coords = _chains(count, side, rng, origin)
+    residues = np.arange(count) // len(RESIDUE_ELEMENTS)
+    names = rng.choice(len(RESIDUE_NAMES), size=int(residues[-1]) + 1 if count else 0)
+    elements = [RESIDUE_ELEMENTS[i % len(RESIDUE_ELEMENTS)] for i in range(count)]
+    res_names = [RESIDUE_NAMES[names[r]] for r in residues]
+    chain_ids = [chr(ord("A") + (i // CHAIN_LENGTH) % 26) for i in range(count)]
+    return _records(coords, elements, res_names, residues % 10000 + 1, chain_ids, start)
+
+def protein(n: int, seed: int = 0) -> List[dict]:
+    """Packed protein-like atoms"""
+    rng = np.random.default_rng(seed)
+    side = (n / PROTEIN_DENSITY) ** (1 / 3)
+    return _protein_records(n, rng, side, np.zeros(3))
+
+def solvated(n: int, seed: int = 0) -> List[dict]:
+    """Water box around a protein core"""
+    rng = np.random.default_rng(seed)
+    core_count = n // 10
+    waters = (n - core_count) // 3
+    core_count = n - 3 * waters
+    
+    # Water lattice big enough for the waters plus the core's volume
+    core_side = (core_count / PROTEIN_DENSITY) ** (1 / 3)
+    per_side = int(np.ceil((waters + (core_side / WATER_SPACING + 1) ** 3) ** (1 / 3)))
+    side = per_side * WATER_SPACING
+    core_origin = np.full(3, (side - core_side) / 2)
+    atoms = _protein_records(core_count, rng, core_side, core_origin)
+    
+    grid = np.stack(np.meshgrid(*[np.arange(per_side)] * 3, indexing="ij"), axis=-1).reshape(-1, 3) * WATER_SPACING
+    grid = grid + rng.uniform(-0.3, 0.3, size=grid.shape)
+    outside = np.any((grid < core_origin - 1.5) | (grid > core_origin + core_side + 1.5), axis=1)
+    oxygens = grid[outside][:waters]
+    
+    directions = rng.normal(size=(len(oxygens), 2, 3))
+    directions *= 0.96 / np.linalg.norm(directions, axis=2, keepdims=True)
+    coords = np.concatenate([oxygens[:, None, :], oxygens[:, None, :] + directions], axis=1).reshape(-1, 3)
+    count = len(coords)
+    residues = np.arange(count) // 3
+    atoms += _records(
+        coords,
+        ["O" if i % 3 == 0 else "H" for i in range(count)],
+        ["HOH"] * count,
+        residues % 10000 + 1,
+        ["W"] * count,
+        start=len(atoms),
+        hetero=True,
+    )
+    return atoms
+
+def ligand_complex(n: int, seed: int = 0) -> List[dict]:
+    """Receptor with a ligand in a pocket on one face"""
+    rng = np.random.default_rng(seed)
+    side = (n / PROTEIN_DENSITY) ** (1 / 3)
+    pocket = np.array([side / 2, side / 2, side - 4.0])
+    
+    # Compact ligand: a short walk folded into an 8 A cube at the pocket
+    ligand_coords = _chains(LIGAND_ATOMS, 8.0, rng, pocket - 4.0)
+    
+    # Receptor atoms, dropping any that clash with the ligand
+    receptor = _chains(int(n * 1.05), side, rng, np.zeros(3))
+    clear = np.linalg.norm(receptor - pocket, axis=1) > 7.0
+    receptor = receptor[clear][:n - LIGAND_ATOMS]
+    count = len(receptor)
+    residues = np.arange(count) // len(RESIDUE_ELEMENTS)
+    names = rng.choice(len(RESIDUE_NAMES), size=int(residues[-1]) + 1)
+    atoms = _records(
+        receptor,
+        [RESIDUE_ELEMENTS[i % len(RESIDUE_ELEMENTS)] for i in range(count)],
+        [RESIDUE_NAMES[names[r]] for r in residues],
+        residues % 10000 + 1,
+        [chr(ord("A") + (i // CHAIN_LENGTH) % 26) for i in range(count)],
+    )
+    atoms += _records(
+        ligand_coords,
+        [("C", "C", "N", "O", "C", "S")[i % 6] for i in range(LIGAND_ATOMS)],
+        ["LIG"] * LIGAND_ATOMS,
+        np.ones(LIGAND_ATOMS, dtype=int),
+        ["L"] * LIGAND_ATOMS,
+        start=count,
+        hetero=True,
+    )
+    return atoms
+
+GENERATORS: Dict[str, Callable[[int, int], List[dict]]] = {
+    "protein": protein,
+    "solvated": solvated,
+    "complex": ligand_complex,
+}
+
+def to_pdb(atoms: List[dict]) -> str:
+    """PDB text of generated atoms (hybrid serials are not needed below 100k atoms; larger ones wrap)"""
+    lines = []
+    for atom in atoms:
+        record = "HETATM" if atom.get("hetero") else "ATOM  "
+        lines.append(
+            f"{record}{atom['serial'] % 100000:5d} {atom['name']:<4s} {atom['res_name']:>3s} {atom['chain_id']:1s}"
+            f"{atom['res_seq'] % 10000:4d}    {atom['x']:8.3f}{atom['y']:8.3f}{atom['z']:8.3f}"
+            f"{atom['occupancy']:6.2f}{atom['temp_factor']:6.2f}          {atom['element']:>2s}"
+        )
+    lines.append("END")
+    return "\n".join(lines) + "\n"
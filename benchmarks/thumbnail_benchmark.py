@@ -0,0 +1,80 @@
+"""Thumbnail Benchmark - Server-Side Render Throughput
+
+Usage:
+    python benchmarks/thumbnail_benchmark.py [--atoms 500 5000 50000] [--images 32] [--size 256] [--workers 4]
+
+Renders synthetic structures (random-walk chains, ligand- to protein-sized)
+with core.rendering in one process and in a process pool, as the batch
+thumbnail job does, and reports images per second and PNG size per style.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.core.rendering import RENDER_STYLES, ViewParams, render_png
+
+def synthetic_structure(atoms: int, seed: int = 0):
+    """Random-walk chain folded into a box of protein density, with chain bonds"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(size=(atoms, 3))
+    steps *= 1.5 / np.linalg.norm(steps, axis=1, keepdims=True)
+    coords = np.cumsum(steps, axis=0)
+    # Fold the walk back into a box holding ~0.1 atoms per cubic Angstrom
+    side = (atoms / 0.1) ** (1 / 3)
+    coords = np.mod(coords, side) - side / 2
+    elements = rng.choice(np.array([6, 7, 8, 16, 1], dtype=np.uint8), size=atoms, p=[0.55, 0.15, 0.15, 0.02, 0.13])
+    bonds = np.column_stack((np.arange(atoms - 1), np.arange(1, atoms))).astype(np.int32)
+    # Steps that wrapped around the sphere are not bonds
+    bonds = bonds[np.linalg.norm(coords[bonds[:, 0]] - coords[bonds[:, 1]], axis=1) < 2.0]
+    return coords.astype(np.float32), elements, bonds
+
+def measure(structure, views, workers: int) -> dict:
+    coords, elements, bonds = structure
+    start = time.perf_counter()
+    if workers <= 1:
+        images = [render_png(coords, elements, bonds, view) for view in views]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Warm the workers so process start-up is not counted as render time
+            list(pool.map(render_png, *zip(*[(coords[:1], elements[:1], bonds[:0], views[0])] * workers)))
+            start = time.perf_counter()
+            images = list(pool.map(render_png, *zip(*[(coords, elements, bonds, view) for view in views])))
+    elapsed = time.perf_counter() - start
+    return {
+        "images_per_second": round(len(views) / elapsed, 1),
+        "mean_png_bytes": int(np.mean([len(image) for image in images])),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--atoms", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+    
+    report = {"size": args.size, "images": args.images, "workers": args.workers, "results": []}
+    for atoms in args.atoms:
+        structure = synthetic_structure(atoms)
+        for style in RENDER_STYLES:
+            # Distinct camera angles, so no two renders are identical
+            views = [ViewParams(size=args.size, style=style, azimuth=i * 360.0 / args.images, elevation=15.0) for i in range(args.images)]
+            report["results"].append({
+                "atoms": atoms,
+                "style": style,
+                "single_process": measure(structure, views, 1),
+                "process_pool": measure(structure, views, args.workers),
+            })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
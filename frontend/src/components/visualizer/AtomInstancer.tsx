@@ -3,9 +3,12 @@
 import * as THREE from "three";
 import { useRef, useMemo, useEffect } from "react";
 import { Atom } from "@/lib/types";
+import { ELEMENT_SYMBOLS, StructureFrame } from "@/lib/frame";
 
 interface AtomInstancerProps {
     atoms: Atom[];
+    // Typed buffers of a binary frame; drawn instead of atoms when set (element colors only)
+    frame?: StructureFrame | null;
     viewMode: "ball-and-stick" | "space-filling" | "sticks" | "lines" | "ribbon";
     colorScheme: "element" | "chain" | "residue" | "custom";
     visibleAtomTypes: number[];
@@ -14,6 +17,7 @@ interface AtomInstancerProps {
 
 const AtomInstancer: React.FC<AtomInstancerProps> = ({
     atoms,
+    frame,
     viewMode,
     colorScheme,
     visibleAtomTypes,
@@ -72,9 +76,33 @@ const AtomInstancer: React.FC<AtomInstancerProps> = ({
         }
     };
 
+    const count = frame ? frame.positions.length / 3 : atoms.length;
+
     const instanceData = useMemo(() => {
         const dummy = new THREE.Object3D();
-        const colorArray = new Float32Array(atoms.length * 3);
+        const colorArray = new Float32Array(count * 3);
+
+        if (frame) {
+            // Straight from the frame's positions and element codes, no Atom objects
+            const { positions, elements } = frame;
+            const colorObj = new THREE.Color();
+            for (let i = 0; i < count; i++) {
+                const element = ELEMENT_SYMBOLS[elements[i]] || 'default';
+                const radius = getAtomRadius(element, viewMode);
+
+                dummy.position.set(positions[i * 3], positions[i * 3 + 1], positions[i * 3 + 2]);
+                dummy.scale.set(radius, radius, radius);
+                dummy.updateMatrix();
+
+                meshRef.current?.setMatrixAt(i, dummy.matrix);
+
+                colorObj.set(COLORS[element] || COLORS.default);
+                colorArray[i * 3] = colorObj.r;
+                colorArray[i * 3 + 1] = colorObj.g;
+                colorArray[i * 3 + 2] = colorObj.b;
+            }
+            return colorArray;
+        }
 
         atoms.forEach((atom, i) => {
             const radius = getAtomRadius(atom.element, viewMode);
@@ -93,7 +121,7 @@ const AtomInstancer: React.FC<AtomInstancerProps> = ({
         });
 
         return colorArray;
-    }, [atoms, viewMode, colorScheme, visibleAtomTypes, hiddenAtomTypes]);
+    }, [atoms, frame, count, viewMode, colorScheme, visibleAtomTypes, hiddenAtomTypes]);
 
     const geometry = useMemo(() => new THREE.IcosahedronGeometry(1, 1), []);
 
@@ -116,7 +144,7 @@ const AtomInstancer: React.FC<AtomInstancerProps> = ({
     return (
         <instancedMesh
             ref={meshRef}
-            args={[geometry, material, atoms.length]}
+            args={[geometry, material, count]}
             castShadow
             receiveShadow
         />
@@ -7,6 +7,7 @@ import { useRef, useState, useEffect, useMemo } from "react";
 import * as THREE from "three";
 import { t } from "@/lib/i18n";
 import { Atom, Bond, Interaction, VisualizationState } from "@/lib/types";
+import { StructureFrame } from "@/lib/frame";
 import AtomInstancer from "./AtomInstancer";
 import InteractionOverlays from "./InteractionOverlays";
 import CameraManager from "./CameraManager";
@@ -20,12 +21,15 @@ interface MolecularViewerProps {
         interactions?: Record<string, Interaction[]>;
         metadata: any;
     } | null;
+    // Binary frame from fetchStructureFrame; when set, atoms are drawn from its typed buffers
+    frame?: StructureFrame | null;
     visualizationState: VisualizationState;
     onStateChange: (state: Partial<VisualizationState>) => void;
 }
 
 const MolecularViewer: React.FC<MolecularViewerProps> = ({
     structureData,
+    frame,
     visualizationState,
     onStateChange,
 }) => {
@@ -34,14 +38,14 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
     const [error, setError] = useState<string | null>(null);
 
     useEffect(() => {
-        if (!structureData) {
+        if (!structureData && !frame) {
             setLoading(true);
             setError(null);
         } else {
             setLoading(false);
             setError(null);
         }
-    }, [structureData]);
+    }, [structureData, frame]);
 
     if (error) {
         return (
@@ -71,7 +75,9 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
         );
     }
 
-    if (!structureData || !structureData.atoms || structureData.atoms.length === 0) {
+    const atomCount = frame ? frame.positions.length / 3 : structureData?.atoms?.length ?? 0;
+
+    if (atomCount === 0) {
         return (
             <div className="flex items-center justify-center h-screen bg-ui-background-primary">
                 <div className="text-center">
@@ -84,9 +90,24 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
         );
     }
 
-    const { atoms, bonds, interactions } = structureData;
+    const atoms = structureData?.atoms ?? [];
+    const bonds = structureData?.bonds;
+    const interactions = structureData?.interactions;
 
     const sceneBounds = useMemo(() => {
+        if (frame) {
+            const box = new THREE.Box3();
+            const point = new THREE.Vector3();
+            for (let i = 0; i < frame.positions.length; i += 3) {
+                box.expandByPoint(point.fromArray(frame.positions, i));
+            }
+            const center = new THREE.Vector3();
+            box.getCenter(center);
+            const size = new THREE.Vector3();
+            box.getSize(size);
+            return { center, size, maxDimension: Math.max(size.x, size.y, size.z) };
+        }
+
         if (!atoms || atoms.length === 0) {
             return {
                 center: new THREE.Vector3(0, 0, 0),
@@ -104,7 +125,7 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
         const maxDimension = Math.max(size.x, size.y, size.z);
 
         return { center, size, maxDimension };
-    }, [atoms]);
+    }, [atoms, frame]);
 
     const { center, maxDimension } = sceneBounds;
 
@@ -138,6 +159,7 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
                     {visualizationState.showAtoms && (
                         <AtomInstancer
                             atoms={atoms}
+                            frame={frame}
                             viewMode={visualizationState.viewMode}
                             colorScheme={visualizationState.colorScheme}
                             visibleAtomTypes={visualizationState.visibleAtoms}
@@ -145,7 +167,7 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
                         />
                     )}
 
-                    {visualizationState.showInteractions && interactions && (
+                    {visualizationState.showInteractions && interactions && atoms.length > 0 && (
                         <InteractionOverlays
                             atoms={atoms}
                             interactions={interactions}
@@ -162,7 +184,7 @@ const MolecularViewer: React.FC<MolecularViewerProps> = ({
                     bonds={bonds}
                     interactions={interactions}
                     visualizationState={visualizationState}
-                    structureId={structureData.id}
+                    structureId={structureData?.id ?? frame?.meta.structure_id ?? ""}
                 />
             </div>
         </div>
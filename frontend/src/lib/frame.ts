@@ -0,0 +1,122 @@
+// BioDockViz binary frame decoder (see backend/core/binary_frame.py)
+//
+// Payloads are 8-byte aligned, so every section is exposed as a typed-array
+// view over the response buffer without copying.
+
+export const FRAME_MEDIA_TYPE = "application/vnd.biodockviz.frame";
+
+const FRAME_MAGIC = "BDVZ";
+const FRAME_VERSION = 1;
+const HEADER_SIZE = 16;
+const SECTION_HEADER_SIZE = 16;
+const ALIGNMENT = 8;
+
+// Element symbol per atomic number, as in backend/core/binary_frame.py ELEMENT_SYMBOLS
+export const ELEMENT_SYMBOLS: readonly string[] = [
+    "", "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne",
+    "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar", "K", "Ca",
+    "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn",
+    "Ga", "Ge", "As", "Se", "Br", "Kr", "Rb", "Sr", "Y", "Zr",
+    "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn",
+    "Sb", "Te", "I", "Xe", "Cs", "Ba", "La", "Ce", "Pr", "Nd",
+    "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb",
+    "Lu", "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt", "Au", "Hg",
+    "Tl", "Pb", "Bi", "Po", "At", "Rn", "Fr", "Ra", "Ac", "Th",
+    "Pa", "U", "Np", "Pu", "Am", "Cm", "Bk", "Cf", "Es", "Fm",
+    "Md", "No", "Lr", "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds",
+    "Rg", "Cn", "Nh", "Fl", "Mc", "Lv", "Ts", "Og",
+];
+
+type TypedArray = Float32Array | Uint8Array | Uint16Array | Uint32Array | Int32Array;
+
+const DTYPES: Record<number, (buffer: ArrayBuffer, offset: number, length: number) => TypedArray> = {
+    1: (b, o, n) => new Float32Array(b, o, n / 4),
+    2: (b, o, n) => new Uint8Array(b, o, n),
+    3: (b, o, n) => new Uint16Array(b, o, n / 2),
+    4: (b, o, n) => new Uint32Array(b, o, n / 4),
+    5: (b, o, n) => new Int32Array(b, o, n / 4),
+};
+
+export interface FrameMeta {
+    structure_id: string;
+    atom_count: number;
+    bond_count: number;
+    interaction_count: number;
+    interaction_types: string[];
+    lod?: "trace" | "residues" | "octree" | "full";
+    bbox?: number[] | null;
+    total_atom_count?: number;
+}
+
+export interface StructureFrame {
+    meta: FrameMeta;
+    positions: Float32Array; // xyz per atom
+    elements: Uint8Array; // atomic number per atom (0 = unknown)
+    bonds: Uint32Array; // atom index pairs
+    bondOrders: Uint8Array; // 1-3, 4 = aromatic
+    atomIndices?: Uint32Array; // global atom index per item (LOD / bbox frames)
+    interactions?: Uint32Array; // atom index pairs
+    interactionTypes?: Uint8Array; // index into meta.interaction_types
+}
+
+export function decodeFrame(buffer: ArrayBuffer): StructureFrame {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== FRAME_MAGIC || view.getUint16(4, true) !== FRAME_VERSION) {
+        throw new Error("Not a BioDockViz frame");
+    }
+
+    const sectionCount = view.getUint32(8, true);
+    const sections: Record<string, TypedArray> = {};
+    let offset = HEADER_SIZE;
+
+    for (let i = 0; i < sectionCount; i++) {
+        const tag = String.fromCharCode(...new Uint8Array(buffer, offset, 4)).trim();
+        const dtype = view.getUint8(offset + 4);
+        const length = view.getUint32(offset + 12, true);
+        offset += SECTION_HEADER_SIZE;
+        sections[tag] = DTYPES[dtype](buffer, offset, length);
+        offset += length + ((ALIGNMENT - (length % ALIGNMENT)) % ALIGNMENT);
+    }
+
+    const meta = JSON.parse(new TextDecoder().decode(sections.META)) as FrameMeta;
+
+    return {
+        meta,
+        positions: sections.POS as Float32Array,
+        elements: sections.ELEM as Uint8Array,
+        bonds: sections.BOND as Uint32Array,
+        bondOrders: sections.BORD as Uint8Array,
+        atomIndices: sections.IDX as Uint32Array | undefined,
+        interactions: sections.INTR as Uint32Array | undefined,
+        interactionTypes: sections.ITYP as Uint8Array | undefined,
+    };
+}
+
+export interface FrameQuery {
+    lod?: "trace" | "residues" | "octree" | "full";
+    bbox?: [number, number, number, number, number, number];
+    interactions?: boolean;
+}
+
+export async function fetchStructureFrame(
+    baseUrl: string,
+    structureId: string,
+    query: FrameQuery = {},
+    init?: RequestInit,
+): Promise<StructureFrame> {
+    const params = new URLSearchParams();
+    if (query.lod) params.set("lod", query.lod);
+    if (query.bbox) params.set("bbox", query.bbox.join(","));
+    if (query.interactions === false) params.set("interactions", "false");
+    const search = params.toString() ? `?${params}` : "";
+
+    const response = await fetch(`${baseUrl}/api/visualize/data/${structureId}${search}`, {
+        ...init,
+        headers: { Accept: FRAME_MEDIA_TYPE, ...(init?.headers || {}) },
+    });
+    if (!response.ok) {
+        throw new Error(`Failed to load visualization data: ${response.status}`);
+    }
+    return decodeFrame(await response.arrayBuffer());
+}